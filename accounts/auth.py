@@ -1,28 +1,78 @@
-from django.contrib.auth.backends import ModelBackend
-from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
 
-User = get_user_model()
+# Permission codenames granted to approved users of each role. Admins get
+# every permission in the database.
+ROLE_PERMISSIONS = {
+    'staff': ['can_view_inventory', 'can_manage_inventory'],
+    'customer': ['can_view_inventory'],
+}
+
+PERMISSIONS_GENERATION_KEY = 'accounts:permissions:generation'
+
+# {(role, generation): frozenset of "app_label.codename"}, per process
+_role_permission_cache = {}
+
+
+def get_permissions_generation():
+    generation = cache.get(PERMISSIONS_GENERATION_KEY)
+    if generation is None:
+        cache.add(PERMISSIONS_GENERATION_KEY, 0, timeout=None)
+        generation = cache.get(PERMISSIONS_GENERATION_KEY, 0)
+    return generation
+
+
+def invalidate_role_permissions():
+    """Drop cached role permission sets in every process sharing the cache."""
+    try:
+        cache.incr(PERMISSIONS_GENERATION_KEY)
+    except ValueError:
+        cache.set(PERMISSIONS_GENERATION_KEY, 1, timeout=None)
+    _role_permission_cache.clear()
+
+
+def load_role_permissions(role):
+    permissions = Permission.objects.all()
+    if role != 'admin':
+        permissions = permissions.filter(codename__in=ROLE_PERMISSIONS.get(role, []))
+    return frozenset(
+        f"{app_label}.{codename}"
+        for app_label, codename in permissions.values_list('content_type__app_label', 'codename')
+    )
+
+
+def get_role_permissions(role):
+    """Return the role's permission set, computed once per cache generation."""
+    key = (role, get_permissions_generation())
+    permissions = _role_permission_cache.get(key)
+    if permissions is None:
+        # Older generations are stale; keep only the current one
+        for stale in [k for k in _role_permission_cache if k[1] != key[1]]:
+            _role_permission_cache.pop(stale, None)
+        permissions = _role_permission_cache[key] = load_role_permissions(role)
+    return permissions
+
+
+class RoleBasedBackend(BaseBackend):
+    """
+    Grants permissions by role. User and group permissions are left to
+    ModelBackend, which runs first, so this backend adds no queries of its
+    own once a role's permission set is cached.
+    """
 
-class RoleBasedBackend(ModelBackend):
     def get_user_permissions(self, user_obj, obj=None):
-        if not user_obj.is_active or user_obj.is_anonymous:
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        if user_obj.role == 'admin' or user_obj.is_approved:
+            return set(get_role_permissions(user_obj.role))
+        return set()
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
             return set()
-        
-        # Get default permissions
-        permissions = super().get_user_permissions(user_obj, obj)
-        
-        # Add role-based permissions
-        if user_obj.role == 'admin':
-            admin_perms = Permission.objects.all()
-            permissions.update(perm.codename for perm in admin_perms)
-        elif user_obj.role == 'staff':
-            if user_obj.is_approved:
-                staff_perms = ['can_view_inventory', 'can_manage_inventory']
-                permissions.update(staff_perms)
-        elif user_obj.role == 'customer':
-            if user_obj.is_approved:
-                customer_perms = ['can_view_inventory']
-                permissions.update(customer_perms)
-        
-        return permissions
\ No newline at end of file
+        # Separate from ModelBackend's _perm_cache so neither shadows the other
+        if not hasattr(user_obj, '_role_perm_cache'):
+            user_obj._role_perm_cache = self.get_user_permissions(user_obj)
+        return user_obj._role_perm_cache
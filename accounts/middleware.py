@@ -1,22 +1,53 @@
+from functools import lru_cache
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.urls import reverse
 from django.conf import settings
 
+
+@lru_cache(maxsize=None)
+def is_admin_portal_route(route, namespaces):
+    """
+    Whether a resolved URL belongs to the role-based admin portal, i.e. has an
+    'admin' path segment. The Django site admin (namespace 'admin') enforces
+    its own staff checks and is left alone.
+    """
+    if 'admin' in namespaces:
+        return False
+    return 'admin' in route.split('/')
+
+
 class RoleMiddleware:
+    """
+    Exposes the user's role and approval state as request.user_role and
+    request.is_approved, and keeps non-admins out of the admin portal.
+
+    Nothing is written to the session, so authenticated page views and AJAX
+    polls don't mark the session dirty and trigger a session-table UPDATE.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
-        
+
     def __call__(self, request):
         if request.user.is_authenticated:
-            # Store user role in session
-            request.session['user_role'] = request.user.role
-            request.session['is_approved'] = request.user.is_approved
-            
-            # Admin portal access control
-            if 'admin' in request.path and not request.path.startswith('/admin/') and request.user.role != 'admin':
-                messages.error(request, 'Access to admin portal denied.')
-                return redirect('home')
-                
+            request.user_role = request.user.role
+            request.is_approved = request.user.is_approved
+        else:
+            request.user_role = None
+            request.is_approved = False
+
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Admin portal access control, based on the resolved URL
+        match = request.resolver_match
+        if (
+            request.user_role is not None
+            and request.user_role != 'admin'
+            and is_admin_portal_route(match.route, tuple(match.namespaces))
+        ):
+            messages.error(request, 'Access to admin portal denied.')
+            return redirect('home')
+        return None
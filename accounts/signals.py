@@ -1,10 +1,14 @@
 """
 Signal handlers for user authentication and OAuth integration.
-Handles automatic role assignment and approval for OAuth users.
+Handles automatic role assignment and approval for OAuth users, and
+invalidates cached role permission sets when permissions change.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+
+from .auth import invalidate_role_permissions
 
 CustomUser = get_user_model()
 
@@ -26,3 +30,14 @@ def handle_user_post_save(sender, instance, created, **kwargs):
         if instance.role == 'admin' and not instance.is_approved:
             instance.is_approved = True
             instance.save(update_fields=['is_approved'])
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_migrate)
+def handle_permissions_changed(sender, **kwargs):
+    """
+    Invalidate cached role permission sets when permissions are added,
+    changed or removed, including by migrations.
+    """
+    invalidate_role_permissions()
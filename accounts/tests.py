@@ -3,9 +3,15 @@ Test OAuth role redirection and user auto-approval.
 Run with: python manage.py test accounts
 """
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
 from django.urls import reverse
 
+from .auth import RoleBasedBackend, invalidate_role_permissions
+
 CustomUser = get_user_model()
 
 
@@ -57,3 +63,112 @@ class OAuthRoleRedirectionTest(TestCase):
         
         user.refresh_from_db()
         self.assertEqual(user.role, 'customer')
+
+
+class RoleMiddlewareTest(TestCase):
+    """Test the write-free role middleware"""
+
+    def setUp(self):
+        self.client = Client()
+        self.customer = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123'
+        )
+        self.client.force_login(self.customer)
+
+    def count_writes(self, url):
+        """Return the INSERT/UPDATE/DELETE statements run while fetching url"""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return [
+            q['sql'] for q in queries
+            if q['sql'].lstrip().split()[0].upper() in ('INSERT', 'UPDATE', 'DELETE')
+        ]
+
+    def test_authenticated_requests_do_not_write_session(self):
+        """Benchmark: page views and AJAX polls perform no DB writes"""
+        for url in (reverse('inventory:home'), reverse('inventory:customer_orders'), reverse('accounts:profile')):
+            self.client.get(url)
+            writes = self.count_writes(url)
+            # Previously one django_session UPDATE per request
+            self.assertEqual(writes, [], url)
+
+    def test_role_is_exposed_on_request(self):
+        """Test that role and approval state are available without the session"""
+        response = self.client.get(reverse('accounts:profile'))
+        self.assertEqual(response.wsgi_request.user_role, 'customer')
+        self.assertFalse(response.wsgi_request.is_approved)
+        self.assertNotIn('user_role', self.client.session)
+
+    def test_non_admin_is_redirected_from_admin_portal(self):
+        """Test that admin portal URLs resolve to a redirect for non-admins"""
+        response = self.client.get(reverse('inventory:admin_dashboard'))
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+
+    def test_site_admin_is_not_handled_by_middleware(self):
+        """Test that Django's own admin keeps its login redirect"""
+        response = self.client.get(reverse('admin:index'))
+        self.assertTrue(response['Location'].startswith(reverse('admin:login')))
+
+
+class RoleBasedBackendTest(TestCase):
+    """Test cached per-role permission sets"""
+
+    def create_user(self, role, is_approved=True):
+        return CustomUser.objects.create_user(
+            email=f'{role}@example.com',
+            username=role,
+            password='testpass123',
+            role=role,
+            is_approved=is_approved
+        )
+
+    def setUp(self):
+        invalidate_role_permissions()
+        self.admin = self.create_user('admin')
+        self.staff = self.create_user('staff')
+        self.customer = self.create_user('customer')
+
+    def test_role_permissions(self):
+        """Test that each role gets its permissions as app_label.codename"""
+        self.assertTrue(self.admin.has_perm('inventory.change_product'))
+        self.assertTrue(self.staff.has_perm('accounts.can_manage_inventory'))
+        self.assertFalse(self.staff.has_perm('inventory.change_product'))
+        self.assertTrue(self.customer.has_perm('accounts.can_view_inventory'))
+        self.assertFalse(self.customer.has_perm('accounts.can_manage_inventory'))
+
+    def test_unapproved_users_get_no_role_permissions(self):
+        """Test that unapproved staff do not receive role permissions"""
+        self.staff.is_approved = False
+        self.staff.save()
+        self.assertFalse(self.staff.has_perm('accounts.can_view_inventory'))
+
+    def test_role_backend_adds_no_queries_once_cached(self):
+        """Benchmark: has_perm cost per fresh user object for every role"""
+        backend = RoleBasedBackend()
+        users = [self.admin, self.staff, self.customer]
+        for user in users:
+            backend.has_perm(user, 'accounts.can_view_inventory')
+
+        for user in users:
+            fresh = CustomUser.objects.get(pk=user.pk)
+            with self.assertNumQueries(0):
+                for _ in range(100):
+                    backend.has_perm(fresh, 'accounts.can_view_inventory')
+            # ModelBackend's user and group lookups are the only queries left
+            fresh = CustomUser.objects.get(pk=user.pk)
+            with self.assertNumQueries(2):
+                for _ in range(100):
+                    fresh.has_perm('accounts.can_view_inventory')
+
+    def test_permission_change_invalidates_cache(self):
+        """Test that a new permission reaches admins after invalidation"""
+        self.assertFalse(self.admin.has_perm('accounts.can_export_reports'))
+        Permission.objects.create(
+            codename='can_export_reports',
+            name='Can export reports',
+            content_type=ContentType.objects.get_for_model(CustomUser)
+        )
+        admin = CustomUser.objects.get(pk=self.admin.pk)
+        self.assertTrue(admin.has_perm('accounts.can_export_reports'))
@@ -0,0 +1,12 @@
+"""
+SQLite database backend tuned for concurrent writers.
+
+Use it as the ENGINE "crackers_ecommerce.db". It behaves like Django's
+sqlite3 backend and adds:
+
+- OPTIONS "journal_mode" and "synchronous", applied as PRAGMAs on every new
+  connection. WAL lets readers run while a writer commits. Pair it with the
+  standard "timeout" option, which sets SQLite's busy timeout.
+- immediate_atomic(), an atomic block that starts with BEGIN IMMEDIATE.
+  See crackers_ecommerce.db.transaction.
+"""
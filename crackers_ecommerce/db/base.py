@@ -0,0 +1,32 @@
+from django.db.backends.sqlite3 import base
+
+# Backend-specific OPTIONS applied as PRAGMAs rather than passed to connect()
+PRAGMA_OPTIONS = ('journal_mode', 'synchronous')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Set by immediate_atomic() for the next transaction started
+    begin_immediate = False
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for option in PRAGMA_OPTIONS:
+            kwargs.pop(option, None)
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        options = self.settings_dict['OPTIONS']
+        for option in PRAGMA_OPTIONS:
+            if option in options:
+                conn.execute(f"PRAGMA {option} = {options[option]}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # A deferred BEGIN takes its write lock only at the first write;
+        # if another writer got there first SQLite fails at once, without
+        # waiting out the busy timeout. IMMEDIATE takes it up front.
+        if self.begin_immediate:
+            self.cursor().execute("BEGIN IMMEDIATE")
+        else:
+            super()._start_transaction_under_autocommit()
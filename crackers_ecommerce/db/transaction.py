@@ -0,0 +1,54 @@
+import random
+import time
+from contextlib import contextmanager
+
+from django.db import OperationalError, transaction
+
+
+def is_lock_error(exc):
+    """Whether an OperationalError is SQLite lock contention."""
+    message = str(exc)
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """
+    transaction.atomic() that takes the database write lock when it begins
+    (BEGIN IMMEDIATE) on the crackers_ecommerce.db backend. On other
+    backends, or when already inside an atomic block, it is a plain atomic().
+    """
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block or not hasattr(connection, 'begin_immediate'):
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            # The BEGIN has been issued; nested blocks are savepoints
+            connection.begin_immediate = False
+            yield
+    finally:
+        connection.begin_immediate = False
+
+
+def retry_on_lock(func, attempts, backoff, using=None):
+    """
+    Call func(), retrying with jittered exponential backoff while it fails
+    with lock contention. func must run its own transaction; nothing is
+    retried inside an enclosing atomic block, where the outer transaction
+    is already broken.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return func()
+        except OperationalError as e:
+            if (
+                not is_lock_error(e)
+                or attempt == attempts
+                or transaction.get_connection(using).in_atomic_block
+            ):
+                raise
+            time.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
@@ -84,7 +84,9 @@ SOCIALACCOUNT_PROVIDERS = {
 # MIDDLEWARE
 # ---------------------------------------------------------------------
 MIDDLEWARE = [
+    "inventory.middleware.TimingMiddleware",      # First, so it times everything below
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",  # Straight after security, before sessions
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -103,7 +105,8 @@ ROOT_URLCONF = "crackers_ecommerce.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates that also records render time for Server-Timing
+        "BACKEND": "inventory.templating.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -134,13 +137,61 @@ AUTHENTICATION_BACKENDS = [
 # ---------------------------------------------------------------------
 # DATABASE
 # ---------------------------------------------------------------------
+# SQLite tuned for concurrent checkouts (see crackers_ecommerce.db): WAL so
+# readers never wait for writers, and a busy timeout so writers queue for
+# the lock instead of failing with "database is locked".
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "crackers_ecommerce.db",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": 20,               # Busy timeout, seconds
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",     # Safe with WAL; fsyncs at checkpoints
+        },
+        # On disk, so tests exercise the same locking as production
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
+    }
+}
+
+# Checkout retries when the database stays locked past the busy timeout
+CHECKOUT_LOCK_RETRIES = 5
+CHECKOUT_RETRY_BACKOFF = 0.05    # Seconds before the first retry; doubles each time
+
+
+# ---------------------------------------------------------------------
+# CACHE
+# ---------------------------------------------------------------------
+# Local-memory cache is per process. The storefront catalog is cached under
+# a version kept in the database (inventory.models.CatalogVersion), so a
+# change in one worker invalidates it in all of them and they share one
+# ETag. With several workers (e.g. gunicorn), a shared backend such as
+# Redis or Memcached still saves each worker building its own copy, and
+# makes role permission invalidation (accounts.auth) reach every worker.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "crackers-ecommerce",
     }
 }
 
+# Seconds a rendered storefront catalog stays cached. Product and Category
+# changes invalidate it immediately, in every worker, regardless of this value.
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+# Orders shown per page on the customer "My Orders" page
+CUSTOMER_ORDERS_PAGE_SIZE = 20
+
+# Most orders one bulk status change may touch
+ORDER_BULK_STATUS_LIMIT = 1000
+
+
+# ---------------------------------------------------------------------
+# LIVE DASHBOARD (server-sent events, ASGI only)
+# ---------------------------------------------------------------------
+DASHBOARD_EVENTS_HEARTBEAT = 15      # Seconds between keep-alive comments
+DASHBOARD_EVENTS_RETRY_MS = 5000     # Browser reconnect delay
+
 
 # ---------------------------------------------------------------------
 # PASSWORD VALIDATION
@@ -168,9 +219,25 @@ USE_TZ = True
 STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic writes content-hashed copies of every file plus gzip and
+# brotli variants; WhiteNoise serves the hashed names with a far-future,
+# immutable Cache-Control header. Run collectstatic after changing any
+# static file when DEBUG is off.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"},
+}
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Widths (px) of the resized JPEG/WebP copies generated for product images
+PRODUCT_IMAGE_WIDTHS = (160, 320, 640)
+
+# Generated invoice PDFs. Kept outside MEDIA_ROOT because invoices contain
+# customer details and must only be served through generate_invoice.
+INVOICE_CACHE_DIR = BASE_DIR / "var" / "invoices"
+
 
 # ---------------------------------------------------------------------
 # EMAIL (Gmail SMTP Example)
@@ -183,8 +250,20 @@ EMAIL_HOST_USER = "akashcse018@gmail.com"
 EMAIL_HOST_PASSWORD = "riyi pxmq efkd ivcq"   # Gmail app password
 DEFAULT_FROM_EMAIL = "Kannan Crackers <akashcse018@gmail.com>"
 
+# Outbox worker (python manage.py send_outbox)
+OUTBOX_BATCH_SIZE = 50          # Emails sent per SMTP connection
+OUTBOX_MAX_ATTEMPTS = 5         # Failed attempts before dead-lettering
+OUTBOX_RETRY_BACKOFF = 60       # Seconds; doubled after each failure
+OUTBOX_CLAIM_TIMEOUT = 900      # Seconds before a claimed batch from a dead worker is retried
+
+# Low stock digests: a product is alerted at most once per window
+STOCK_ALERT_WINDOW = 6 * 60 * 60  # Seconds
+
 
 # ---------------------------------------------------------------------
 # MISC
 # ---------------------------------------------------------------------
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Serves static files without the collectstatic manifest during tests
+TEST_RUNNER = "crackers_ecommerce.test_runner.TestRunner"
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner that serves static files from the app directories.
+
+    The manifest storage resolves {% static %} through the manifest written
+    by collectstatic, which doesn't exist in a fresh checkout, so tests use
+    the plain storage instead.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.static_override = override_settings(STORAGES={
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+        })
+        self.static_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.static_override.disable()
+        super().teardown_test_environment(**kwargs)
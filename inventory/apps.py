@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        """
+        Import signal handlers when the app is ready.
+        This ensures catalog cache invalidation is registered when Django starts.
+        """
+        import inventory.signals  # noqa
@@ -0,0 +1,142 @@
+"""
+Per-view performance benchmarks.
+
+Each hot view is requested repeatedly through the Django test client against
+a seeded dataset (see ViewBenchmarkTest in inventory.tests), recording the
+query count and latency of every request, including the on_commit callbacks
+it schedules. Two gates apply:
+
+- QUERY_BUDGETS: the most queries a single request may run. Query counts
+  don't depend on the machine, so this is always enforced.
+- Latency baselines, only when BENCHMARK_LATENCY=1: a view fails when its
+  median latency exceeds the baseline recorded on the same machine by more
+  than BENCHMARK_TOLERANCE (a fraction, default 2.0 = three times as slow).
+  Baselines are kept in benchmark_baselines.json, which is not committed:
+  latency from another machine means nothing here.
+
+Record baselines with
+
+    BENCHMARK_RECORD=1 python manage.py test inventory.tests.ViewBenchmarkTest
+
+then check against them with BENCHMARK_LATENCY=1. Scale the dataset with
+BENCHMARK_SCALE (default 1).
+"""
+import json
+import logging
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+logger = logging.getLogger(__name__)
+
+BASELINES_PATH = Path(__file__).resolve().parent / 'benchmark_baselines.json'
+
+# Most queries one request may run, counting the session and user lookups
+# every authenticated request makes and the request's on_commit callbacks
+QUERY_BUDGETS = {
+    'home': 4,
+    'checkout': 16,
+    'dashboard_data': 6,
+    'filter_orders': 3,
+    'customer_orders': 6,
+    'staff_inventory': 4,
+    'staff_inventory_search': 5,
+    'generate_invoice': 4,
+}
+
+# Requests per view; the median is compared against the baseline
+REPEAT = 7
+
+
+def get_scale():
+    return max(1, int(os.environ.get('BENCHMARK_SCALE', 1)))
+
+
+def get_tolerance():
+    return float(os.environ.get('BENCHMARK_TOLERANCE', 2.0))
+
+
+def recording():
+    return os.environ.get('BENCHMARK_RECORD') == '1'
+
+
+def checking_latency():
+    return os.environ.get('BENCHMARK_LATENCY') == '1'
+
+
+@dataclass
+class Result:
+    name: str
+    queries: int
+    median_ms: float
+    p95_ms: float
+
+    def __str__(self):
+        return f"{self.name:<24} {self.queries:>4} queries {self.median_ms:>9.2f} ms median {self.p95_ms:>9.2f} ms p95"
+
+
+def measure(name, request, repeat=REPEAT):
+    """
+    Call request() repeat times; returns a Result with the highest query
+    count seen and the median and 95th percentile latency in milliseconds.
+    request must return a response, which is checked for success.
+    """
+    timings, queries = [], 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = request()
+            # Streamed responses (invoices) aren't done until consumed
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise AssertionError(f'{name} returned {response.status_code}')
+        queries = max(queries, len(ctx))
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))]
+    return Result(name, queries, statistics.median(timings), p95)
+
+
+def load_baselines(scale):
+    """Recorded {view: result dict} for the given dataset scale."""
+    try:
+        baselines = json.loads(BASELINES_PATH.read_text())
+    except FileNotFoundError:
+        return {}
+    return baselines.get(str(scale), {})
+
+
+def save_baseline(scale, result):
+    try:
+        baselines = json.loads(BASELINES_PATH.read_text())
+    except FileNotFoundError:
+        baselines = {}
+    baselines.setdefault(str(scale), {})[result.name] = asdict(result)
+    BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+    logger.info('Recorded baseline %s', result)
+
+
+def check(result, baselines, tolerance):
+    """
+    Return a list of budget or regression failures for result. Pass no
+    baselines to check the query budget only.
+    """
+    failures = []
+    budget = QUERY_BUDGETS[result.name]
+    if result.queries > budget:
+        failures.append(f'{result.name}: {result.queries} queries, budget is {budget}')
+    baseline = baselines.get(result.name)
+    if baseline:
+        limit = baseline['median_ms'] * (1 + tolerance)
+        if result.median_ms > limit:
+            failures.append(
+                f"{result.name}: median {result.median_ms:.2f} ms, baseline {baseline['median_ms']:.2f} ms "
+                f"(limit {limit:.2f} ms)"
+            )
+    return failures
@@ -0,0 +1,172 @@
+"""
+Storefront catalog building and caching.
+
+Fetches every active product together with its category in a single query
+and groups them in memory, so rendering the catalog costs the same number
+of queries no matter how many categories exist.
+
+The built catalog is cached under a catalog version number. Any change to a
+Product or Category bumps the version (see inventory.signals), so cached
+entries for older versions are simply never read again. The version is a
+database row (CatalogVersion), so a bump in one worker process reaches all
+of them, while the versioned entries themselves can live in each process's
+own cache: an entry never changes once built.
+
+The same version is the ETag of the JSON catalog feed served to mobile and
+kiosk clients, which can also fetch only products changed since their last
+sync.
+"""
+import time
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion, Category, Product
+
+CATALOG_VERSION_PK = 1
+CATALOG_CACHE_KEY = 'inventory:catalog:v{version}'
+CATALOG_FEED_CACHE_KEY = 'inventory:catalog-feed:v{version}'
+
+# How far before a feed was built its next_since points, so products saved
+# by transactions still open while it was built are picked up next time
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def get_active_products():
+    """
+    Return active products with their category, ordered for grouping.
+    Ordering by category_id rather than category name lets the database walk
+    product_active_category_idx instead of sorting; groups are put in name
+    order in memory by build_catalog.
+    """
+    return (
+        Product.objects.filter(is_active=True)
+        .select_related('category')
+        .order_by('category_id', 'id')
+    )
+
+
+def build_catalog():
+    """
+    Build the storefront catalog.
+
+    Returns a dict with:
+    - products: list of all active products
+    - categories: categories that have active products, sorted by name
+    - products_by_category: {category: [products]} in the same order
+    """
+    groups = [list(group) for _, group in groupby(get_active_products(), key=lambda product: product.category_id)]
+    groups.sort(key=lambda group: (group[0].category.name, group[0].category_id))
+
+    # Use the first product's category instance as the group key
+    products_by_category = {group[0].category: group for group in groups}
+    products = [product for group in groups for product in group]
+
+    return {
+        'products': products,
+        'categories': list(products_by_category),
+        'products_by_category': products_by_category,
+    }
+
+
+def get_catalog_version():
+    """Return the current catalog version, initialising it if missing."""
+    version = CatalogVersion.objects.filter(pk=CATALOG_VERSION_PK).values_list('version', flat=True).first()
+    if version is None:
+        # Start from a timestamp so a recreated row never reuses keys still
+        # cached by running workers
+        version = CatalogVersion.objects.get_or_create(
+            pk=CATALOG_VERSION_PK, defaults={'version': time.time_ns()}
+        )[0].version
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every cached catalog, in every worker, by moving to a new version."""
+    if not CatalogVersion.objects.filter(pk=CATALOG_VERSION_PK).update(version=F('version') + 1):
+        get_catalog_version()
+
+
+def get_catalog():
+    """
+    Return the storefront catalog for the current version, from cache when
+    possible. The version and timeout are included as catalog_version and
+    catalog_cache_timeout so templates can key fragment caches on them.
+    """
+    version = get_catalog_version()
+    key = CATALOG_CACHE_KEY.format(version=version)
+    catalog = cache.get(key)
+    if catalog is None:
+        catalog = build_catalog()
+        cache.set(key, catalog, settings.CATALOG_CACHE_TIMEOUT)
+    return dict(
+        catalog,
+        catalog_version=version,
+        catalog_cache_timeout=settings.CATALOG_CACHE_TIMEOUT,
+    )
+
+
+def serialize_category(category):
+    return {
+        'id': category.id,
+        'name': category.name,
+        'description': category.description,
+        'updated_at': category.updated_at,
+    }
+
+
+def serialize_product(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'category_id': product.category_id,
+        'description': product.description,
+        'price': product.price,
+        'stock_quantity': product.stock_quantity,
+        'is_low_stock': product.is_low_stock,
+        'image': {
+            'url': product.image.url,
+            'thumbnail_url': product.thumbnail_url,
+            'srcset': product.image_srcset,
+            'webp_srcset': product.image_webp_srcset,
+        } if product.image else None,
+        'updated_at': product.updated_at,
+    }
+
+
+def build_catalog_feed(since=None):
+    """
+    Build the JSON catalog feed: every category and every active product,
+    or with since, only active products updated after it plus the ids of
+    all active products so clients can drop removed ones.
+    """
+    built_at = timezone.now()
+    products = Product.objects.filter(is_active=True).order_by('id')
+    feed = {
+        'categories': [serialize_category(c) for c in Category.objects.order_by('name', 'id')],
+    }
+    if since is None:
+        feed['products'] = [serialize_product(p) for p in products]
+    else:
+        feed['products'] = [serialize_product(p) for p in products.filter(updated_at__gt=since)]
+        feed['product_ids'] = list(products.values_list('id', flat=True))
+    feed['since'] = since
+    feed['next_since'] = built_at - SYNC_OVERLAP
+    return feed
+
+
+def get_catalog_feed(since=None):
+    """Return the catalog feed, serving the full feed from cache."""
+    version = get_catalog_version()
+    if since is not None:
+        return dict(build_catalog_feed(since), version=version)
+    key = CATALOG_FEED_CACHE_KEY.format(version=version)
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_catalog_feed()
+        cache.set(key, feed, settings.CATALOG_CACHE_TIMEOUT)
+    return dict(feed, version=version)
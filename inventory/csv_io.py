@@ -0,0 +1,281 @@
+"""
+CSV import and export.
+
+Exports stream rows from the database in fixed-size chunks through
+csv.writer, so memory stays flat however large the table is. Product imports are read row by row
+and applied in chunks of IMPORT_CHUNK_SIZE rows, each in its own
+transaction: one bulk_create for new products, one bulk_update for edited
+ones and one UPDATE adding stock. Rows that fail validation are skipped and
+reported by line number; the rest of the file is still applied.
+"""
+import codecs
+import copy
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+
+from . import utils
+from .catalog import bump_catalog_version
+from .models import Category, OrderItem, Product
+from .pagination import keyset_page
+from .stats import adjust_stats
+
+# Export columns, in order; an exported file can be edited and imported back
+PRODUCT_COLUMNS = ['id', 'name', 'category', 'price', 'stock_quantity', 'description', 'is_active']
+
+# Extra import columns: action is create, update or add_stock (default:
+# update when the row has an id, create otherwise); quantity is the amount
+# an add_stock row adds
+IMPORT_COLUMNS = ['action', *PRODUCT_COLUMNS, 'quantity']
+IMPORT_ACTIONS = ('create', 'update', 'add_stock')
+
+# Columns a create row must fill; on update rows blank cells are left as is
+REQUIRED_COLUMNS = ('name', 'category', 'price', 'stock_quantity')
+
+# Model fields written by bulk_update
+UPDATE_FIELDS = ['name', 'category', 'price', 'stock_quantity', 'description', 'is_active', 'updated_at']
+
+# One row per order line; orders without lines get one row with the line
+# columns empty
+ORDER_COLUMNS = [
+    'order_id', 'created_at', 'status', 'full_name', 'email', 'phone', 'address', 'total_amount',
+    'product', 'quantity', 'price', 'line_total',
+]
+
+IMPORT_CHUNK_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+ORDER_EXPORT_CHUNK_SIZE = 1000
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'n'}
+
+
+class ProductImportError(Exception):
+    """Raised when an uploaded file cannot be read as a product CSV."""
+
+
+class Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    """Yield the CSV lines of header followed by each row."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def export_products():
+    """CSV lines for every product in id order, fetched in chunks."""
+    rows = Product.objects.order_by('id').values_list(
+        'id', 'name', 'category__name', 'price', 'stock_quantity', 'description', 'is_active'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return stream_csv(PRODUCT_COLUMNS, rows)
+
+
+def export_orders(orders):
+    """
+    CSV lines for every order in the orders queryset and its lines, newest
+    first. Orders are read in keyset pages of ORDER_EXPORT_CHUNK_SIZE, each
+    with one query for its lines, so no query ever sorts or holds the
+    whole result.
+    """
+    return stream_csv(ORDER_COLUMNS, order_rows(orders))
+
+
+def order_rows(orders):
+    cursor = None
+    while True:
+        page, cursor = keyset_page(orders, cursor, ORDER_EXPORT_CHUNK_SIZE)
+        lines = {}
+        for order_id, product, quantity, price in OrderItem.objects.filter(
+            order_id__in=[order.id for order in page]
+        ).order_by('id').values_list('order_id', 'product__name', 'quantity', 'price'):
+            lines.setdefault(order_id, []).append((product, quantity, price, quantity * price))
+
+        for order in page:
+            details = [
+                order.id, order.created_at.isoformat(), order.status, order.full_name,
+                order.email, order.phone, order.address, order.total_amount,
+            ]
+            for line in lines.get(order.id) or [('', '', '', '')]:
+                yield details + list(line)
+        if cursor is None:
+            return
+
+
+def import_products(file):
+    """
+    Apply a product CSV read from file (bytes, e.g. an upload).
+
+    Returns a report: counts of created, updated and stock_added rows and
+    errors, a list of {'line', 'errors'} for rejected rows. Stock additions
+    in a chunk are applied after its updates. Raises ProductImportError if
+    the header has no known columns, has unknown ones or the file is not
+    UTF-8; chunks already applied stay applied.
+    """
+    reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+    report = {'created': 0, 'updated': 0, 'stock_added': 0, 'errors': []}
+    try:
+        columns = [column.strip() for column in reader.fieldnames or []]
+        unknown = [column for column in columns if column not in IMPORT_COLUMNS]
+        if unknown or not columns:
+            raise ProductImportError(
+                f"Unknown columns: {', '.join(unknown)}" if unknown else 'The file has no header row'
+            )
+        reader.fieldnames = columns
+
+        categories = dict(Category.objects.values_list('name', 'id'))
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, row))
+            if len(chunk) == IMPORT_CHUNK_SIZE:
+                apply_chunk(chunk, categories, report)
+                chunk = []
+        if chunk:
+            apply_chunk(chunk, categories, report)
+    except UnicodeDecodeError:
+        raise ProductImportError('The file must be UTF-8 encoded')
+    except csv.Error as e:
+        raise ProductImportError(f'Line {reader.line_num}: {e}')
+    return report
+
+
+def apply_chunk(rows, categories, report):
+    ids = set()
+    for _, row in rows:
+        try:
+            ids.add(int(row.get('id') or ''))
+        except ValueError:
+            pass
+    existing = Product.objects.in_bulk(ids)
+
+    creates, updates, additions = [], {}, {}
+    for line, row in rows:
+        try:
+            action, product, quantity = parse_row(row, categories, existing)
+        except ValidationError as e:
+            report['errors'].append({'line': line, 'errors': error_messages(e)})
+            continue
+        if action == 'create':
+            creates.append(product)
+        elif action == 'update':
+            # Later rows for the same product build on this one
+            updates[product.id] = existing[product.id] = product
+        else:
+            additions[product.id] = additions.get(product.id, 0) + quantity
+
+    if not (creates or updates or additions):
+        return
+    now = timezone.now()
+    with transaction.atomic():
+        Product.objects.bulk_create(creates)
+        for product in updates.values():
+            product.updated_at = now
+        Product.objects.bulk_update(updates.values(), UPDATE_FIELDS)
+        if additions:
+            Product.objects.filter(id__in=additions).update(
+                stock_quantity=Case(*(
+                    When(id=product_id, then=F('stock_quantity') + quantity)
+                    for product_id, quantity in additions.items()
+                )),
+                updated_at=now,
+            )
+
+        # Bulk writes bypass model signals, so do their work here
+        adjust_stats(total_products=len(creates))
+        transaction.on_commit(bump_catalog_version)
+        if updates:
+            utils.notify_low_stock(list(updates))
+
+    report['created'] += len(creates)
+    report['updated'] += len(updates)
+    report['stock_added'] += len(additions)
+
+
+def parse_row(row, categories, existing):
+    """
+    Validate one CSV row. Returns (action, product, quantity): an unsaved
+    Product for creates, the edited Product for updates, and the Product
+    and quantity to add for add_stock. Raises ValidationError.
+    """
+    product_id = clean(row, 'id')
+    action = clean(row, 'action').lower() or ('update' if product_id else 'create')
+    if action not in IMPORT_ACTIONS:
+        raise ValidationError(f'Unknown action "{action}"')
+
+    if action == 'create':
+        if product_id:
+            raise ValidationError('Create rows must not have an id')
+        product = Product(description='')
+    else:
+        try:
+            product = existing.get(int(product_id))
+        except ValueError:
+            raise ValidationError({'id': 'Enter a product id.'})
+        if product is None:
+            raise ValidationError({'id': f'Product {product_id} not found.'})
+        # Edit a copy so a rejected row leaves no half-applied changes
+        product = copy.copy(product)
+
+    if action == 'add_stock':
+        try:
+            quantity = int(clean(row, 'quantity'))
+        except ValueError:
+            quantity = 0
+        if quantity <= 0:
+            raise ValidationError({'quantity': 'Enter a whole number greater than 0.'})
+        return action, product, quantity
+
+    set_fields(product, row, categories, required=action == 'create')
+    return action, product, None
+
+
+def set_fields(product, row, categories, required):
+    errors = {}
+    for column in PRODUCT_COLUMNS[1:]:
+        value = clean(row, column)
+        if not value:
+            if required and column in REQUIRED_COLUMNS:
+                errors[column] = 'This field is required.'
+            continue
+        try:
+            if column == 'category':
+                if value not in categories:
+                    raise ValueError(f'Unknown category "{value}".')
+                product.category_id = categories[value]
+            elif column == 'price':
+                product.price = Decimal(value)
+            elif column == 'stock_quantity':
+                product.stock_quantity = int(value)
+            elif column == 'is_active':
+                if value.lower() not in TRUE_VALUES | FALSE_VALUES:
+                    raise ValueError('Enter true or false.')
+                product.is_active = value.lower() in TRUE_VALUES
+            else:
+                setattr(product, column, value)
+        except (InvalidOperation, ValueError) as e:
+            errors[column] = str(e) if column in ('category', 'is_active') else 'Enter a valid number.'
+    if errors:
+        raise ValidationError(errors)
+    # Category was resolved above and description may be left empty, as in
+    # the staff_inventory form
+    product.full_clean(exclude=['category', 'description', 'image', 'image_widths'], validate_unique=False)
+
+
+def clean(row, column):
+    return (row.get(column) or '').strip()
+
+
+def error_messages(error):
+    if hasattr(error, 'error_dict'):
+        return [f'{field}: {message}' for field, messages in error.message_dict.items() for message in messages]
+    return error.messages
@@ -0,0 +1,87 @@
+"""
+Live admin dashboard events.
+
+A single in-process publisher fans events out to every connected
+dashboard_events stream. Each subscriber owns an asyncio queue bound to the
+event loop it runs on; publish() may be called from any thread (sync views,
+signal handlers) and hands the event to each loop thread-safely.
+
+Events only reach subscribers in the same process. Run the ASGI server with
+one worker per host or put a shared broker (e.g. Redis pub/sub) behind
+publish() when scaling out; the dashboard falls back to polling either way.
+"""
+import asyncio
+import json
+import threading
+
+from django.db import transaction
+
+ORDER_CREATED = 'order_created'
+ORDER_STATUS_CHANGED = 'order_status_changed'
+# One event for a bulk status change instead of one per order
+ORDERS_STATUS_CHANGED = 'orders_status_changed'
+LOW_STOCK = 'low_stock'
+
+# Events queued for a slow subscriber before it is disconnected
+MAX_PENDING_EVENTS = 100
+
+
+class Subscription:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the subscriber rather than grow without bound; the
+            # browser reconnects and refetches the full dashboard
+            self.overflowed = True
+
+
+class EventBroker:
+    def __init__(self):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Register a subscriber on the running event loop."""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event_type, data):
+        """Send an event to every subscriber. Safe to call from any thread."""
+        event = {'type': event_type, 'data': data}
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+
+broker = EventBroker()
+
+
+def publish_on_commit(event_type, data):
+    """Publish once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(lambda: broker.publish(event_type, data))
+
+
+def format_event(event):
+    """Serialise an event in text/event-stream format."""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
@@ -0,0 +1,77 @@
+"""
+Product image derivatives.
+
+When a product image is saved, resized copies are generated at each width in
+PRODUCT_IMAGE_WIDTHS (never upscaled), as both JPEG and WebP, next to the
+originals under <upload dir>/derivatives/. The widths actually generated are
+stored on Product.image_widths so templates can build srcset attributes
+without touching storage. The original upload is kept as is for zooming.
+"""
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Pillow format name and file extension of each derivative format
+FORMATS = {
+    'jpeg': ('JPEG', 'jpg'),
+    'webp': ('WEBP', 'webp'),
+}
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'WEBP': {'quality': 80, 'method': 6},
+}
+
+
+def derivative_name(image_name, width, fmt):
+    """Storage name of the fmt derivative of image_name at width."""
+    directory, filename = posixpath.split(image_name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, 'derivatives', f"{stem}-{width}w.{FORMATS[fmt][1]}")
+
+
+def derivative_url(image_name, width, fmt):
+    return default_storage.url(derivative_name(image_name, width, fmt))
+
+
+def build_srcset(image_name, widths, fmt):
+    return ', '.join(f"{derivative_url(image_name, width, fmt)} {width}w" for width in widths)
+
+
+def generate_derivatives(image_file, image_name):
+    """
+    Write JPEG and WebP derivatives of an image at every configured width
+    not larger than the original; returns the widths written, ascending.
+    """
+    image_file.open('rb')
+    try:
+        with Image.open(image_file) as original:
+            original = ImageOps.exif_transpose(original)
+            if original.mode not in ('RGB', 'L'):
+                original = original.convert('RGB')
+            # Always keep at least the smallest width, even for tiny uploads
+            widths = sorted(w for w in settings.PRODUCT_IMAGE_WIDTHS if w <= original.width)
+            widths = widths or [min(settings.PRODUCT_IMAGE_WIDTHS)]
+            for width in widths:
+                height = max(1, round(original.height * width / original.width))
+                resized = original.resize((width, height), Image.LANCZOS)
+                for fmt, (pil_format, _) in FORMATS.items():
+                    buffer = BytesIO()
+                    resized.save(buffer, pil_format, **SAVE_OPTIONS[pil_format])
+                    name = derivative_name(image_name, width, fmt)
+                    # Names are deterministic; replace anything left over
+                    default_storage.delete(name)
+                    default_storage.save(name, ContentFile(buffer.getvalue()))
+    finally:
+        image_file.close()
+    return widths
+
+
+def delete_derivatives(image_name, widths):
+    for width in widths:
+        for fmt in FORMATS:
+            default_storage.delete(derivative_name(image_name, width, fmt))
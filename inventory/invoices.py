@@ -0,0 +1,178 @@
+"""
+Invoice PDF generation and on-disk caching.
+
+Generated invoices are stored under INVOICE_CACHE_DIR, keyed by order id and
+the order's updated_at timestamp, so repeat downloads are served straight
+from disk. Saving or deleting an order removes its cached files (see
+inventory.signals); a changed updated_at also never matches an old file.
+"""
+import os
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+ORDER_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('GRID', (0, 0), (-1, -2), 1, colors.black),
+    ('BOX', (0, 0), (-1, -1), 2, colors.black),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+])
+
+ITEMS_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('GRID', (0, 0), (-1, -2), 1, colors.black),
+    ('BOX', (0, 0), (-1, -1), 2, colors.black),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+    ('ALIGN', (-2, -1), (-1, -1), 'RIGHT'),
+])
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Build the paragraph styles once per process."""
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        ),
+        'heading': styles['Heading2'],
+        'normal': styles['Normal'],
+        'footer': ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=8,
+            textColor=colors.grey,
+            alignment=1
+        ),
+    }
+
+
+def render_invoice_pdf(order, items):
+    """Render the invoice for order and its items and return the PDF bytes."""
+    styles = get_styles()
+    normal = styles['normal']
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+
+    # Title
+    elements.append(Paragraph("INVOICE", styles['title']))
+    elements.append(Paragraph("Kannan Crackers", styles['heading']))
+    elements.append(Spacer(1, 20))
+
+    # Order Info
+    order_info = [
+        [Paragraph(f"<b>Invoice #:</b> {order.id}", normal),
+         Paragraph(f"<b>Date:</b> {order.created_at.strftime('%B %d, %Y')}", normal)],
+        [Paragraph(f"<b>Customer:</b> {order.full_name}", normal),
+         Paragraph(f"<b>Status:</b> {order.get_status_display()}", normal)],
+        [Paragraph(f"<b>Phone:</b> {order.phone}", normal),
+         Paragraph(f"<b>Email:</b> {order.email}", normal)],
+        [Paragraph(f"<b>Shipping Address:</b> {order.address}", normal), '']
+    ]
+    order_table = Table(order_info, colWidths=[4*inch, 4*inch])
+    order_table.setStyle(ORDER_TABLE_STYLE)
+    elements.append(order_table)
+    elements.append(Spacer(1, 20))
+
+    # Items Table
+    items_data = [['Product', 'Quantity', 'Price', 'Total']]
+    for item in items:
+        items_data.append([
+            item.product.name,
+            str(item.quantity),
+            f"₹{item.price}",
+            f"₹{item.total}"
+        ])
+    items_data.append(['', '', 'Total Amount:', f"₹{order.total_amount}"])
+
+    items_table = Table(items_data, colWidths=[4*inch, 1.5*inch, 1.5*inch, 1*inch])
+    items_table.setStyle(ITEMS_TABLE_STYLE)
+    elements.append(items_table)
+
+    # Footer
+    elements.append(Spacer(1, 30))
+    elements.append(Paragraph("Thank you for shopping with Kannan Crackers!", styles['footer']))
+    elements.append(Paragraph(f"Generated on: {timezone.now().strftime('%B %d, %Y %H:%M')}", styles['footer']))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def get_cache_dir():
+    return Path(settings.INVOICE_CACHE_DIR)
+
+
+def get_invoice_path(order):
+    """Cache path for the order's invoice at its current updated_at."""
+    version = int(order.updated_at.timestamp() * 1_000_000)
+    return get_cache_dir() / f"{order.id}-{version}.pdf"
+
+
+def write_atomic(path, data):
+    """Write via a temp file and rename so readers never see partial PDFs."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def open_invoice(order):
+    """
+    Open the order's cached invoice PDF for reading, rendering and caching
+    it first if no file exists for the order's current version.
+    """
+    path = get_invoice_path(order)
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        items = order.items.select_related('product').all()
+        write_atomic(path, render_invoice_pdf(order, items))
+        return open(path, 'rb')
+
+
+def invalidate_invoice(order_id):
+    """Remove every cached invoice file for an order."""
+    for path in get_cache_dir().glob(f"{order_id}-*.pdf"):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def invalidate_invoices(order_ids):
+    """Remove the cached invoice files of many orders in one directory scan."""
+    order_ids = {str(order_id) for order_id in order_ids}
+    for path in get_cache_dir().glob("*.pdf"):
+        if path.name.split("-", 1)[0] in order_ids:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,133 @@
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, time as dt_time
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+# Models are imported inside functions: with the spawn and forkserver start
+# methods, workers import this module before init_worker runs django.setup()
+
+
+def init_worker():
+    """Give each worker process its own Django setup and DB connections."""
+    django.setup()
+    # Connections inherited from a forked parent must never be reused
+    connections.close_all()
+
+
+def render_chunk(order_ids):
+    """Render invoices for a chunk of orders; returns [(order_id, pdf_bytes)]."""
+    from inventory.invoices import get_invoice_path, render_invoice_pdf
+    from inventory.models import Order
+
+    orders = Order.objects.filter(id__in=order_ids).prefetch_related('items__product')
+    results = []
+    for order in orders:
+        # Reuse a PDF already cached by generate_invoice when there is one
+        path = get_invoice_path(order)
+        try:
+            pdf = path.read_bytes()
+        except FileNotFoundError:
+            pdf = render_invoice_pdf(order, order.items.all())
+        results.append((order.id, pdf))
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Render invoice PDFs for many orders in parallel into a zip archive or directory'
+
+    def add_arguments(self, parser):
+        from inventory.models import Order
+
+        parser.add_argument('output', help='Output .zip file or directory')
+        parser.add_argument('--from', dest='date_from', help='Orders created on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Orders created on or before this date (YYYY-MM-DD)')
+        parser.add_argument('--status', action='append', choices=[s for s, _ in Order.STATUS_CHOICES],
+                            help='Only orders with this status (repeatable)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: CPU count; 1 renders in this process)')
+        parser.add_argument('--chunk-size', type=int, default=200,
+                            help='Orders rendered per worker task')
+
+    def parse_date(self, value, end_of_day=False):
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}", expected YYYY-MM-DD')
+        return timezone.make_aware(datetime.combine(day, dt_time.max if end_of_day else dt_time.min))
+
+    def get_order_ids(self, options):
+        from inventory.models import Order
+
+        orders = Order.objects.all()
+        if options['date_from']:
+            orders = orders.filter(created_at__gte=self.parse_date(options['date_from']))
+        if options['date_to']:
+            orders = orders.filter(created_at__lte=self.parse_date(options['date_to'], end_of_day=True))
+        if options['status']:
+            orders = orders.filter(status__in=options['status'])
+        return list(orders.order_by('id').values_list('id', flat=True))
+
+    def render(self, chunks, workers):
+        """Yield rendered chunks as they complete."""
+        if workers == 1:
+            for chunk in chunks:
+                yield render_chunk(chunk)
+            return
+
+        # Workers open their own connections; don't share ours across fork
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            futures = [pool.submit(render_chunk, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def handle(self, *args, **options):
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        order_ids = self.get_order_ids(options)
+        total = len(order_ids)
+        if not total:
+            self.stdout.write(self.style.WARNING('No orders match the given filters'))
+            return
+
+        size = options['chunk_size']
+        chunks = [order_ids[i:i + size] for i in range(0, total, size)]
+        output = Path(options['output'])
+        as_zip = output.suffix == '.zip'
+        if as_zip:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED)
+        else:
+            output.mkdir(parents=True, exist_ok=True)
+
+        self.stdout.write(f'Exporting {total} invoices in {len(chunks)} chunks...')
+        started = time.monotonic()
+        done = 0
+        try:
+            for results in self.render(chunks, options['workers']):
+                for order_id, pdf in results:
+                    filename = f'invoice-{order_id}.pdf'
+                    if as_zip:
+                        archive.writestr(filename, pdf)
+                    else:
+                        (output / filename).write_bytes(pdf)
+                done += len(results)
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'  {done}/{total} ({done / total:.0%}) - {done / elapsed:.1f} invoices/s')
+        finally:
+            if as_zip:
+                archive.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {done} invoices to {output} in {elapsed:.1f}s ({done / elapsed:.1f} invoices/s)'
+        ))
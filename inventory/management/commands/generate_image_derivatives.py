@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from inventory import images
+from inventory.catalog import bump_catalog_version
+from inventory.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Generate resized JPEG/WebP copies of product images that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate derivatives for every product image')
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            products = products.filter(image_widths=[])
+
+        done = failed = 0
+        for product in products.only('id', 'image', 'image_widths').iterator():
+            try:
+                widths = images.generate_derivatives(product.image, product.image.name)
+            except OSError as e:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f'{product.image.name}: {e}'))
+                continue
+            Product.objects.filter(pk=product.pk).update(image_widths=widths, updated_at=timezone.now())
+            done += 1
+
+        # Queryset updates skip the signals that invalidate cached catalogs
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {done} images ({failed} failed)'))
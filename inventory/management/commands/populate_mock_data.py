@@ -1,104 +1,292 @@
-import os
+import math
 import random
-from django.core.management.base import BaseCommand
-from django.conf import settings
-from inventory.models import Category, Product
-from django.core.files import File
-from django.core.files.temp import NamedTemporaryFile
-import requests
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from inventory import images
+from inventory.catalog import bump_catalog_version
+from inventory.models import Category, Order, OrderItem, Product
+from inventory.rollups import rebuild_all
+from inventory.stats import recompute_stats
+
+CATEGORIES = [
+    {"name": "Aerial Crackers", "description": "Spectacular aerial fireworks that light up the sky"},
+    {"name": "Ground Chakras", "description": "Spinning fireworks that create beautiful patterns on the ground"},
+    {"name": "Sparklers", "description": "Hand-held fireworks that emit colorful sparks"},
+    {"name": "Fountains", "description": "Stationary fireworks that shoot colorful sparks upward"},
+    {"name": "Rockets", "description": "Sky-shooting fireworks with various effects"},
+    {"name": "Roman Candles", "description": "Tube-based fireworks shooting multiple colored balls"},
+    {"name": "Garland Crackers", "description": "String of small crackers for continuous excitement"},
+    {"name": "Flower Pots", "description": "Beautiful fountain-like fireworks with expanding effects"},
+    {"name": "Sound Crackers", "description": "Loud crackers with various sound effects"},
+    {"name": "Gift Boxes", "description": "Assorted fireworks collections in attractive packages"}
+]
+
+# Product name templates for each category
+PRODUCT_TEMPLATES = {
+    "Aerial Crackers": ["Sky Blaster", "Star Rain", "Color Burst", "Thunder Cloud", "Night Pearl"],
+    "Ground Chakras": ["Spin Master", "Color Wheel", "Ground Star", "Rainbow Spin", "Light Circle"],
+    "Sparklers": ["Golden Sparkle", "Color Rain", "Magic Wand", "Silver Shine", "Star Stick"],
+    "Fountains": ["Color Shower", "Rainbow Fall", "Crystal Spray", "Diamond Dust", "Pearl Stream"],
+    "Rockets": ["Sky Hunter", "Star Chaser", "Moon Rider", "Cloud Pierce", "Night Flyer"],
+    "Roman Candles": ["Color Shot", "Star Stream", "Night Ball", "Rainbow Balls", "Pearl Shot"],
+    "Garland Crackers": ["Joy String", "Festival Chain", "Celebration Line", "Party Link", "Happy Thread"],
+    "Flower Pots": ["Garden Bloom", "Color Bloom", "Night Flower", "Star Blossom", "Rainbow Pot"],
+    "Sound Crackers": ["Thunder King", "Sound Storm", "Blast Master", "Echo Plus", "Boom Box"],
+    "Gift Boxes": ["Festival Pack", "Party Box", "Celebration Kit", "Family Pack", "Premium Collection"]
+}
+
+# (size, min price, max price)
+SIZES = [
+    ("Small", 50.0, 100.0),
+    ("Medium", 100.0, 200.0),
+    ("Large", 200.0, 400.0),
+    ("Premium", 500.0, 800.0),
+    ("Deluxe", 1000.0, 2000.0),
+]
+
+# Roughly how a live shop's orders are spread over statuses
+ORDER_STATUS_WEIGHTS = {
+    'pending': 10,
+    'processing': 10,
+    'shipped': 15,
+    'delivered': 55,
+    'cancelled': 10,
+}
+
+IMAGE_SIZE = (800, 600)
+
+
+def init_worker():
+    """Give each worker process its own Django setup and DB connections."""
+    django.setup()
+    connections.close_all()
+
+
+def render_mock_image(name, label, seed):
+    """
+    Draw a synthetic firework picture, save it and its derivatives to
+    storage, and return (name, derivative widths).
+    """
+    rng = random.Random(seed)
+    width, height = IMAGE_SIZE
+    image = Image.new('RGB', IMAGE_SIZE)
+    draw = ImageDraw.Draw(image)
+
+    # Night-sky gradient
+    top, bottom = (rng.randint(0, 40), rng.randint(0, 40), rng.randint(40, 90)), (5, 5, 20)
+    for y in range(height):
+        t = y / height
+        draw.line([(0, y), (width, y)], fill=tuple(round(a + (b - a) * t) for a, b in zip(top, bottom)))
+
+    # A few bursts of sparks
+    for _ in range(rng.randint(2, 4)):
+        cx, cy = rng.randint(100, width - 100), rng.randint(80, height - 200)
+        color = (rng.randint(150, 255), rng.randint(80, 255), rng.randint(0, 255))
+        radius = rng.randint(60, 160)
+        for _ in range(rng.randint(24, 48)):
+            angle = rng.random() * 6.2832
+            length = radius * rng.uniform(0.5, 1.0)
+            end = (cx + length * math.cos(angle), cy + length * math.sin(angle))
+            draw.line([(cx, cy), end], fill=color, width=2)
+            draw.ellipse([end[0] - 3, end[1] - 3, end[0] + 3, end[1] + 3], fill=color)
+
+    draw.rectangle([0, height - 70, width, height], fill=(0, 0, 0))
+    draw.text((20, height - 50), label, fill=(255, 215, 0))
+
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=85)
+    default_storage.delete(name)
+    name = default_storage.save(name, ContentFile(buffer.getvalue()))
+    with default_storage.open(name, 'rb') as f:
+        widths = images.generate_derivatives(f, name)
+    return name, widths
+
 
 class Command(BaseCommand):
-    help = 'Populate database with mock data'
-
-    def create_mock_image(self, category_name, index):
-        # Use placeholder images from Lorem Picsum
-        width = 800
-        height = 600
-        img_url = f'https://picsum.photos/{width}/{height}?random={index}'
-        
-        try:
-            # Download the image
-            response = requests.get(img_url)
-            if response.status_code == 200:
-                # Create the media directory if it doesn't exist
-                media_dir = os.path.join(settings.MEDIA_ROOT, 'products')
-                os.makedirs(media_dir, exist_ok=True)
-                
-                # Create filename
-                filename = f"{category_name.lower().replace(' ', '_')}_{index}.jpg"
-                file_path = os.path.join(media_dir, filename)
-                
-                # Save the image directly to the media directory
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
-                
-                # Return the relative path for the model
-                return f'products/{filename}'
-        except Exception as e:
-            self.stdout.write(self.style.WARNING(f'Failed to create image: {str(e)}'))
-            return None
-
-    def handle(self, *args, **kwargs):
-        # Create categories
-        categories = [
-            {"name": "Aerial Crackers", "description": "Spectacular aerial fireworks that light up the sky"},
-            {"name": "Ground Chakras", "description": "Spinning fireworks that create beautiful patterns on the ground"},
-            {"name": "Sparklers", "description": "Hand-held fireworks that emit colorful sparks"},
-            {"name": "Fountains", "description": "Stationary fireworks that shoot colorful sparks upward"},
-            {"name": "Rockets", "description": "Sky-shooting fireworks with various effects"},
-            {"name": "Roman Candles", "description": "Tube-based fireworks shooting multiple colored balls"},
-            {"name": "Garland Crackers", "description": "String of small crackers for continuous excitement"},
-            {"name": "Flower Pots", "description": "Beautiful fountain-like fireworks with expanding effects"},
-            {"name": "Sound Crackers", "description": "Loud crackers with various sound effects"},
-            {"name": "Gift Boxes", "description": "Assorted fireworks collections in attractive packages"}
-        ]
-
-        # Product name templates for each category
-        product_templates = {
-            "Aerial Crackers": ["Sky Blaster", "Star Rain", "Color Burst", "Thunder Cloud", "Night Pearl"],
-            "Ground Chakras": ["Spin Master", "Color Wheel", "Ground Star", "Rainbow Spin", "Light Circle"],
-            "Sparklers": ["Golden Sparkle", "Color Rain", "Magic Wand", "Silver Shine", "Star Stick"],
-            "Fountains": ["Color Shower", "Rainbow Fall", "Crystal Spray", "Diamond Dust", "Pearl Stream"],
-            "Rockets": ["Sky Hunter", "Star Chaser", "Moon Rider", "Cloud Pierce", "Night Flyer"],
-            "Roman Candles": ["Color Shot", "Star Stream", "Night Ball", "Rainbow Balls", "Pearl Shot"],
-            "Garland Crackers": ["Joy String", "Festival Chain", "Celebration Line", "Party Link", "Happy Thread"],
-            "Flower Pots": ["Garden Bloom", "Color Bloom", "Night Flower", "Star Blossom", "Rainbow Pot"],
-            "Sound Crackers": ["Thunder King", "Sound Storm", "Blast Master", "Echo Plus", "Boom Box"],
-            "Gift Boxes": ["Festival Pack", "Party Box", "Celebration Kit", "Family Pack", "Premium Collection"]
-        }
-
-        self.stdout.write('Creating categories and products...')
-
-        for cat_data in categories:
-            category = Category.objects.create(
-                name=cat_data["name"],
-                description=cat_data["description"]
-            )
-            
-            # Create 5 products for each category
-            templates = product_templates[cat_data["name"]]
-            for i in range(5):
-                base_name = templates[i]
-                # Create variants of each base name
-                for size in ["Small", "Medium", "Large", "Premium", "Deluxe"]:
-                    price = random.uniform(
-                        50.0 if size == "Small" else 100.0 if size == "Medium" else 200.0 if size == "Large" else 500.0 if size == "Premium" else 1000.0,
-                        100.0 if size == "Small" else 200.0 if size == "Medium" else 400.0 if size == "Large" else 800.0 if size == "Premium" else 2000.0
-                    )
-                    
-                    product = Product.objects.create(
-                        name=f"{size} {base_name}",
-                        category=category,
-                        price=round(price, 2),
-                        stock_quantity=random.randint(5, 50),
-                        description=f"{size} size {base_name} - {cat_data['description']}. Perfect for celebrations and festivals.",
-                        is_active=True
-                    )
-
-                    # Add image to product
-                    image_path = self.create_mock_image(cat_data["name"], i)
-                    if image_path:
-                        product.image = image_path
-                        product.save()
-
-        self.stdout.write(self.style.SUCCESS('Successfully created mock data!'))
\ No newline at end of file
+    help = 'Populate database with mock data (offline; scales to load-testing sizes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=250, help='Products to create')
+        parser.add_argument('--users', type=int, default=0, help='Approved customers to create')
+        parser.add_argument('--orders', type=int, default=0,
+                            help='Orders to create for existing customers, spread over the last year')
+        parser.add_argument('--images', type=int, default=50,
+                            help='Distinct product images to generate; products share them round-robin (0 for none)')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Image worker processes (default: CPU count; 1 renders in this process)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk INSERT')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def log(self, message):
+        self.stdout.write(message)
+
+    def get_categories(self):
+        """Create any missing mock categories; returns them in CATEGORIES order."""
+        existing = {c.name: c for c in Category.objects.filter(name__in=[c["name"] for c in CATEGORIES])}
+        missing = [Category(**data) for data in CATEGORIES if data["name"] not in existing]
+        for category in Category.objects.bulk_create(missing):
+            existing[category.name] = category
+        return [existing[data["name"]] for data in CATEGORIES]
+
+    def create_images(self, count, workers):
+        """Render count images in a worker pool; returns [(name, widths)]."""
+        jobs = []
+        for i in range(count):
+            cat_data = CATEGORIES[i % len(CATEGORIES)]
+            base_name = PRODUCT_TEMPLATES[cat_data["name"]][(i // len(CATEGORIES)) % 5]
+            slug = cat_data["name"].lower().replace(' ', '_')
+            jobs.append((f'products/mock_{slug}_{i}.jpg', f'{base_name} - {cat_data["name"]}', self.seed + i))
+
+        if workers == 1:
+            return [render_mock_image(*job) for job in jobs]
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            return list(pool.map(render_mock_image, *zip(*jobs), chunksize=max(1, count // 32)))
+
+    def create_products(self, count, categories, product_images, batch_size):
+        rng = self.rng
+        batch = []
+        created = 0
+        per_round = len(categories) * 25
+        for n in range(count):
+            category = categories[n % len(categories)]
+            base_name = PRODUCT_TEMPLATES[category.name][(n // len(categories)) % 5]
+            size, low, high = SIZES[(n // (len(categories) * 5)) % len(SIZES)]
+            # Names repeat every per_round products; number later rounds
+            suffix = f" #{n // per_round + 1}" if n >= per_round else ""
+            image_name, widths = product_images[n % len(product_images)] if product_images else (None, [])
+            batch.append(Product(
+                name=f"{size} {base_name}{suffix}",
+                category=category,
+                price=Decimal(str(round(rng.uniform(low, high), 2))),
+                stock_quantity=rng.randint(5, 50),
+                description=f"{size} size {base_name} - {category.description}. Perfect for celebrations and festivals.",
+                is_active=True,
+                image=image_name,
+                image_widths=widths,
+            ))
+            if len(batch) == batch_size:
+                Product.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+                self.log(f'  {created}/{count} products')
+        Product.objects.bulk_create(batch)
+
+    def create_users(self, count, batch_size):
+        User = get_user_model()
+        # Hashing is deliberately slow; every mock customer shares one hash
+        password = make_password('password123')
+        token = secrets.token_hex(3)
+        batch = []
+        for n in range(count):
+            batch.append(User(
+                username=f'customer_{token}_{n}',
+                email=f'customer_{token}_{n}@example.com',
+                first_name='Mock',
+                last_name=f'Customer {n}',
+                password=password,
+                role='customer',
+                is_approved=True,
+            ))
+            if len(batch) == batch_size:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+
+    def create_orders(self, count, batch_size):
+        rng = self.rng
+        customers = list(get_user_model().objects.filter(role='customer').values_list('id', 'email', 'first_name', 'last_name'))
+        if not customers:
+            raise CommandError('No customers to place orders for; pass --users N as well')
+        products = list(Product.objects.values_list('id', 'price'))
+        if not products:
+            raise CommandError('No products to order')
+
+        statuses, weights = zip(*ORDER_STATUS_WEIGHTS.items())
+        now = timezone.now()
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            orders, lines, created_ats = [], [], []
+            for _ in range(size):
+                user_id, email, first_name, last_name = rng.choice(customers)
+                created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+                order_lines = [
+                    (product_id, price, rng.randint(1, 10))
+                    for product_id, price in rng.sample(products, min(len(products), rng.randint(1, 5)))
+                ]
+                orders.append(Order(
+                    user_id=user_id,
+                    full_name=f'{first_name} {last_name}'.strip() or email,
+                    email=email,
+                    phone=f'9{rng.randint(100000000, 999999999)}',
+                    address=f'{rng.randint(1, 999)} Festival Street, Sivakasi',
+                    total_amount=sum(price * quantity for _, price, quantity in order_lines),
+                    status=rng.choices(statuses, weights)[0],
+                ))
+                created_ats.append(created_at)
+                lines.append(order_lines)
+
+            with transaction.atomic():
+                Order.objects.bulk_create(orders)
+                # bulk_create stamps auto_now_add/auto_now fields with the current
+                # time; bulk_update writes plain UPDATEs, so it can backdate them
+                for order, created_at in zip(orders, created_ats):
+                    order.created_at = order.updated_at = created_at
+                Order.objects.bulk_update(orders, ['created_at', 'updated_at'])
+                OrderItem.objects.bulk_create([
+                    OrderItem(order_id=order.id, product_id=product_id, price=price, quantity=quantity)
+                    for order, order_lines in zip(orders, lines)
+                    for product_id, price, quantity in order_lines
+                ])
+            created += size
+            self.log(f'  {created}/{count} orders')
+
+    def handle(self, *args, **options):
+        if options['workers'] is not None and options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        self.seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        batch_size = options['batch_size']
+
+        categories = self.get_categories()
+
+        if options['products']:
+            product_images = []
+            if options['images']:
+                self.log(f'Generating {options["images"]} product images...')
+                product_images = self.create_images(options['images'], options['workers'])
+            self.log(f'Creating {options["products"]} products...')
+            self.create_products(options['products'], categories, product_images, batch_size)
+
+        if options['users']:
+            self.log(f'Creating {options["users"]} customers...')
+            self.create_users(options['users'], batch_size)
+
+        if options['orders']:
+            self.log(f'Creating {options["orders"]} orders...')
+            self.create_orders(options['orders'], batch_size)
+
+        # bulk_create skips the signals that maintain these
+        recompute_stats()
+        rebuild_all()
+        bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully created mock data! (seed {self.seed})'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from inventory.stats import recompute_stats
+
+
+class Command(BaseCommand):
+    help = 'Recalculate the admin dashboard counters from the source tables'
+
+    def handle(self, *args, **kwargs):
+        stats = recompute_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Dashboard stats rebuilt: {stats.total_users} users, {stats.total_products} products, '
+            f'{stats.total_orders} orders, ₹{stats.total_revenue} revenue'
+        ))
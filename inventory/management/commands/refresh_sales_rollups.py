@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from inventory.rollups import rebuild_all
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily sales rollups from orders (every day with orders by default)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Last day to rebuild (YYYY-MM-DD, default today)')
+        parser.add_argument('--days', type=int, help='Rebuild only the last N days, up to today')
+
+    def handle(self, *args, **options):
+        first_day, last_day = self.parse_day(options['since']), self.parse_day(options['until'])
+        if options['days'] is not None:
+            if options['days'] < 1 or first_day:
+                raise CommandError('--days must be positive and cannot be combined with --since')
+            last_day = last_day or timezone.localdate()
+            first_day = last_day - timedelta(days=options['days'] - 1)
+        if first_day and last_day and first_day > last_day:
+            raise CommandError('--since must not be after --until')
+
+        days = rebuild_all(first_day, last_day)
+        self.stdout.write(self.style.SUCCESS(f'Sales rollups rebuilt for {days} days'))
+
+    def parse_day(self, value):
+        if value is None:
+            return None
+        try:
+            day = parse_date(value)
+        except ValueError:
+            day = None
+        if day is None:
+            raise CommandError(f'{value} is not a YYYY-MM-DD date')
+        return day
@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from inventory import outbox
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails from the outbox in batches over one connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Emails per connection (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--max-attempts', type=int, default=None,
+                            help='Attempts before an email is dead-lettered (default: OUTBOX_MAX_ATTEMPTS)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running and poll the outbox')
+        parser.add_argument('--interval', type=float, default=5.0,
+                            help='Seconds between polls when running with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            stats = outbox.drain(options['batch_size'], options['max_attempts'])
+            if any(stats.values()):
+                self.stdout.write(
+                    f"Sent {stats['sent']}, retrying {stats['retried']}, dead-lettered {stats['dead']}"
+                )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Outbox drained'))
@@ -0,0 +1,145 @@
+"""
+Per-request timing and per-view metrics.
+
+TimingMiddleware (inventory.middleware) gives every request a RequestTimings
+that collects database query count and time (through a connection execute
+wrapper) and template render time (through the inventory.templating
+backend). Totals are sent back in a Server-Timing header and aggregated
+into per-URL-name histograms, which the admin-only metrics view renders in
+the Prometheus text format.
+
+Metrics are kept in memory per process; with several workers, each one is
+scraped separately.
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+# Upper bounds, in seconds, of the histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# The RequestTimings of the request being handled, if any
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Time spent in one request, in seconds."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.total = 0.0
+        self.view = 0.0
+        self.db = 0.0
+        self.db_queries = 0
+        self.template = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        """Connection execute wrapper timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db += time.perf_counter() - started
+            self.db_queries += 1
+
+    def finish(self):
+        now = time.perf_counter()
+        self.total = now - self.started
+        if self.view_started is not None:
+            self.view = now - self.view_started
+
+    def server_timing(self):
+        """Value of the Server-Timing header, durations in milliseconds."""
+        return ', '.join([
+            f'db;dur={self.db * 1000:.2f};desc="{self.db_queries} queries"',
+            f'tpl;dur={self.template * 1000:.2f}',
+            f'view;dur={self.view * 1000:.2f}',
+            f'total;dur={self.total * 1000:.2f}',
+        ])
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Registry:
+    """Thread-safe per-view request metrics."""
+
+    HISTOGRAMS = {
+        'request_duration_seconds': 'Time spent handling requests',
+        'request_db_seconds': 'Time spent in database queries per request',
+        'request_template_seconds': 'Time spent rendering templates per request',
+    }
+
+    def __init__(self, prefix='crackers'):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {name: {} for name in self.HISTOGRAMS}
+            self.requests = {}
+            self.db_queries = {}
+
+    def observe(self, view, method, status, timings):
+        values = {
+            'request_duration_seconds': timings.total,
+            'request_db_seconds': timings.db,
+            'request_template_seconds': timings.template,
+        }
+        with self.lock:
+            for name, value in values.items():
+                histogram = self.histograms[name].get(view)
+                if histogram is None:
+                    histogram = self.histograms[name][view] = Histogram()
+                histogram.observe(value)
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.db_queries[view] = self.db_queries.get(view, 0) + timings.db_queries
+
+    def render(self):
+        """Current metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for name, help_text in self.HISTOGRAMS.items():
+                metric = f'{self.prefix}_{name}'
+                lines += [f'# HELP {metric} {help_text}, by URL name.', f'# TYPE {metric} histogram']
+                for view, histogram in sorted(self.histograms[name].items()):
+                    label = f'view="{escape_label(view)}"'
+                    for bound, count in zip(BUCKETS, histogram.buckets):
+                        lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{metric}_sum{{{label}}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{{label}}} {histogram.count}')
+
+            metric = f'{self.prefix}_requests_total'
+            lines += [f'# HELP {metric} Requests handled, by URL name, method and status.', f'# TYPE {metric} counter']
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'{metric}{{view="{escape_label(view)}",method="{escape_label(method)}",status="{status}"}} {count}'
+                )
+
+            metric = f'{self.prefix}_db_queries_total'
+            lines += [f'# HELP {metric} Database queries run, by URL name.', f'# TYPE {metric} counter']
+            for view, count in sorted(self.db_queries.items()):
+                lines.append(f'{metric}{{view="{escape_label(view)}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
@@ -0,0 +1,46 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .metrics import RequestTimings, current_timings, registry
+
+
+def get_view_name(request):
+    """URL name used to label metrics; raw paths would be unbounded."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unmatched>'
+    return match.view_name
+
+
+class TimingMiddleware:
+    """
+    Measures database, template, view and total time for every request,
+    sends them back in a Server-Timing header and records them in the
+    per-view metrics registry. Keep it first in MIDDLEWARE so the total
+    covers every other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = request.timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timings.record_query))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+
+        timings.finish()
+        response['Server-Timing'] = timings.server_timing()
+        registry.observe(get_view_name(request), request.method, response.status_code, timings)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.view_started = time.perf_counter()
+        return None
@@ -0,0 +1,93 @@
+from django.db import migrations, OperationalError
+
+# SQLite-only full-text index for product search (see inventory.search).
+# The triggers below keep it in sync with inventory_product and category
+# renames. They are copied here rather than imported, so later changes to
+# inventory.search cannot change what this migration does.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE inventory_product_fts USING fts5(
+        name, description, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO inventory_product_fts (rowid, name, description, category)
+    SELECT p.id, p.name, p.description, c.name
+    FROM inventory_product p JOIN inventory_category c ON c.id = p.category_id
+    """,
+]
+
+TRIGGER_SQL = [
+    """
+    CREATE TRIGGER inventory_product_fts_insert AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO inventory_product_fts (rowid, name, description, category)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM inventory_category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_product_fts_delete AFTER DELETE ON inventory_product BEGIN
+        DELETE FROM inventory_product_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_product_fts_update
+    AFTER UPDATE OF name, description, category_id ON inventory_product BEGIN
+        UPDATE inventory_product_fts
+        SET name = new.name, description = new.description,
+            category = (SELECT name FROM inventory_category WHERE id = new.category_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_category_fts_update AFTER UPDATE OF name ON inventory_category BEGIN
+        UPDATE inventory_product_fts SET category = new.name
+        WHERE rowid IN (SELECT id FROM inventory_product WHERE category_id = new.id);
+    END
+    """,
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS inventory_category_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_product_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_product_fts_delete",
+    "DROP TRIGGER IF EXISTS inventory_product_fts_insert",
+]
+
+DROP_SQL = DROP_TRIGGER_SQL + [
+    "DROP TABLE IF EXISTS inventory_product_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.fts5_probe")
+        except OperationalError:
+            # SQLite built without FTS5; search falls back to icontains
+            return
+    for sql in CREATE_SQL + TRIGGER_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
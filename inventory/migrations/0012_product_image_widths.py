@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:04
+
+from django.db import migrations, models
+
+# Frozen copy of the product search index triggers (migration 0010), which
+# the table rebuild below drops; later changes to inventory.search must not
+# change what this migration does
+TRIGGER_SQL = [
+    """
+    CREATE TRIGGER inventory_product_fts_insert AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO inventory_product_fts (rowid, name, description, category)
+        VALUES (new.id, new.name, new.description,
+                (SELECT name FROM inventory_category WHERE id = new.category_id));
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_product_fts_delete AFTER DELETE ON inventory_product BEGIN
+        DELETE FROM inventory_product_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_product_fts_update
+    AFTER UPDATE OF name, description, category_id ON inventory_product BEGIN
+        UPDATE inventory_product_fts
+        SET name = new.name, description = new.description,
+            category = (SELECT name FROM inventory_category WHERE id = new.category_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_category_fts_update AFTER UPDATE OF name ON inventory_category BEGIN
+        UPDATE inventory_product_fts SET category = new.name
+        WHERE rowid IN (SELECT id FROM inventory_product WHERE category_id = new.id);
+    END
+    """,
+]
+
+DROP_TRIGGER_SQL = [
+    "DROP TRIGGER IF EXISTS inventory_category_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_product_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_product_fts_delete",
+    "DROP TRIGGER IF EXISTS inventory_product_fts_insert",
+]
+
+
+def has_search_index(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return False
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", ['inventory_product_fts'])
+        return cursor.fetchone() is not None
+
+
+def drop_index_triggers(apps, schema_editor):
+    """RunPython step: remove the sync triggers before a table rebuild."""
+    if has_search_index(schema_editor):
+        for sql in DROP_TRIGGER_SQL:
+            schema_editor.execute(sql)
+
+
+def create_index_triggers(apps, schema_editor):
+    """RunPython step: restore the sync triggers after a table rebuild."""
+    if has_search_index(schema_editor):
+        for sql in DROP_TRIGGER_SQL + TRIGGER_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_customer_orders_keyset_index'),
+    ]
+
+    operations = [
+        # Adding the column rebuilds inventory_product on SQLite
+        migrations.RunPython(drop_index_triggers, create_index_triggers),
+        migrations.AddField(
+            model_name='product',
+            name='image_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(create_index_triggers, drop_index_triggers),
+    ]
@@ -0,0 +1,119 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:31
+
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import TruncDate
+import django.db.models.deletion
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    RunPython step: count the orders placed before the rollups existed, as
+    inventory.rollups.refresh_range does. Later changes only apply deltas,
+    so they need every existing order counted.
+    """
+    db = schema_editor.connection.alias
+    Order = apps.get_model('inventory', 'Order')
+    OrderItem = apps.get_model('inventory', 'OrderItem')
+    DailySales = apps.get_model('inventory', 'DailySales')
+    DailyProductSales = apps.get_model('inventory', 'DailyProductSales')
+    DailyCategorySales = apps.get_model('inventory', 'DailyCategorySales')
+    items = OrderItem.objects.using(db)
+    line_revenue = Sum(F('quantity') * F('price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+    DailySales.objects.using(db).bulk_create([
+        DailySales(day=row['day'], status=row['status'], orders=row['orders'], revenue=row['revenue'] or 0)
+        for row in Order.objects.using(db).annotate(day=TruncDate('created_at')).values('day', 'status').annotate(
+            orders=Count('id'), revenue=Sum('total_amount')
+        ).order_by()
+    ], batch_size=1000)
+    DailyProductSales.objects.using(db).bulk_create([
+        DailyProductSales(
+            day=row['day'], product_id=row['product_id'], status=row['order__status'],
+            units=row['units'], revenue=row['revenue'],
+        )
+        for row in items.annotate(day=TruncDate('order__created_at')).values(
+            'day', 'product_id', 'order__status'
+        ).annotate(units=Sum('quantity'), revenue=line_revenue).order_by()
+    ], batch_size=1000)
+    DailyCategorySales.objects.using(db).bulk_create([
+        DailyCategorySales(
+            day=row['day'], category_id=row['product__category_id'], status=row['order__status'],
+            units=row['units'], revenue=row['revenue'],
+        )
+        for row in items.annotate(day=TruncDate('order__created_at')).values(
+            'day', 'product__category_id', 'order__status'
+        ).annotate(units=Sum('quantity'), revenue=line_revenue).order_by()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_catalog_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCategorySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily category sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyProductSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily product sales',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('shipped', 'Shipped'), ('delivered', 'Delivered'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('orders', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily sales',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailysales',
+            constraint=models.UniqueConstraint(fields=('day', 'status'), name='daily_sales_day_status_uniq'),
+        ),
+        migrations.AddField(
+            model_name='dailyproductsales',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='inventory.product'),
+        ),
+        migrations.AddField(
+            model_name='dailycategorysales',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='inventory.category'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyproductsales',
+            constraint=models.UniqueConstraint(fields=('day', 'product', 'status'), name='daily_product_sales_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailycategorysales',
+            constraint=models.UniqueConstraint(fields=('day', 'category', 'status'), name='daily_category_sales_uniq'),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.conf import settings
+from django.utils import timezone
+
+from . import images
+
+# Products with fewer units than this are flagged as low stock
+LOW_STOCK_THRESHOLD = 10
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -20,15 +27,57 @@ class Product(models.Model):
     stock_quantity = models.IntegerField(validators=[MinValueValidator(0)])
     description = models.TextField()
     image = models.ImageField(upload_to='products/', blank=True, null=True)
+    # Widths of the generated image derivatives (see inventory.images)
+    image_widths = models.JSONField(default=list, blank=True, editable=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Also set by queryset updates that change client-visible fields
+    # (e.g. stock decrements), so catalog API clients can sync incrementally
+    updated_at = models.DateTimeField(auto_now=True)
+    # When this product was last included in a low stock digest
+    low_stock_alerted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.name
 
     @property
     def is_low_stock(self):
-        return self.stock_quantity < 10
+        return self.stock_quantity < LOW_STOCK_THRESHOLD
+
+    @property
+    def image_srcset(self):
+        if not self.image or not self.image_widths:
+            return ''
+        return images.build_srcset(self.image.name, self.image_widths, 'jpeg')
+
+    @property
+    def image_webp_srcset(self):
+        if not self.image or not self.image_widths:
+            return ''
+        return images.build_srcset(self.image.name, self.image_widths, 'webp')
+
+    @property
+    def thumbnail_url(self):
+        """Smallest JPEG derivative, or the original if none exist yet."""
+        if not self.image:
+            return ''
+        if not self.image_widths:
+            return self.image.url
+        return images.derivative_url(self.image.name, self.image_widths[0], 'jpeg')
+
+    class Meta:
+        indexes = [
+            # Storefront catalog: active products per category
+            models.Index(fields=['category', 'id'], condition=models.Q(is_active=True),
+                         name='product_active_category_idx'),
+            # staff_inventory ordering
+            models.Index(fields=['category', 'name'], name='product_category_name_idx'),
+            # Dashboard low stock list; partial so it only holds low stock rows
+            models.Index(fields=['stock_quantity'], condition=models.Q(stock_quantity__lt=LOW_STOCK_THRESHOLD),
+                         name='product_low_stock_idx'),
+            # Incremental catalog API sync (?since=)
+            models.Index(fields=['updated_at'], name='product_updated_idx'),
+        ]
 
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -54,6 +103,14 @@ class Order(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Recent orders on the dashboard and filter_orders('all')
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+            # filter_orders by status
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            # customer_orders keyset pages on (created_at, id)
+            models.Index(fields=['user', '-created_at', '-id'], name='order_user_created_id_idx'),
+        ]
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
@@ -70,3 +127,123 @@ class OrderItem(models.Model):
 
     class Meta:
         unique_together = ['order', 'product']
+
+class OutboxEmail(models.Model):
+    """Email queued for delivery by the send_outbox management command."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    recipients = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)} ({self.status})"
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Due-email scan in send_outbox; partial so sent and dead rows stay out of it
+            models.Index(fields=['next_attempt_at', 'id'], condition=models.Q(status='pending'),
+                         name='outbox_pending_due_idx'),
+            # Expired claims handed back by send_outbox
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status='sending'),
+                         name='outbox_sending_lease_idx'),
+        ]
+
+class DashboardStats(models.Model):
+    """
+    Single-row store of admin dashboard counters, kept up to date by
+    inventory.signals so the dashboard never has to count or sum tables.
+    version changes on every update and is used as the dashboard ETag.
+    """
+    total_users = models.PositiveIntegerField(default=0)
+    total_products = models.PositiveIntegerField(default=0)
+    total_orders = models.PositiveIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dashboard stats (version {self.version})"
+
+    class Meta:
+        verbose_name_plural = "Dashboard stats"
+
+class CatalogVersion(models.Model):
+    """
+    Single-row storefront catalog version, bumped on every Product or
+    Category change (see inventory.catalog). Kept in the database rather
+    than the per-process cache so every worker sees a bump at once and
+    serves the same catalog ETag.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Catalog version {self.version}"
+
+class DailySales(models.Model):
+    """
+    Orders and revenue per day and order status. This and the two tables
+    below are kept up to date with per-order deltas by inventory.rollups,
+    so analytics never scan order rows.
+    """
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    orders = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.orders} orders"
+
+    class Meta:
+        verbose_name_plural = "Daily sales"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='daily_sales_day_status_uniq'),
+        ]
+
+class DailyProductSales(models.Model):
+    """Units sold and line revenue per day, product and order status."""
+    day = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.product_id} {self.status}: {self.units} units"
+
+    class Meta:
+        verbose_name_plural = "Daily product sales"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'product', 'status'], name='daily_product_sales_uniq'),
+        ]
+
+class DailyCategorySales(models.Model):
+    """Units sold and line revenue per day, category and order status."""
+    day = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_sales')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.day} {self.category_id} {self.status}: {self.units} units"
+
+    class Meta:
+        verbose_name_plural = "Daily category sales"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category', 'status'], name='daily_category_sales_uniq'),
+        ]
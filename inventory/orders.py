@@ -0,0 +1,276 @@
+"""
+Order placement.
+
+Checkout runs as a batched pipeline with a fixed number of queries no matter
+how many lines the cart has:
+1. one in_bulk fetch of every product in the cart
+2. one INSERT for the order
+3. one bulk_create for the order items
+4. one conditional UPDATE decrementing stock with F() expressions
+5. one UPDATE claiming low stock alerts (see utils.notify_low_stock)
+6. one upsert into each daily sales rollup (see inventory.rollups)
+plus one outbox INSERT for the confirmation, and occasionally a low stock
+digest when a product is newly below threshold.
+
+Status changes go through transition_orders, which checks each order
+against STATUS_TRANSITIONS and moves every allowed one in a single UPDATE.
+"""
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from crackers_ecommerce.db.transaction import immediate_atomic, retry_on_lock
+
+from . import events, rollups, utils
+from .catalog import bump_catalog_version
+from .invoices import invalidate_invoices
+from .models import Order, OrderItem, Product
+from .stats import adjust_stats, delivered_revenue
+
+# Statuses an order may move to from each status
+STATUS_TRANSITIONS = {
+    'pending': {'processing', 'cancelled'},
+    'processing': {'shipped', 'cancelled'},
+    'shipped': {'delivered'},
+    'delivered': set(),
+    'cancelled': set(),
+}
+
+# Statuses the customer is emailed about
+NOTIFY_STATUSES = {'shipped', 'delivered', 'cancelled'}
+
+# Per-order outcomes of transition_orders
+UPDATED = 'updated'
+NOT_ALLOWED = 'not_allowed'
+NOT_FOUND = 'not_found'
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be turned into an order."""
+
+
+class TransitionError(Exception):
+    """Raised when a status change request is invalid as a whole."""
+
+
+def parse_cart(cart_items):
+    """
+    Turn the cartItems payload into {product_id: quantity}.
+    Raises CheckoutError on malformed items or non-positive quantities.
+    Names and prices sent by the client are ignored; lines are priced from
+    the catalog.
+    """
+    quantities = {}
+    for product_id, item in cart_items.items():
+        try:
+            quantity = int(item['quantity'])
+            product_id = int(product_id)
+        except (KeyError, TypeError, ValueError):
+            raise CheckoutError(f'Invalid cart item for product {product_id}')
+        if quantity <= 0 or product_id in quantities:
+            raise CheckoutError(f'Invalid quantity for product {product_id}')
+        quantities[product_id] = quantity
+    return quantities
+
+
+def decrement_stock(quantities):
+    """
+    Decrement stock for every product in one UPDATE.
+    Rows are only updated when they still hold enough stock, so stock never
+    goes negative even under concurrent checkouts. Returns the number of
+    rows updated.
+    """
+    enough_stock = reduce(or_, (
+        Q(id=product_id, stock_quantity__gte=quantity)
+        for product_id, quantity in quantities.items()
+    ))
+    new_stock = Case(*(
+        When(id=product_id, then=F('stock_quantity') - quantity)
+        for product_id, quantity in quantities.items()
+    ))
+    # updated_at too: queryset updates skip auto_now, and API clients sync on it
+    return Product.objects.filter(enough_stock).update(stock_quantity=new_stock, updated_at=timezone.now())
+
+
+def place_order(user, customer_data, cart_items):
+    """
+    Create an order for the cart, decrement stock and queue notifications.
+    Raises CheckoutError (with a customer-facing message) if the cart is
+    invalid or any product is out of stock; nothing is written in that case.
+
+    The order is written in an IMMEDIATE transaction, which holds the write
+    lock from the first read, and retried if the database stays locked
+    beyond the busy timeout.
+    """
+    quantities = parse_cart(cart_items)
+    return retry_on_lock(
+        lambda: create_order(user, customer_data, quantities),
+        attempts=settings.CHECKOUT_LOCK_RETRIES,
+        backoff=settings.CHECKOUT_RETRY_BACKOFF,
+    )
+
+
+def create_order(user, customer_data, quantities):
+    with immediate_atomic():
+        products = Product.objects.in_bulk(list(quantities))
+        for product_id, quantity in quantities.items():
+            product = products.get(product_id)
+            if product is None:
+                raise CheckoutError(f'Product with ID {product_id} not found')
+            if product.stock_quantity < quantity:
+                raise CheckoutError(f'Insufficient stock for {product.name}')
+
+        # Lines are priced from the catalog, never from the client's cart
+        lines = {}
+        for product_id, quantity in quantities.items():
+            product = products[product_id]
+            lines[product_id] = {
+                'name': product.name,
+                'price': product.price,
+                'quantity': quantity,
+                'total': product.price * quantity,
+            }
+        total_amount = sum(line['total'] for line in lines.values())
+
+        order = Order.objects.create(
+            user=user if user.is_authenticated else None,
+            full_name=customer_data['fullName'],
+            address=customer_data['deliveryAddress'],
+            phone=customer_data['phone'],
+            email=customer_data['email'],
+            total_amount=total_amount,
+            status='pending'
+        )
+
+        items = OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product=products[product_id],
+                quantity=line['quantity'],
+                price=line['price']
+            )
+            for product_id, line in lines.items()
+        ])
+        # bulk_create sends no signals, so count the lines here
+        rollups.add_items(items)
+
+        # Stock may have been taken by a concurrent checkout since the read
+        # above; roll everything back if any row could not be decremented
+        if decrement_stock(quantities) != len(quantities):
+            raise CheckoutError('Insufficient stock for one or more products')
+
+        # update() bypasses model signals, so invalidate the catalog here
+        bump_catalog_version()
+        transaction.on_commit(bump_catalog_version)
+
+        # Notifications go to the outbox in the same transaction, so they
+        # are only queued if the order commits
+        utils.notify_low_stock(list(quantities))
+
+        try:
+            utils.send_order_confirmation({
+                'customerData': customer_data,
+                'cartItems': lines,
+                'orderId': order.id
+            })
+        except ValidationError:
+            # Already logged; bad contact details must not block the order
+            pass
+
+    return order, total_amount
+
+
+def transition_orders(status, order_ids=None, current_status=None):
+    """
+    Move the orders with the given ids, or every order currently in
+    current_status, to status.
+
+    Orders whose current status allows the move (see STATUS_TRANSITIONS)
+    are updated in one UPDATE; the rest are left alone. Returns
+    (outcomes, has_more): one {'id', 'outcome', 'status'} dict per targeted
+    order, oldest first, where status is the order's status afterwards, and
+    whether a current_status filter matched more than
+    ORDER_BULK_STATUS_LIMIT orders (only the oldest are moved; call again
+    for the rest). Raises TransitionError for unknown statuses or when
+    neither or both targets are given.
+    """
+    statuses = dict(Order.STATUS_CHOICES)
+    if status not in statuses:
+        raise TransitionError(f'Unknown status: {status}')
+    if (order_ids is None) == (current_status is None):
+        raise TransitionError('Give either order ids or a current status')
+    if current_status is not None and current_status not in statuses:
+        raise TransitionError(f'Unknown status: {current_status}')
+    limit = settings.ORDER_BULK_STATUS_LIMIT
+    if order_ids is not None:
+        try:
+            order_ids = list(dict.fromkeys(int(order_id) for order_id in order_ids))
+        except (TypeError, ValueError):
+            raise TransitionError('Order ids must be integers')
+        if len(order_ids) > limit:
+            raise TransitionError(f'At most {limit} orders can be changed at once')
+
+    return retry_on_lock(
+        lambda: apply_transition(status, order_ids, current_status, limit),
+        attempts=settings.CHECKOUT_LOCK_RETRIES,
+        backoff=settings.CHECKOUT_RETRY_BACKOFF,
+    )
+
+
+def apply_transition(status, order_ids, current_status, limit):
+    allowed_from = {source for source, targets in STATUS_TRANSITIONS.items() if status in targets}
+    with immediate_atomic():
+        orders = Order.objects.all()
+        if order_ids is not None:
+            orders = orders.filter(id__in=order_ids)
+        else:
+            orders = orders.filter(status=current_status)
+        rows = list(orders.order_by('created_at', 'id').values(
+            'id', 'status', 'full_name', 'email', 'total_amount', 'created_at'
+        )[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        moved = [row for row in rows if row['status'] in allowed_from]
+        if moved:
+            # Queryset update: no signals and no auto_now, so updated_at
+            # (invoice cache key, API sync) and the follow-ups are done here
+            Order.objects.filter(id__in=[row['id'] for row in moved], status__in=allowed_from).update(
+                status=status, updated_at=timezone.now()
+            )
+            after_transition(moved, status)
+
+    outcomes = []
+    for row in rows:
+        if row['status'] in allowed_from:
+            outcomes.append({'id': row['id'], 'outcome': UPDATED, 'status': status})
+        else:
+            outcomes.append({'id': row['id'], 'outcome': NOT_ALLOWED, 'status': row['status']})
+    if order_ids is not None:
+        found = {row['id'] for row in rows}
+        outcomes += [{'id': order_id, 'outcome': NOT_FOUND, 'status': None}
+                     for order_id in order_ids if order_id not in found]
+    return outcomes, has_more
+
+
+def after_transition(orders, status):
+    """
+    Batched follow-ups the Order signal handlers do for single saves:
+    dashboard counters, one live event, cached invoices, sales rollups and
+    customer emails.
+    """
+    adjust_stats(total_revenue=sum(
+        delivered_revenue(status, order['total_amount']) - delivered_revenue(order['status'], order['total_amount'])
+        for order in orders
+    ))
+    order_ids = [order['id'] for order in orders]
+    events.publish_on_commit(events.ORDERS_STATUS_CHANGED, {'ids': order_ids, 'status': status})
+    transaction.on_commit(lambda: invalidate_invoices(order_ids))
+    rollups.move_orders(orders, status)
+    if status in NOTIFY_STATUSES:
+        utils.send_status_updates(orders, status)
@@ -0,0 +1,162 @@
+"""
+Persistent email outbox.
+
+Emails are written to the OutboxEmail table instead of being sent from the
+request thread. The send_outbox management command drains the table in
+batches over a single reused SMTP connection, retrying failures with
+exponential backoff and dead-lettering messages that keep failing.
+
+Each batch is claimed with a conditional UPDATE (pending -> sending) before
+anything is sent, so concurrent workers never send the same email twice.
+A claim is a lease: its next_attempt_at is pushed OUTBOX_CLAIM_TIMEOUT into
+the future, and rows left in 'sending' by a worker that died are handed
+back once the lease runs out.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, message, recipient_list, html_message=None, from_email=None):
+    """Queue an email for delivery by the outbox worker."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def enqueue_emails(messages):
+    """
+    Queue many emails with one INSERT. messages are dicts with the
+    arguments of enqueue_email.
+    """
+    return OutboxEmail.objects.bulk_create([
+        OutboxEmail(
+            subject=message['subject'],
+            body=message['message'],
+            html_body=message.get('html_message') or '',
+            from_email=message.get('from_email') or settings.DEFAULT_FROM_EMAIL,
+            recipients=list(message['recipient_list']),
+        )
+        for message in messages
+    ])
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2x base, 4x base, ... after each failure."""
+    return timedelta(seconds=settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.recipients,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def claim_batch(batch_size, now):
+    """
+    Claim up to batch_size due emails for this worker and return them.
+    Rows another worker claimed first are skipped.
+    """
+    # Hand back claims whose worker died before recording the outcome
+    OutboxEmail.objects.filter(status='sending', next_attempt_at__lte=now).update(status='pending')
+
+    ids = list(
+        OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    # The lease expiry doubles as this worker's claim marker
+    lease = now + timedelta(seconds=settings.OUTBOX_CLAIM_TIMEOUT)
+    claimed = OutboxEmail.objects.filter(id__in=ids, status='pending').update(
+        status='sending', next_attempt_at=lease
+    )
+    if not claimed:
+        return []
+    return list(OutboxEmail.objects.filter(id__in=ids, status='sending', next_attempt_at=lease))
+
+
+def deliver_batch(batch_size=None, max_attempts=None):
+    """
+    Claim and send up to batch_size due emails over one connection.
+    Returns a dict with sent, retried and dead counts.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+    now = timezone.now()
+    batch = claim_batch(batch_size, now)
+    stats = {'sent': 0, 'retried': 0, 'dead': 0}
+    if not batch:
+        return stats
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing can be sent without a connection; count it as an attempt for all
+        logger.error(f"Failed to open email connection: {str(e)}")
+        for email in batch:
+            record_failure(email, e, now, max_attempts, stats)
+    else:
+        try:
+            for email in batch:
+                try:
+                    build_message(email, connection).send()
+                except Exception as e:
+                    record_failure(email, e, now, max_attempts, stats)
+                else:
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.attempts += 1
+                    stats['sent'] += 1
+        finally:
+            connection.close()
+
+    OutboxEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+    )
+    return stats
+
+
+def record_failure(email, error, now, max_attempts, stats):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= max_attempts:
+        email.status = 'dead'
+        stats['dead'] += 1
+        logger.error(f"Email #{email.id} to {email.recipients} dead-lettered after {email.attempts} attempts: {str(error)}")
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        stats['retried'] += 1
+        logger.warning(f"Email #{email.id} to {email.recipients} failed, retrying: {str(error)}")
+
+
+def drain(batch_size=None, max_attempts=None):
+    """Deliver batches until no due emails remain. Returns summed stats."""
+    totals = {'sent': 0, 'retried': 0, 'dead': 0}
+    while True:
+        stats = deliver_batch(batch_size, max_attempts)
+        for key, value in stats.items():
+            totals[key] += value
+        if not any(stats.values()):
+            return totals
@@ -0,0 +1,45 @@
+"""
+Keyset (cursor) pagination for newest-first listings.
+
+Pages are ordered by (created_at, id) descending and each page continues
+strictly after the last row of the previous one, so fetching page N costs
+the same as page 1 and rows inserted meanwhile never shift or repeat items.
+Cursors are opaque URL-safe strings encoding that last (created_at, id).
+"""
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+
+
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f'Invalid cursor: {cursor!r}') from e
+
+
+def keyset_page(queryset, cursor=None, page_size=20):
+    """
+    Return (objects, next_cursor) for the page after cursor, newest first.
+    next_cursor is None on the last page. One extra row is fetched to tell
+    whether another page follows, so no COUNT query is needed.
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    objects = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(objects) > page_size:
+        objects = objects[:page_size]
+        next_cursor = encode_cursor(objects[-1])
+    return objects, next_cursor
@@ -0,0 +1,378 @@
+"""
+Daily sales rollups.
+
+DailySales (per status), DailyProductSales and DailyCategorySales (per
+product or category and status) hold one row per day and group. They are
+maintained incrementally, in the transaction that changes the orders:
+
+- add_orders and add_items count new orders and order lines
+- move_orders moves orders and their lines from their old status to a new one
+- update_order and update_item apply a saved order's new status or total and
+  an edited line's new product, quantity or price
+- remove_orders and remove_items take deleted orders and lines off (an order
+  delete cascades to its lines, which are taken off one by one)
+
+Each change is applied as deltas: one INSERT ... ON CONFLICT DO UPDATE per
+table adding to the rows it touches (creating missing ones), and one UPDATE
+with F() expressions per table subtracting from rows an order left. Checkout
+calls add_items for its bulk-created lines; the signal handlers in
+inventory.signals and transition_orders in inventory.orders do the rest.
+
+refresh_range recomputes days from orders with GROUP BY queries. It is only
+used by rebuild_all and the refresh_sales_rollups command, to repair rollups
+after writes that bypass the above (raw SQL, queryset updates of created_at
+or order items). Migration 0014 backfills the orders that predate the
+rollups the same way.
+
+sales_by_day, top_products and category_share read only the rollups and
+return chart-ready series for the analytics endpoints. Days are calendar
+days in the current time zone.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, DecimalField, F, Max, Min, Q, Sum, Value, When
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from crackers_ecommerce.db.transaction import immediate_atomic
+
+from .models import DailyCategorySales, DailyProductSales, DailySales, Order, OrderItem, Product
+
+ROLLUP_MODELS = (DailySales, DailyProductSales, DailyCategorySales)
+
+# Fields identifying a row of each rollup, and the field counting orders or
+# units; every rollup also sums revenue
+ROLLUP_KEYS = {
+    DailySales: ('day', 'status'),
+    DailyProductSales: ('day', 'product_id', 'status'),
+    DailyCategorySales: ('day', 'category_id', 'status'),
+}
+ROLLUP_COUNTS = {DailySales: 'orders', DailyProductSales: 'units', DailyCategorySales: 'units'}
+
+# Statuses counted as sales when an analytics request names none
+SALES_STATUSES = ('pending', 'processing', 'shipped', 'delivered')
+
+# Days rebuilt per transaction by rebuild_all
+REBUILD_WINDOW_DAYS = 31
+
+CENT = Decimal('0.01')
+
+
+def money(value):
+    """value (Decimal, float or str) as a Decimal rounded to cents."""
+    return Decimal(str(value)).quantize(CENT)
+
+
+def order_day(created_at):
+    return timezone.localdate(created_at)
+
+
+class Deltas:
+    """Changes to the rollups, summed per row until applied."""
+
+    def __init__(self):
+        self.rows = {model: {} for model in ROLLUP_MODELS}
+
+    def add(self, model, key, count, revenue):
+        row = self.rows[model].setdefault(key, [0, Decimal('0')])
+        row[0] += count
+        row[1] += revenue
+
+    def add_order(self, day, status, total_amount, sign=1):
+        self.add(DailySales, (day, status), sign, sign * money(total_amount))
+
+    def add_line(self, day, status, product_id, category_id, quantity, price, sign=1):
+        revenue = sign * quantity * money(price)
+        self.add(DailyProductSales, (day, product_id, status), sign * quantity, revenue)
+        self.add(DailyCategorySales, (day, category_id, status), sign * quantity, revenue)
+
+    def apply(self):
+        # No savepoint: callers are usually in a transaction already
+        with transaction.atomic(savepoint=False):
+            for model, rows in self.rows.items():
+                # Rows with no change in count go by their change in revenue
+                increments = {key: row for key, row in rows.items() if (row[0], row[1]) > (0, 0)}
+                decrements = {key: row for key, row in rows.items() if (row[0], row[1]) < (0, 0)}
+                if increments:
+                    upsert(model, increments)
+                if decrements:
+                    subtract(model, decrements)
+
+
+def batches(keys, params_per_key):
+    """Split keys so no statement exceeds the database's parameter limit."""
+    size = max(1, (connection.features.max_query_params or 10000) // params_per_key)
+    for start in range(0, len(keys), size):
+        yield keys[start:start + size]
+
+
+def upsert(model, rows):
+    """Add rows ({key: [count, revenue]}) to model, creating missing rows."""
+    opts = model._meta
+    fields = [opts.get_field(name) for name in ROLLUP_KEYS[model] + (ROLLUP_COUNTS[model], 'revenue')]
+    quote = connection.ops.quote_name
+    table = quote(opts.db_table)
+    columns = [quote(field.column) for field in fields]
+    keys, totals = columns[:-2], columns[-2:]
+    for batch in batches(list(rows), len(fields)):
+        values = ', '.join(['(' + ', '.join(['%s'] * len(fields)) + ')'] * len(batch))
+        params = [
+            field.get_db_prep_save(value, connection)
+            for key in batch
+            for field, value in zip(fields, (*key, *rows[key]))
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} "
+                f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+                + ', '.join(f'{column} = {table}.{column} + excluded.{column}' for column in totals),
+                params,
+            )
+
+
+def subtract(model, rows):
+    """
+    Take rows ({key: [negative count, negative revenue]}) off model in one
+    UPDATE per batch. Emptied rows are kept and skipped by the readers
+    below. Counts and revenue stop at zero, and missing rows are left
+    missing, so an order that was never counted (e.g. by writes that
+    bypassed the deltas) cannot drive a row negative; refresh_sales_rollups
+    repairs such days.
+    """
+    key_fields = ROLLUP_KEYS[model]
+    fields = [model._meta.get_field(name) for name in (ROLLUP_COUNTS[model], 'revenue')]
+    for batch in batches(list(rows), 3 * len(key_fields) + 2):
+        matches = [Q(**dict(zip(key_fields, key))) for key in batch]
+        model.objects.filter(reduce(or_, matches)).update(**{
+            field.name: Case(
+                *(
+                    When(match, then=Greatest(F(field.name) + rows[key][i], Value(0), output_field=field))
+                    for match, key in zip(matches, batch)
+                ),
+                default=F(field.name),
+                output_field=field,
+            )
+            for i, field in enumerate(fields)
+        })
+
+
+def order_lines(order_ids):
+    """{order id: [(product id, category id, quantity, price)]} in one query."""
+    lines = {}
+    for order_id, *line in OrderItem.objects.filter(order_id__in=order_ids).values_list(
+        'order_id', 'product_id', 'product__category_id', 'quantity', 'price'
+    ):
+        lines.setdefault(order_id, []).append(line)
+    return lines
+
+
+def add_orders(orders):
+    """Count new Order instances; their lines are counted by add_items."""
+    deltas = Deltas()
+    for order in orders:
+        deltas.add_order(order_day(order.created_at), order.status, order.total_amount)
+    deltas.apply()
+
+
+def add_items(items):
+    """Count new OrderItem instances under their order's day and status."""
+    deltas = Deltas()
+    for item in items:
+        order = item.order
+        deltas.add_line(
+            order_day(order.created_at), order.status, item.product_id, item.product.category_id,
+            item.quantity, item.price,
+        )
+    deltas.apply()
+
+
+def move_orders(orders, status):
+    """
+    Move orders (dicts with id, status, total_amount and created_at, status
+    being the one they are counted under) and their lines to status.
+    """
+    orders = [order for order in orders if order['status'] != status]
+    if not orders:
+        return
+    lines = order_lines([order['id'] for order in orders])
+    deltas = Deltas()
+    for order in orders:
+        day = order_day(order['created_at'])
+        for old_or_new, sign in ((order['status'], -1), (status, 1)):
+            deltas.add_order(day, old_or_new, order['total_amount'], sign)
+            for product_id, category_id, quantity, price in lines.get(order['id'], []):
+                deltas.add_line(day, old_or_new, product_id, category_id, quantity, price, sign)
+    deltas.apply()
+
+
+def update_order(order, old_status, old_total):
+    """
+    Move a saved Order instance from old_status and old_total to its current
+    status and total; its lines move with the status.
+    """
+    day = order_day(order.created_at)
+    deltas = Deltas()
+    deltas.add_order(day, old_status, old_total, -1)
+    deltas.add_order(day, order.status, order.total_amount)
+    if order.status != old_status:
+        for product_id, category_id, quantity, price in order_lines([order.id]).get(order.id, []):
+            deltas.add_line(day, old_status, product_id, category_id, quantity, price, -1)
+            deltas.add_line(day, order.status, product_id, category_id, quantity, price)
+    deltas.apply()
+
+
+def update_item(item, old_product_id, old_quantity, old_price):
+    """Replace the line a saved OrderItem instance was counted as with its current one."""
+    order = item.order
+    day = order_day(order.created_at)
+    categories = dict(Product.objects.filter(id__in={old_product_id, item.product_id}).values_list('id', 'category_id'))
+    deltas = Deltas()
+    deltas.add_line(day, order.status, old_product_id, categories.get(old_product_id), old_quantity, old_price, -1)
+    deltas.add_line(day, order.status, item.product_id, categories[item.product_id], item.quantity, item.price)
+    deltas.apply()
+
+
+def remove_orders(order_ids):
+    """
+    Take orders off DailySales, as stored; call before deleting them. Their
+    lines are taken off by remove_items as the delete cascades to them.
+    """
+    deltas = Deltas()
+    for order in Order.objects.filter(id__in=order_ids).values('status', 'total_amount', 'created_at'):
+        deltas.add_order(order_day(order['created_at']), order['status'], order['total_amount'], -1)
+    deltas.apply()
+
+
+def remove_items(item_ids):
+    """Take order lines off, as stored; call before deleting them."""
+    deltas = Deltas()
+    for created_at, status, product_id, category_id, quantity, price in OrderItem.objects.filter(
+        id__in=item_ids
+    ).values_list('order__created_at', 'order__status', 'product_id', 'product__category_id', 'quantity', 'price'):
+        deltas.add_line(order_day(created_at), status, product_id, category_id, quantity, price, -1)
+    deltas.apply()
+
+
+def day_bounds(first_day, last_day):
+    """Aware datetimes from the start of first_day to the end of last_day."""
+    start = timezone.make_aware(datetime.combine(first_day, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(last_day + timedelta(days=1), datetime.min.time()))
+    return start, end
+
+
+def refresh_range(first_day, last_day):
+    """Rebuild every rollup row from first_day to last_day inclusive."""
+    start, end = day_bounds(first_day, last_day)
+    orders = Order.objects.filter(created_at__gte=start, created_at__lt=end)
+    items = OrderItem.objects.filter(order__created_at__gte=start, order__created_at__lt=end)
+    line_revenue = Sum(F('quantity') * F('price'), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+    # IMMEDIATE so no order can change between reading and replacing
+    with immediate_atomic():
+        daily = [
+            DailySales(day=row['day'], status=row['status'], orders=row['orders'], revenue=row['revenue'] or 0)
+            for row in orders.annotate(day=TruncDate('created_at')).values('day', 'status').annotate(
+                orders=Count('id'), revenue=Sum('total_amount')
+            ).order_by()
+        ]
+        products = [
+            DailyProductSales(
+                day=row['day'], product_id=row['product_id'], status=row['order__status'],
+                units=row['units'], revenue=row['revenue'],
+            )
+            for row in items.annotate(day=TruncDate('order__created_at')).values(
+                'day', 'product_id', 'order__status'
+            ).annotate(units=Sum('quantity'), revenue=line_revenue).order_by()
+        ]
+        categories = [
+            DailyCategorySales(
+                day=row['day'], category_id=row['product__category_id'], status=row['order__status'],
+                units=row['units'], revenue=row['revenue'],
+            )
+            for row in items.annotate(day=TruncDate('order__created_at')).values(
+                'day', 'product__category_id', 'order__status'
+            ).annotate(units=Sum('quantity'), revenue=line_revenue).order_by()
+        ]
+        for model, rows in zip(ROLLUP_MODELS, (daily, products, categories)):
+            model.objects.filter(day__gte=first_day, day__lte=last_day).delete()
+            model.objects.bulk_create(rows, batch_size=1000)
+
+
+def rebuild_all(first_day=None, last_day=None):
+    """
+    Rebuild the rollups from first_day to last_day, REBUILD_WINDOW_DAYS per
+    transaction. first_day defaults to last_day and last_day to today; with
+    neither given, rebuilds every day from the oldest to the newest order
+    and drops rows outside that range. Returns the number of days covered.
+    """
+    if first_day is None and last_day is None:
+        bounds = Order.objects.aggregate(first=Min('created_at'), last=Max('created_at'))
+        if bounds['first'] is None:
+            for model in ROLLUP_MODELS:
+                model.objects.all().delete()
+            return 0
+        first_day, last_day = timezone.localdate(bounds['first']), timezone.localdate(bounds['last'])
+        # Days no order falls on any more
+        for model in ROLLUP_MODELS:
+            model.objects.exclude(day__gte=first_day, day__lte=last_day).delete()
+
+    first_day = first_day or last_day
+    last_day = last_day or timezone.localdate()
+    day = first_day
+    while day <= last_day:
+        window_end = min(day + timedelta(days=REBUILD_WINDOW_DAYS - 1), last_day)
+        refresh_range(day, window_end)
+        day = window_end + timedelta(days=1)
+    return max(0, (last_day - first_day).days + 1)
+
+
+def sales_by_day(first_day, last_day, statuses):
+    """Orders and revenue per day, zero-filled, as chart series."""
+    totals = {
+        row['day']: row
+        for row in DailySales.objects.filter(
+            day__gte=first_day, day__lte=last_day, status__in=statuses
+        ).values('day').annotate(orders=Sum('orders'), revenue=Sum('revenue')).order_by()
+    }
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    return {
+        'labels': [day.isoformat() for day in days],
+        'orders': [totals[day]['orders'] if day in totals else 0 for day in days],
+        'revenue': [float(totals[day]['revenue']) if day in totals else 0.0 for day in days],
+    }
+
+
+def top_products(first_day, last_day, statuses, limit, order_by='units'):
+    """The limit best-selling products by units or revenue, as chart series."""
+    rows = list(DailyProductSales.objects.filter(
+        day__gte=first_day, day__lte=last_day, status__in=statuses
+    ).filter(units__gt=0).values('product_id', 'product__name').annotate(
+        units=Sum('units'), revenue=Sum('revenue')
+    ).order_by(f'-{order_by}', 'product_id')[:limit])
+    return {
+        'labels': [row['product__name'] for row in rows],
+        'product_ids': [row['product_id'] for row in rows],
+        'units': [row['units'] for row in rows],
+        'revenue': [float(row['revenue']) for row in rows],
+    }
+
+
+def category_share(first_day, last_day, statuses):
+    """Units, revenue and percentage of revenue per category, as chart series."""
+    rows = list(DailyCategorySales.objects.filter(
+        day__gte=first_day, day__lte=last_day, status__in=statuses
+    ).filter(units__gt=0).values('category_id', 'category__name').annotate(
+        units=Sum('units'), revenue=Sum('revenue')
+    ).order_by('-revenue', 'category_id'))
+    total = sum(row['revenue'] for row in rows)
+    return {
+        'labels': [row['category__name'] for row in rows],
+        'category_ids': [row['category_id'] for row in rows],
+        'units': [row['units'] for row in rows],
+        'revenue': [float(row['revenue']) for row in rows],
+        'share': [round(float(row['revenue'] / total * 100), 1) if total else 0.0 for row in rows],
+    }
@@ -0,0 +1,113 @@
+"""
+Product search.
+
+On SQLite, products are indexed in an FTS5 table (inventory_product_fts)
+covering name, description and category name. Triggers created by migration
+0010 keep it in sync with every insert, update and delete, including bulk
+and F()-expression updates that bypass model signals. Every search term is
+matched as a prefix and results are ranked with bm25, weighting name over
+category over description. The index stores 2 and 3 character prefixes, so
+one-character terms are slow to match; typeahead ignores them and ranks only
+a capped number of candidates, taking name matches first.
+
+Other databases, or SQLite builds without FTS5, fall back to an unranked
+name__icontains filter.
+
+SQLite migrations that rebuild inventory_product or inventory_category (e.g.
+adding a field with a default) must drop the triggers before and recreate
+them after the schema change, or the rebuild fails and the triggers are
+lost. Each such migration carries its own copy of the trigger SQL (see 0013).
+"""
+import re
+
+from django.db import OperationalError, connection
+
+from .models import Product
+
+FTS_TABLE = 'inventory_product_fts'
+
+# bm25 column weights: name, description, category
+RANK_WEIGHTS = (10.0, 1.0, 5.0)
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(query, min_length=1):
+    """
+    Turn user input into an FTS5 query: each word of at least min_length
+    characters becomes a quoted prefix term and all terms must match.
+    Returns '' if there is nothing to search.
+    """
+    return ' AND '.join(f'"{term}"*' for term in TERM_RE.findall(query) if len(term) >= min_length)
+
+
+def ranked_query(match, limit, candidates=None):
+    """
+    SQL and params selecting up to limit ids for an FTS5 match, best first.
+    With candidates, only the first that many matches (in index order) are
+    ranked, so common prefixes don't score every product in the catalog.
+    """
+    score = f"bm25({FTS_TABLE}, %s, %s, %s)"
+    if candidates is None:
+        return (
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY {score} LIMIT %s",
+            [match, *RANK_WEIGHTS, limit],
+        )
+    return (
+        f"SELECT rowid FROM (SELECT rowid, {score} AS score FROM {FTS_TABLE} "
+        f"WHERE {FTS_TABLE} MATCH %s LIMIT %s) ORDER BY score LIMIT %s",
+        [*RANK_WEIGHTS, match, candidates, limit],
+    )
+
+
+def name_match(match):
+    """Restrict an FTS5 query to the name column."""
+    return f'name : ({match})'
+
+
+def search_product_ids(query, limit, candidates=None, min_length=1):
+    """
+    Return up to limit product ids matching query, best match first.
+    With candidates, name matches are ranked on their own and matches in
+    other columns only fill the places left, so the capped candidate set
+    cannot crowd a name match out with older description matches.
+    """
+    match = build_match_query(query, min_length)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        if candidates is None:
+            cursor.execute(*ranked_query(match, limit))
+            return [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(*ranked_query(name_match(match), limit, candidates))
+        ids = [row[0] for row in cursor.fetchall()]
+        if len(ids) < limit:
+            # Every name match fit in the candidates, so only other columns remain
+            other = f'({match}) NOT {name_match(match)}'
+            cursor.execute(*ranked_query(other, limit - len(ids), candidates))
+            ids += [row[0] for row in cursor.fetchall()]
+        return ids
+
+
+def search_products(query, limit, candidates=None, min_length=1):
+    """
+    Return a list of up to limit products matching query, ranked by
+    relevance, with their categories loaded. candidates caps how many
+    matches are ranked and words shorter than min_length are ignored (see
+    search_product_ids and build_match_query).
+    """
+    if connection.vendor == 'sqlite':
+        try:
+            ids = search_product_ids(query, limit, candidates, min_length)
+        except OperationalError:
+            # FTS table missing (FTS5 not compiled into this SQLite)
+            pass
+        else:
+            products = Product.objects.select_related('category').in_bulk(ids)
+            return [products[product_id] for product_id in ids if product_id in products]
+
+    return list(
+        Product.objects.filter(name__icontains=query)
+        .select_related('category').order_by('category', 'name')[:limit]
+    )
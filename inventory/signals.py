@@ -0,0 +1,198 @@
+"""
+Signal handlers for the inventory app.
+Invalidates the cached storefront catalog whenever products or categories change,
+keeps the admin dashboard counters and daily sales rollups up to date,
+publishes live dashboard events, drops cached invoice PDFs for changed orders
+and generates resized copies of new product images.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import events, images, rollups
+from .catalog import bump_catalog_version
+from .invoices import invalidate_invoice
+from .models import Category, Order, OrderItem, Product
+from .stats import adjust_stats, delivered_revenue
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog(sender, **kwargs):
+    """
+    Bump the catalog version on any Product or Category save or delete.
+    Covers staff_inventory, quick_add_stock, checkout and the Django admin.
+    """
+    bump_catalog_version()
+    # Bump again after commit so a catalog rebuilt from pre-commit data
+    # while the transaction was open is never served
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_init, sender=Order)
+def remember_order_state(sender, instance, **kwargs):
+    """Remember the loaded status and total so saves can compute deltas."""
+    instance._loaded_status = instance.__dict__.get('status')
+    instance._loaded_total = instance.__dict__.get('total_amount')
+    instance._loaded_revenue = delivered_revenue(
+        instance._loaded_status, instance.__dict__.get('total_amount')
+    )
+
+
+@receiver(post_save, sender=Order)
+def count_order_save(sender, instance, created, **kwargs):
+    revenue = delivered_revenue(instance.status, instance.total_amount)
+    if created:
+        adjust_stats(total_orders=1, total_revenue=revenue)
+    else:
+        adjust_stats(total_revenue=revenue - instance._loaded_revenue)
+    instance._loaded_revenue = revenue
+
+
+@receiver(post_save, sender=Order)
+def update_order_rollups(sender, instance, created, **kwargs):
+    # Registered before publish_order_event, which resets _loaded_status
+    if created:
+        rollups.add_orders([instance])
+    elif instance._loaded_status is not None and instance._loaded_total is not None and (
+        instance.status != instance._loaded_status
+        or rollups.money(instance.total_amount) != rollups.money(instance._loaded_total)
+    ):
+        rollups.update_order(instance, instance._loaded_status, instance._loaded_total)
+    instance._loaded_total = instance.total_amount
+
+
+@receiver(post_init, sender=OrderItem)
+def remember_order_item_line(sender, instance, **kwargs):
+    """Remember the loaded line so edits can replace it in the rollups."""
+    instance._loaded_line = tuple(instance.__dict__.get(name) for name in ('product_id', 'quantity', 'price'))
+
+
+@receiver(post_save, sender=OrderItem)
+def update_order_item_rollups(sender, instance, created, **kwargs):
+    # Checkout bulk-creates its lines and counts them itself
+    if created:
+        rollups.add_items([instance])
+    elif None not in instance._loaded_line:
+        product_id, quantity, price = instance._loaded_line
+        if (product_id, quantity, rollups.money(price)) != (
+            instance.product_id, instance.quantity, rollups.money(instance.price)
+        ):
+            rollups.update_item(instance, product_id, quantity, price)
+    instance._loaded_line = (instance.product_id, instance.quantity, instance.price)
+
+
+@receiver(pre_delete, sender=Order)
+def remove_order_rollups(sender, instance, **kwargs):
+    rollups.remove_orders([instance.id])
+
+
+@receiver(pre_delete, sender=OrderItem)
+def remove_order_item_rollups(sender, instance, **kwargs):
+    # Also sent for each line when an order or product delete cascades
+    rollups.remove_items([instance.id])
+
+
+@receiver(post_save, sender=Order)
+def publish_order_event(sender, instance, created, **kwargs):
+    data = {
+        'id': instance.id,
+        'full_name': instance.full_name,
+        'total_amount': instance.total_amount,
+        'status': instance.status,
+    }
+    if created:
+        events.publish_on_commit(events.ORDER_CREATED, data)
+    elif instance.status != instance._loaded_status:
+        events.publish_on_commit(events.ORDER_STATUS_CHANGED, dict(data, previous_status=instance._loaded_status))
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Order)
+def count_order_delete(sender, instance, **kwargs):
+    adjust_stats(total_orders=-1, total_revenue=-delivered_revenue(instance.status, instance.total_amount))
+
+
+@receiver(post_save, sender=Product)
+def count_product_save(sender, instance, created, **kwargs):
+    # Saves of existing products still bump the version: stock levels feed
+    # the dashboard's low stock list
+    adjust_stats(total_products=1 if created else 0)
+
+
+@receiver(post_delete, sender=Product)
+def count_product_delete(sender, instance, **kwargs):
+    adjust_stats(total_products=-1)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def count_user_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_stats(total_users=1)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def count_user_delete(sender, instance, **kwargs):
+    adjust_stats(total_users=-1)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_invoice(sender, instance, **kwargs):
+    """Drop cached invoice PDFs once the order change is committed."""
+    order_id = instance.id
+    transaction.on_commit(lambda: invalidate_invoice(order_id))
+
+
+def image_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Product)
+def remember_product_image(sender, instance, **kwargs):
+    """Remember the loaded image so saves can tell when it changed."""
+    instance._loaded_image = image_name(instance.__dict__.get('image'))
+    instance._loaded_image_widths = instance.__dict__.get('image_widths') or []
+
+
+@receiver(post_save, sender=Product)
+def update_image_derivatives(sender, instance, **kwargs):
+    """
+    Generate JPEG/WebP derivatives when a product's image is added or
+    replaced (or has none yet), and remove those of the replaced image.
+    """
+    if 'image' not in instance.__dict__ or 'image_widths' not in instance.__dict__:
+        return
+    name = image_name(instance.image)
+    if name == instance._loaded_image and (instance.image_widths or not name):
+        return
+
+    old_name, old_widths = instance._loaded_image, instance._loaded_image_widths
+    if old_name and old_name != name:
+        transaction.on_commit(lambda: images.delete_derivatives(old_name, old_widths))
+
+    widths = []
+    if name:
+        try:
+            widths = images.generate_derivatives(instance.image, name)
+        except OSError as e:
+            logger.warning('Could not generate derivatives for %s: %s', name, e)
+    # Queryset update: no signals, so this handler isn't re-entered
+    Product.objects.filter(pk=instance.pk).update(image_widths=widths, updated_at=timezone.now())
+    instance.image_widths = widths
+    instance._loaded_image, instance._loaded_image_widths = name, widths
+
+
+@receiver(post_delete, sender=Product)
+def delete_image_derivatives(sender, instance, **kwargs):
+    name, widths = image_name(instance.__dict__.get('image')), instance.__dict__.get('image_widths') or []
+    if name:
+        transaction.on_commit(lambda: images.delete_derivatives(name, widths))
@@ -0,0 +1,206 @@
+document.addEventListener("DOMContentLoaded", function () {
+  // URLs and the CSRF token come from the #dashboard-config element
+  const config = document.getElementById("dashboard-config").dataset;
+  const refreshBtn = document.getElementById("refreshBtn");
+  const ordersTable = document.getElementById("recent-orders");
+  const lowStockList = document.getElementById("low-stock-list");
+  const lastUpdated = document.getElementById("last-updated");
+
+  // Fetch dashboard data
+  function fetchDashboardData() {
+    fetch(config.dataUrl)
+      .then(response => response.json())
+      .then(data => {
+        document.getElementById("total-users").textContent = data.total_users;
+        document.getElementById("total-products").textContent = data.total_products;
+        document.getElementById("total-orders").textContent = data.total_orders;
+        document.getElementById("total-revenue").textContent = "₹" + data.total_revenue;
+
+        // Update recent orders table
+        ordersTable.innerHTML = "";
+        data.recent_orders.forEach(order => {
+          ordersTable.innerHTML += `
+            <tr data-id="${order.id}" style="border-bottom: 1px solid #e9ecef;">
+              <td class="ps-3"><input type="checkbox" class="form-check-input order-select" value="${order.id}" aria-label="Select order #${order.id}"></td>
+              <td class="fw-bold text-orange">#${order.id}</td>
+              <td>${order.full_name}</td>
+              <td>
+                <span style="background: linear-gradient(135deg, var(--diwali-orange), var(--diwali-gold)); -webkit-background-clip: text; background-clip: text; -webkit-text-fill-color: transparent; font-weight: 600;">
+                  ₹${order.total_amount}
+                </span>
+              </td>
+              <td>
+                <select class="form-select form-select-sm order-status" data-id="${order.id}" style="border-color: var(--diwali-orange);">
+                  ${order.status_choices.map(([value, label]) =>
+                    `<option value="${value}" ${order.status === value ? 'selected' : ''}>${label}</option>`
+                  ).join("")}
+                </select>
+              </td>
+              <td>${new Date(order.created_at).toLocaleDateString()}</td>
+              <td class="pe-3">
+                <button class="btn btn-sm btn-outline-warning view-details" data-id="${order.id}" style="border-color: var(--diwali-orange); color: var(--diwali-orange);">
+                  <i class="bi bi-eye"></i>
+                </button>
+              </td>
+            </tr>
+          `;
+        });
+
+        document.getElementById("selectAllOrders").checked = false;
+
+        // Update low stock products
+        lowStockList.innerHTML = "";
+        data.low_stock_products.forEach(p => {
+          lowStockList.innerHTML += `
+            <li class="list-group-item d-flex justify-content-between align-items-center" style="background: linear-gradient(90deg, rgba(255,215,0,0.05), transparent); border-bottom: 1px solid #e9ecef;">
+              <span class="fw-500">${p.name}</span>
+              <div>
+                <span class="badge" style="background: linear-gradient(135deg, var(--diwali-red), var(--diwali-pink));">${p.stock_quantity}</span>
+                <button class="btn btn-sm btn-outline-success ms-2 add-stock-btn" data-id="${p.id}" style="border-color: var(--diwali-green); color: var(--diwali-green);">
+                  <i class="bi bi-plus"></i>
+                </button>
+              </div>
+            </li>
+          `;
+        });
+
+        lastUpdated.textContent = new Date().toLocaleTimeString();
+      });
+  }
+
+  // Refresh button click
+  refreshBtn.addEventListener("click", fetchDashboardData);
+
+  // Polling fallback, used whenever the live event stream is unavailable
+  let pollTimer = null;
+  function startPolling() {
+    if (!pollTimer) pollTimer = setInterval(fetchDashboardData, 30000);
+  }
+  function stopPolling() {
+    clearInterval(pollTimer);
+    pollTimer = null;
+  }
+
+  // Live updates pushed by the server (server-sent events)
+  if (window.EventSource) {
+    const events = new EventSource(config.eventsUrl);
+    ["order_created", "order_status_changed", "orders_status_changed", "low_stock"].forEach(type => {
+      events.addEventListener(type, fetchDashboardData);
+    });
+    events.onopen = function () {
+      stopPolling();
+      fetchDashboardData();  // Catch up on anything missed while disconnected
+    };
+    events.onerror = startPolling;
+  } else {
+    startPolling();
+  }
+
+  // Change one order's status; refused transitions snap back
+  document.body.addEventListener("change", function (e) {
+    if (e.target.classList.contains("order-status")) {
+      const orderId = e.target.dataset.id;
+      const status = e.target.value;
+
+      fetch(config.statusUrl.replace('0', orderId), {
+        method: "POST",
+        headers: { 
+          "Content-Type": "application/json",
+          "X-CSRFToken": config.csrfToken
+        },
+        body: JSON.stringify({ status })
+      })
+      .then(res => res.json())
+      .then(data => {
+        if (data.success) {
+          e.target.classList.add("status-updated");
+          setTimeout(() => e.target.classList.remove("status-updated"), 800);
+        } else if (data.status) {
+          e.target.value = data.status;
+        }
+      });
+    }
+  });
+
+  // Bulk status change
+  document.getElementById("selectAllOrders").addEventListener("change", function () {
+    document.querySelectorAll(".order-select").forEach(box => { box.checked = this.checked; });
+  });
+
+  document.getElementById("bulkApply").addEventListener("click", function () {
+    const target = document.getElementById("bulkTarget").value;
+    const status = document.getElementById("bulkStatus").value;
+    const result = document.getElementById("bulkResult");
+    const body = { status };
+    if (target) {
+      if (!confirm(`Move every ${target} order to ${status}?`)) return;
+      body.current_status = target;
+    } else {
+      body.order_ids = [...document.querySelectorAll(".order-select:checked")].map(box => Number(box.value));
+      if (!body.order_ids.length) {
+        result.textContent = "Select orders first";
+        return;
+      }
+    }
+
+    fetch(config.bulkStatusUrl, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": config.csrfToken
+      },
+      body: JSON.stringify(body)
+    })
+    .then(res => res.json())
+    .then(data => {
+      if (!data.success) {
+        result.textContent = data.error;
+        return;
+      }
+      const skipped = data.results.length - data.updated;
+      result.textContent = `${data.updated} updated` + (skipped ? `, ${skipped} skipped` : "") +
+        (data.has_more ? " (more remain, apply again)" : "");
+      fetchDashboardData();
+    });
+  });
+
+  // View order details
+  document.body.addEventListener("click", function (e) {
+    if (e.target.closest(".view-details")) {
+      const orderId = e.target.closest(".view-details").dataset.id;
+      fetch(config.detailsUrl.replace('0', orderId))
+        .then(res => res.json())
+        .then(data => {
+          if (data.success) {
+            document.getElementById("orderDetailsContent").innerHTML = data.html;
+            new bootstrap.Modal(document.getElementById("orderDetailsModal")).show();
+          }
+        });
+    }
+  });
+
+  // Quick Add Stock
+  document.body.addEventListener("click", function (e) {
+    if (e.target.closest(".add-stock-btn")) {
+      const productId = e.target.closest(".add-stock-btn").dataset.id;
+      const quantity = prompt("Enter quantity to add:");
+      if (quantity && !isNaN(quantity)) {
+        fetch(config.quickStockUrl, {
+          method: "POST",
+          headers: { 
+            "Content-Type": "application/json",
+            "X-CSRFToken": config.csrfToken
+          },
+          body: JSON.stringify({ product_id: productId, quantity })
+        })
+        .then(res => res.json())
+        .then(data => {
+          if (data.success) fetchDashboardData();
+        });
+      }
+    }
+  });
+
+  // Initial load
+  fetchDashboardData();
+});
@@ -0,0 +1,61 @@
+// Get CSRF token for fetch requests
+const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+window.csrfToken = csrfToken; // Make it available globally
+// Animation on scroll
+document.addEventListener('DOMContentLoaded', function() {
+    const animatedElements = document.querySelectorAll('.animate-on-scroll');
+
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.classList.add('animated');
+            }
+        });
+    }, { threshold: 0.1 });
+
+    animatedElements.forEach(element => {
+        observer.observe(element);
+    });
+
+    // Navbar background change on scroll
+    window.addEventListener('scroll', function() {
+        const navbar = document.querySelector('.navbar');
+        if (window.scrollY > 50) {
+            navbar.style.padding = '8px 0';
+            navbar.style.boxShadow = '0 4px 12px rgba(0, 0, 0, 0.15)';
+        } else {
+            navbar.style.padding = '12px 0';
+            navbar.style.boxShadow = '0 4px 12px rgba(0, 0, 0, 0.1)';
+        }
+    });
+
+    // Staggered hero animations
+    const heroElements = document.querySelectorAll('.hero-title, .hero-subtitle, .hero-buttons');
+    heroElements.forEach((element, index) => {
+        const delay = parseInt(element.getAttribute('data-animation-delay')) || 0;
+        setTimeout(() => {
+            element.style.opacity = '1';
+        }, delay);
+    });
+
+    // Scroll to Top Button functionality
+    const scrollToTopBtn = document.getElementById('scrollToTopBtn');
+
+    // Show/hide button based on scroll position
+    window.addEventListener('scroll', function() {
+        if (window.pageYOffset > 300) {
+            scrollToTopBtn.classList.add('show');
+        } else {
+            scrollToTopBtn.classList.remove('show');
+        }
+    });
+
+    // Scroll to top when button is clicked
+    scrollToTopBtn.addEventListener('click', function() {
+        window.scrollTo({
+            top: 0,
+            behavior: 'smooth'
+        });
+    });
+
+});
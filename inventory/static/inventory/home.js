@@ -0,0 +1,278 @@
+document.addEventListener('DOMContentLoaded', function () {
+    const crackersContainer = document.getElementById('crackersContainer');
+
+    // Category Navigation Scroll
+    window.scrollCategories = function(direction) {
+        const nav = document.querySelector('.category-nav');
+        const scrollAmount = nav.offsetWidth * 0.8;
+        nav.scrollBy({
+            left: direction === 'left' ? -scrollAmount : scrollAmount,
+            behavior: 'smooth'
+        });
+    };
+
+    // ------------------- 🔥 Fireworks Animation -------------------
+    function createCracker() {
+        const cracker = document.createElement('div');
+        cracker.classList.add('cracker');
+        cracker.style.left = `${Math.random() * 100}%`;
+        cracker.style.top = `${Math.random() * 100}%`;
+        crackersContainer.appendChild(cracker);
+
+        setTimeout(() => cracker.remove(), 2000);
+    }
+
+    function createFireworks() {
+        for (let i = 0; i < 3; i++) {
+            setTimeout(() => createCracker(), i * 500);
+        }
+    }
+
+    setInterval(createCracker, 1200);
+
+    // ------------------- 🛒 Cart Logic -------------------
+    let cart = [];
+    const cartTotal = document.getElementById('cart-total');
+    const cartItemsCount = document.querySelector('.cart-items-count');
+    const modalSubtotal = document.getElementById('modalSubtotal');
+    const cartItems = document.getElementById('cartItems');
+
+    function showToast(message, type = 'info') {
+        const toast = document.createElement('div');
+        toast.className = `toast align-items-center text-bg-${type} border-0 show position-fixed top-0 end-0 m-4`;
+        toast.style.zIndex = '2000';
+        toast.innerHTML = `
+            <div class="d-flex">
+                <div class="toast-body fw-semibold">${message}</div>
+                <button type="button" class="btn-close btn-close-white me-2 m-auto" data-bs-dismiss="toast"></button>
+            </div>
+        `;
+        document.body.appendChild(toast);
+        setTimeout(() => toast.remove(), 4000);
+    }
+
+    // Add to cart
+    document.querySelectorAll('.add-to-cart').forEach(button => {
+        button.addEventListener('click', function () {
+            const card = this.closest('.product-card');
+            const productId = card.dataset.productId;
+            const productName = card.querySelector('.card-title').textContent;
+            const price = parseFloat(card.querySelector('.price').textContent.replace('₹', ''));
+            const quantity = parseInt(card.querySelector('.quantity-input').value);
+            const stock = parseInt(card.querySelector('.stock-quantity').textContent);
+
+            if (quantity > stock) {
+                showToast('Insufficient stock!', 'danger');
+                return;
+            }
+
+            const existingItem = cart.find(item => item.id === productId);
+            if (existingItem) {
+                existingItem.quantity += quantity;
+            } else {
+                cart.push({ id: productId, name: productName, price, quantity });
+            }
+
+            updateCartDisplay();
+            showToast(`${productName} added to cart 🧨`, 'success');
+            createFireworks();
+        });
+    });
+
+    // Quantity control updates
+    document.querySelectorAll('.increase-qty').forEach(btn => {
+        btn.addEventListener('click', function () {
+            const input = this.parentElement.querySelector('.quantity-input');
+            const max = parseInt(input.max);
+            if (parseInt(input.value) < max) input.value++;
+            updateItemTotal(this.closest('.cart-controls'));
+        });
+    });
+
+    document.querySelectorAll('.decrease-qty').forEach(btn => {
+        btn.addEventListener('click', function () {
+            const input = this.parentElement.querySelector('.quantity-input');
+            if (parseInt(input.value) > 1) input.value--;
+            updateItemTotal(this.closest('.cart-controls'));
+        });
+    });
+
+    function updateItemTotal(container) {
+        const price = parseFloat(container.closest('.product-card').querySelector('.price').textContent.replace('₹', ''));
+        const qty = parseInt(container.querySelector('.quantity-input').value);
+        container.querySelector('.total-price').textContent = (price * qty).toFixed(2);
+    }
+
+    function updateCartDisplay() {
+        const total = cart.reduce((sum, item) => sum + item.price * item.quantity, 0);
+        const count = cart.reduce((sum, item) => sum + item.quantity, 0);
+
+        cartTotal.textContent = total.toFixed(2);
+        cartItemsCount.textContent = `(${count} items)`;
+        modalSubtotal.textContent = total.toFixed(2);
+        updateCartModal();
+    }
+
+    function updateCartModal() {
+        if (cart.length === 0) {
+            cartItems.innerHTML = `
+                <div class="text-center text-muted py-4">
+                    <i class="bi bi-cart-x" style="font-size:3rem;"></i>
+                    <p>Your cart is empty</p>
+                </div>
+            `;
+            return;
+        }
+
+        cartItems.innerHTML = cart.map(item => `
+            <div class="cart-item d-flex justify-content-between align-items-center mb-3 p-3 border rounded">
+                <div>
+                    <h6 class="mb-1">${item.name}</h6>
+                    <small class="text-muted">₹${item.price} × ${item.quantity}</small>
+                </div>
+                <div class="d-flex align-items-center gap-3">
+                    <span class="fw-bold">₹${(item.price * item.quantity).toFixed(2)}</span>
+                    <button class="btn btn-sm btn-outline-danger remove-item" data-id="${item.id}">
+                        <i class="bi bi-trash"></i>
+                    </button>
+                </div>
+            </div>
+        `).join('');
+
+        document.querySelectorAll('.remove-item').forEach(button => {
+            button.addEventListener('click', function () {
+                const id = this.dataset.id;
+                const removed = cart.find(i => i.id === id)?.name;
+                cart = cart.filter(item => item.id !== id);
+                updateCartDisplay();
+                showToast(`${removed} removed from cart`, 'warning');
+            });
+        });
+    }
+
+    // ------------------- 💳 Checkout Logic -------------------
+    const checkoutForm = document.getElementById('checkoutForm');
+    const checkoutButton = document.getElementById('proceedToCheckout');
+
+    checkoutButton.addEventListener('click', async function () {
+        if (!checkoutForm.checkValidity()) {
+            checkoutForm.classList.add('was-validated');
+            return;
+        }
+
+        if (cart.length === 0) {
+            showToast('Your cart is empty!', 'danger');
+            return;
+        }
+
+        const customerData = {
+            fullName: document.getElementById('fullName').value,
+            email: document.getElementById('email').value,
+            phone: document.getElementById('phone').value,
+            deliveryAddress: document.getElementById('deliveryAddress').value,
+            updateProfile: document.getElementById('updateProfile')?.checked || false
+        };
+
+        const cartItemsObj = {};
+        cart.forEach(item => {
+            cartItemsObj[item.id] = {
+                name: item.name,
+                quantity: item.quantity,
+                price: item.price
+            };
+        });
+
+        try {
+            const csrfToken = document.querySelector('[name=csrfmiddlewaretoken]').value;
+            const res = await fetch('/inventory/checkout/', {
+                method: 'POST',
+                headers: { 
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': csrfToken
+                },
+                body: JSON.stringify({ customerData, cartItems: cartItemsObj }),
+                credentials: 'same-origin'
+            });
+
+            const data = await res.json();
+            if (data.success) {
+                showDiwaliSuccess(data.orderSummary.total);
+                cart = [];
+                updateCartDisplay();
+            } else {
+                showToast(data.error || 'Checkout failed', 'danger');
+            }
+        } catch (err) {
+            console.error(err);
+            showToast('Network error. Please try again.', 'danger');
+        }
+    });
+
+    // ------------------- 🎇 Diwali Success Overlay -------------------
+    function showDiwaliSuccess(total) {
+        const overlay = document.createElement('div');
+        overlay.className = 'diwali-success-overlay active';
+        overlay.innerHTML = `
+            <div class="diwali-message-box">
+                <div class="diya-glow">🪔</div>
+                <h2>Order Placed Successfully!</h2>
+                <p>Thank you for celebrating Diwali with us 🎆<br><strong>Order Total:</strong> ₹${total.toFixed(2)}</p>
+                <p class="text-muted mt-2">Your confirmation has been sent to your registered email.</p>
+            </div>
+        `;
+        document.body.appendChild(overlay);
+
+        launchConfetti();
+
+        setTimeout(() => {
+            overlay.classList.remove('active');
+            overlay.remove();
+        }, 8000);
+    }
+
+    // ------------------- 🎊 Confetti Effect -------------------
+    function launchConfetti() {
+        for (let i = 0; i < 80; i++) {
+            const confetti = document.createElement('div');
+            confetti.style.position = 'fixed';
+            confetti.style.top = '-10px';
+            confetti.style.left = `${Math.random() * 100}%`;
+            confetti.style.width = '8px';
+            confetti.style.height = '8px';
+            confetti.style.borderRadius = '50%';
+            confetti.style.background = ['#ffcc00', '#ff6b35', '#0d6efd', '#28a745'][Math.floor(Math.random() * 4)];
+            confetti.style.opacity = Math.random();
+            confetti.style.zIndex = 9999;
+            document.body.appendChild(confetti);
+
+            const duration = 3 + Math.random() * 3;
+            confetti.animate([
+                { transform: `translateY(0) rotate(0deg)` },
+                { transform: `translateY(${window.innerHeight}px) rotate(${360 * Math.random()}deg)` }
+            ], {
+                duration: duration * 1000,
+                easing: 'ease-out',
+                fill: 'forwards'
+            });
+
+            setTimeout(() => confetti.remove(), duration * 1000);
+        }
+    }
+});
+// Highlight active category
+document.querySelectorAll('.category-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        document.querySelectorAll('.category-btn').forEach(b => b.classList.remove('active'));
+        this.classList.add('active');
+    });
+});
+// Smooth center-scroll for active category (mobile UX)
+document.querySelectorAll('.category-btn').forEach(btn => {
+    btn.addEventListener('click', function () {
+        const nav = document.querySelector('.category-nav');
+        const rect = this.getBoundingClientRect();
+        const navRect = nav.getBoundingClientRect();
+        const offset = rect.left - navRect.left - navRect.width / 2 + rect.width / 2;
+        nav.scrollBy({ left: offset, behavior: 'smooth' });
+    });
+});
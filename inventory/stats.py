@@ -0,0 +1,62 @@
+"""
+Incrementally maintained admin dashboard counters.
+
+DashboardStats holds a single row with user, product and order counts and
+delivered revenue. Signal handlers in inventory.signals adjust it with F()
+expressions as rows change, so reading the dashboard costs one primary key
+lookup instead of COUNT and SUM scans. recompute_stats() rebuilds the row
+from scratch (see the rebuild_dashboard_stats command).
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db.models import F, Sum
+
+from .models import DashboardStats, Order, Product
+
+STATS_PK = 1
+
+
+def get_stats():
+    """Return the stats row, building it on first use."""
+    try:
+        return DashboardStats.objects.get(pk=STATS_PK)
+    except DashboardStats.DoesNotExist:
+        return recompute_stats()
+
+
+def recompute_stats():
+    """Recalculate every counter from the source tables."""
+    stats, _ = DashboardStats.objects.get_or_create(pk=STATS_PK)
+    stats.total_users = get_user_model().objects.count()
+    stats.total_products = Product.objects.count()
+    stats.total_orders = Order.objects.count()
+    stats.total_revenue = Order.objects.filter(status='delivered').aggregate(
+        Sum('total_amount')
+    )['total_amount__sum'] or 0
+    stats.version += 1
+    stats.save()
+    return stats
+
+
+def delivered_revenue(status, total_amount):
+    """Revenue an order with this status and total counts towards."""
+    if status != 'delivered' or total_amount is None:
+        return Decimal('0')
+    return Decimal(str(total_amount))
+
+
+def adjust_stats(**deltas):
+    """
+    Apply counter deltas, e.g. adjust_stats(total_orders=1), and bump the
+    version. Called with no deltas it only bumps the version, which marks
+    the recent orders and low stock lists as changed.
+    """
+    updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    updates['version'] = F('version') + 1
+    if not DashboardStats.objects.filter(pk=STATS_PK).update(**updates):
+        recompute_stats()
+
+
+def get_dashboard_etag():
+    return f'"dashboard-{get_stats().version}"'
@@ -1,3 +1,2064 @@
-from django.test import TestCase
+"""
+Tests for the inventory app.
+Run with: python manage.py test inventory
+"""
+import asyncio
+import csv
+import json
+import multiprocessing
+import random
+import re
+import shutil
+import tempfile
+import zipfile
+from importlib import import_module
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import OperationalError, connection
+from django.db.models import Count, F, Q, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from crackers_ecommerce.db.transaction import retry_on_lock
+
+from . import benchmarks
+from .catalog import build_catalog, bump_catalog_version, get_active_products, get_catalog
+from .events import ORDER_CREATED, ORDER_STATUS_CHANGED, ORDERS_STATUS_CHANGED, EventBroker, broker
+from .images import derivative_name
+from .management.commands.export_invoices import init_worker, render_chunk
+from .metrics import RequestTimings, registry as metrics_registry
+from .models import (
+    LOW_STOCK_THRESHOLD, CatalogVersion, Category, DailyCategorySales, DailyProductSales, DailySales, Order,
+    OrderItem, OutboxEmail, Product,
+)
+from .orders import CheckoutError, decrement_stock, place_order, transition_orders
+from .rollups import rebuild_all
+from .outbox import claim_batch, deliver_batch, enqueue_email
+from .pagination import decode_cursor, encode_cursor
+from .search import build_match_query, ranked_query, search_products
+from .stats import get_stats, recompute_stats
+from .utils import notify_low_stock
+from .views import TYPEAHEAD_CANDIDATES
+
+CustomUser = get_user_model()
+
+
+def create_catalog(num_categories, products_per_category=3):
+    """Create categories with active products for catalog tests"""
+    for c in range(num_categories):
+        category = Category.objects.create(name=f'Category {c:03d}')
+        for p in range(products_per_category):
+            Product.objects.create(
+                name=f'Product {c}-{p}',
+                category=category,
+                price=10,
+                stock_quantity=20,
+                description='Test product',
+            )
+
+
+class OrderFixtureMixin:
+    """Order fixtures for test cases; order lines index into self.products"""
+
+    def create_order(self, status='pending', lines=(), total=None, created_at=None):
+        """
+        Create an order with (product index, quantity) lines at the catalog
+        price of 10. total defaults to the lines' sum, or 100.00 for an order
+        without lines. created_at backdates the order with update(), which
+        skips signals, so the sales rollups are rebuilt afterwards.
+        """
+        if total is None:
+            total = sum(10 * quantity for _, quantity in lines) if lines else '100.00'
+        order = Order.objects.create(
+            full_name='Test Customer',
+            email='customer@example.com',
+            phone='9876543210',
+            address='1 Test Street',
+            total_amount=Decimal(total),
+            status=status
+        )
+        for index, quantity in lines:
+            OrderItem.objects.create(order=order, product=self.products[index], quantity=quantity, price=10)
+        if created_at:
+            Order.objects.filter(id=order.id).update(created_at=created_at)
+            order.created_at = created_at
+            rebuild_all()
+        return order
+
+
+class CatalogTest(TestCase):
+    """Test the single-query storefront catalog"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123'
+        )
+
+    def test_catalog_groups_products_by_category(self):
+        """Test that products are grouped under their category in name order"""
+        create_catalog(3)
+        hidden = Product.objects.first()
+        hidden.is_active = False
+        hidden.save()
+
+        catalog = build_catalog()
+
+        names = [category.name for category in catalog['categories']]
+        self.assertEqual(names, ['Category 000', 'Category 001', 'Category 002'])
+        for category, products in catalog['products_by_category'].items():
+            self.assertTrue(all(p.category_id == category.id for p in products))
+        self.assertEqual(len(catalog['products']), 8)
+        self.assertNotIn(hidden, catalog['products'])
+
+    def test_catalog_query_count_is_constant(self):
+        """Test that the catalog is built with one query for any category count"""
+        for num_categories in (1, 25):
+            Category.objects.all().delete()
+            create_catalog(num_categories)
+            with self.assertNumQueries(1):
+                catalog = build_catalog()
+                for products in catalog['products_by_category'].values():
+                    for product in products:
+                        product.category.name
+
+    def test_home_query_count_is_constant(self):
+        """Test that the home page query count does not grow with categories"""
+        self.client.force_login(self.user)
+        create_catalog(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('inventory:home'))
+        create_catalog(20)
+        with self.assertNumQueries(len(small)):
+            response = self.client.get(reverse('inventory:home'))
+        self.assertEqual(response.status_code, 200)
+
+
+class CatalogApiTest(TestCase):
+    """Test the JSON catalog feed, its ETags and incremental sync"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('inventory:catalog_api')
+        create_catalog(2, products_per_category=2)
+        Product.objects.filter(name='Product 1-1').update(is_active=False)
+
+    def test_full_catalog(self):
+        """Test every category and active product is listed"""
+        response = self.client.get(self.url)
+        data = response.json()
+        self.assertEqual(len(data['categories']), 2)
+        self.assertEqual(len(data['products']), 3)
+        product = data['products'][0]
+        self.assertEqual(set(product), {
+            'id', 'name', 'category_id', 'description', 'price', 'stock_quantity',
+            'is_low_stock', 'image', 'updated_at'
+        })
+        self.assertEqual(product['price'], '10.00')
+        self.assertNotIn('product_ids', data)
+
+    def test_conditional_get(self):
+        """Test a matching If-None-Match gets 304 until the catalog changes"""
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        product = Product.objects.first()
+        product.price = 12
+        product.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stock_decrement_changes_etag_and_updated_at(self):
+        """Test queryset stock updates are visible to incremental sync"""
+        with mock.patch('inventory.catalog.SYNC_OVERLAP', timedelta(0)):
+            response = self.client.get(self.url)
+        since, etag = response.json()['next_since'], response['ETag']
+        product = Product.objects.filter(is_active=True).first()
+        decrement_stock({product.id: 1})
+        bump_catalog_version()
+        response = self.client.get(self.url, {'since': since}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([p['id'] for p in data['products']], [product.id])
+        self.assertEqual(data['products'][0]['stock_quantity'], product.stock_quantity - 1)
+
+    def test_incremental_sync(self):
+        """Test since returns changed products plus all active ids"""
+        with mock.patch('inventory.catalog.SYNC_OVERLAP', timedelta(0)):
+            since = self.client.get(self.url).json()['next_since']
+        changed = Product.objects.filter(is_active=True).last()
+        changed.name = 'Renamed'
+        changed.save()
+        removed = Product.objects.filter(is_active=True).first()
+        removed.is_active = False
+        removed.save()
+
+        data = self.client.get(self.url, {'since': since}).json()
+        self.assertEqual([p['name'] for p in data['products']], ['Renamed'])
+        self.assertEqual(data['product_ids'], list(
+            Product.objects.filter(is_active=True).order_by('id').values_list('id', flat=True)
+        ))
+        self.assertNotIn(removed.id, data['product_ids'])
+
+    def test_invalid_since(self):
+        """Test a malformed since is rejected"""
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+
+
+class CatalogCacheTest(TestCase):
+    """Test the versioned storefront catalog cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123'
+        )
+        self.client.force_login(self.user)
+        create_catalog(2)
+
+    def test_catalog_is_served_from_cache(self):
+        """Test that repeat catalog reads only look up the version"""
+        get_catalog()
+        with self.assertNumQueries(1):
+            get_catalog()
+
+    def test_version_is_shared_between_processes(self):
+        """Test a bump reaches workers whose own cache still holds the old catalog"""
+        version = get_catalog()['catalog_version']
+        Product.objects.filter(id=Product.objects.first().id).update(stock_quantity=3)
+        # What another worker's bump leaves behind: only the database row changed
+        CatalogVersion.objects.update(version=F('version') + 1)
+        catalog = get_catalog()
+        self.assertEqual(catalog['catalog_version'], version + 1)
+        self.assertIn(3, [p.stock_quantity for p in catalog['products']])
+
+    def test_product_save_invalidates_catalog(self):
+        """Test that saving a product bumps the version and refreshes stock"""
+        version = get_catalog()['catalog_version']
+        product = Product.objects.first()
+        product.stock_quantity = 3
+        product.save()
+
+        catalog = get_catalog()
+        self.assertNotEqual(catalog['catalog_version'], version)
+        self.assertIn(3, [p.stock_quantity for p in catalog['products']])
+
+    def test_category_delete_invalidates_catalog(self):
+        """Test that deleting a category removes it from the cached catalog"""
+        get_catalog()
+        Category.objects.first().delete()
+        self.assertEqual(len(get_catalog()['categories']), 1)
+
+    def test_home_shows_fresh_stock_after_quick_add(self):
+        """Test that the rendered product grid reflects quick_add_stock"""
+        admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin'
+        )
+        product = Product.objects.first()
+        self.client.get(reverse('inventory:home'))
+
+        self.client.force_login(admin)
+        self.client.post(
+            reverse('inventory:quick_add_stock'),
+            data=json.dumps({'product_id': product.id, 'quantity': 1000}),
+            content_type='application/json'
+        )
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('inventory:home'))
+        self.assertContains(response, 'Stock: 1020')
+
+
+class CheckoutTest(TestCase):
+    """Test the batched checkout pipeline"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123'
+        )
+        self.client.force_login(self.user)
+        create_catalog(10, products_per_category=10)
+        self.customer_data = {
+            'fullName': 'Test Customer',
+            'email': 'customer@example.com',
+            'phone': '9876543210',
+            'deliveryAddress': '1 Test Street',
+        }
+
+    def cart(self, products, quantity=2):
+        return {
+            str(p.id): {'name': p.name, 'price': str(p.price), 'quantity': quantity}
+            for p in products
+        }
+
+    def checkout(self, cart_items):
+        return self.client.post(
+            reverse('inventory:checkout'),
+            data=json.dumps({'customerData': self.customer_data, 'cartItems': cart_items}),
+            content_type='application/json'
+        ).json()
+
+    def test_checkout_decrements_stock_once(self):
+        """Test that each cart line decrements stock exactly once"""
+        products = list(Product.objects.all()[:3])
+        result = self.checkout(self.cart(products, quantity=4))
+
+        self.assertTrue(result['success'])
+        order = Order.objects.get(id=result['orderSummary']['order_id'])
+        self.assertEqual(order.items.count(), 3)
+        for product in products:
+            product.refresh_from_db()
+            self.assertEqual(product.stock_quantity, 16)
+
+    def test_checkout_prices_lines_from_catalog(self):
+        """Test that client-sent names and prices are ignored"""
+        products = list(Product.objects.all()[:2])
+        cart = {str(products[0].id): {'price': '-5', 'quantity': 2}, str(products[1].id): {'quantity': 1}}
+        result = self.checkout(cart)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['orderSummary']['total'], 30.0)
+        order = Order.objects.get(id=result['orderSummary']['order_id'])
+        self.assertEqual(order.total_amount, Decimal('30.00'))
+        self.assertEqual(set(order.items.values_list('price', flat=True)), {Decimal('10.00')})
+        self.assertIn(products[1].name, OutboxEmail.objects.get().body)
+
+    def test_checkout_rejects_insufficient_stock(self):
+        """Test that nothing is written when any line lacks stock"""
+        products = list(Product.objects.all()[:2])
+        result = self.checkout(self.cart(products, quantity=21))
+
+        self.assertFalse(result['success'])
+        self.assertIn('Insufficient stock', result['error'])
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Product.objects.filter(stock_quantity=20).count(), 100)
+
+    def test_decrement_stock_never_goes_negative(self):
+        """Test that the conditional UPDATE skips rows without enough stock"""
+        first, second = Product.objects.all()[:2]
+        updated = decrement_stock({first.id: 5, second.id: 25})
+
+        self.assertEqual(updated, 1)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.stock_quantity, 15)
+        self.assertEqual(second.stock_quantity, 20)
+
+    def test_checkout_query_count_is_flat(self):
+        """Benchmark query counts for 1-, 10- and 100-line carts"""
+        counts = {}
+        for lines in (1, 10, 100):
+            cart_items = self.cart(Product.objects.all()[:lines], quantity=1)
+            with CaptureQueriesContext(connection) as queries:
+                place_order(self.user, self.customer_data, cart_items)
+            counts[lines] = len(queries)
+
+        self.assertEqual(counts[1], counts[10])
+        self.assertEqual(counts[1], counts[100])
+
+
+class ConcurrentCheckoutTest(TransactionTestCase):
+    """Test checkout under write contention from many threads"""
+
+    THREADS = 16
+    CHECKOUTS = 240
+
+    def setUp(self):
+        cache.clear()
+        create_catalog(1, products_per_category=4)
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123',
+            is_approved=True
+        )
+        self.customer_data = {
+            'fullName': 'Test Customer',
+            'email': 'customer@example.com',
+            'phone': '9876543210',
+            'deliveryAddress': '1 Test Street',
+        }
+
+    def test_wal_journal(self):
+        """Test connections use WAL journaling and a busy timeout"""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.DATABASES['default']['OPTIONS']['timeout'] * 1000)
+
+    def test_checkout_begins_immediate(self):
+        """Test checkout takes the write lock when its transaction begins"""
+        product = Product.objects.first()
+        cart = {str(product.id): {'name': product.name, 'price': '10', 'quantity': 1}}
+        with CaptureQueriesContext(connection) as queries:
+            place_order(self.user, self.customer_data, cart)
+        self.assertEqual(queries.captured_queries[0]['sql'], 'BEGIN IMMEDIATE')
+
+    def test_retry_on_lock(self):
+        """Test lock errors are retried and other errors are not"""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'done'
+
+        self.assertEqual(retry_on_lock(flaky, attempts=5, backoff=0), 'done')
+        self.assertEqual(len(calls), 3)
+        with self.assertRaises(OperationalError):
+            retry_on_lock(mock.Mock(side_effect=OperationalError('no such table')), attempts=5, backoff=0)
+
+    def test_no_oversells_or_lock_failures(self):
+        """Test hundreds of concurrent checkouts never oversell or fail on locks"""
+        products = list(Product.objects.all())
+        initial_stock = {p.id: p.stock_quantity for p in products}
+        outcomes, errors = [], []
+
+        def checkout(n):
+            rng = random.Random(n)
+            cart = {
+                str(p.id): {'name': p.name, 'price': str(p.price), 'quantity': rng.randint(1, 2)}
+                for p in rng.sample(products, rng.randint(1, 2))
+            }
+            try:
+                place_order(self.user, self.customer_data, cart)
+                outcomes.append('placed')
+            except CheckoutError:
+                outcomes.append('out of stock')
+            except Exception as e:
+                errors.append(repr(e))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as pool:
+            list(pool.map(checkout, range(self.CHECKOUTS)))
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(outcomes), self.CHECKOUTS)
+        # Demand exceeds stock, so both outcomes must occur
+        self.assertIn('out of stock', outcomes)
+        self.assertEqual(Order.objects.count(), outcomes.count('placed'))
+        sold = dict(OrderItem.objects.values_list('product').annotate(total=Sum('quantity')))
+        for product in Product.objects.all():
+            self.assertGreaterEqual(product.stock_quantity, 0)
+            self.assertEqual(initial_stock[product.id] - product.stock_quantity, sold.get(product.id, 0))
+
+
+class OutboxTest(TestCase):
+    """Test the email outbox and send_outbox worker"""
+
+    def queue(self, count):
+        for i in range(count):
+            enqueue_email(f'Subject {i}', 'Body', [f'user{i}@example.com'], html_message='<p>Body</p>')
+
+    def test_worker_sends_batches_over_one_connection(self):
+        """Test that queued emails are delivered with one connection per batch"""
+        self.queue(5)
+        with mock.patch('inventory.outbox.get_connection', wraps=get_connection) as get_conn:
+            call_command('send_outbox', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(get_conn.call_count, 3)
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Body</p>', 'text/html')])
+        self.assertEqual(OutboxEmail.objects.filter(status='sent').count(), 5)
+
+    def test_failed_email_is_retried_with_backoff(self):
+        """Test that a failed send is rescheduled instead of dropped"""
+        self.queue(1)
+        with mock.patch.object(EmailMultiAlternatives, 'send', side_effect=OSError('SMTP down')):
+            stats = deliver_batch()
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(stats['retried'], 1)
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(email.last_error, 'SMTP down')
+        # Not due yet, so the next run leaves it alone
+        self.assertEqual(deliver_batch()['sent'], 0)
+
+    def test_email_is_dead_lettered_after_max_attempts(self):
+        """Test that an email stops being retried after max attempts"""
+        self.queue(1)
+        with mock.patch.object(EmailMultiAlternatives, 'send', side_effect=OSError('SMTP down')):
+            for _ in range(3):
+                OutboxEmail.objects.update(next_attempt_at=timezone.now())
+                deliver_batch(max_attempts=3)
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'dead')
+        self.assertEqual(email.attempts, 3)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_emails_are_not_sent_twice(self):
+        """Test that a worker skips emails another worker has claimed"""
+        self.queue(3)
+        claimed = claim_batch(2, timezone.now())
+
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(deliver_batch()['sent'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(OutboxEmail.objects.filter(status='sending').count(), 2)
+
+    def test_expired_claims_are_retried(self):
+        """Test that emails claimed by a worker that died are sent once the lease runs out"""
+        self.queue(2)
+        claim_batch(2, timezone.now())
+        self.assertEqual(deliver_batch()['sent'], 0)
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_batch()['sent'], 2)
+        self.assertEqual(OutboxEmail.objects.filter(status='sent').count(), 2)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Query plan assertions use SQLite EXPLAIN QUERY PLAN output')
+    def test_pending_scan_uses_partial_index(self):
+        """Test that the due-email scan reads the pending partial index"""
+        queryset = (OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=timezone.now())
+                    .order_by('next_attempt_at', 'id').values_list('id', flat=True)[:50])
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('outbox_pending_due_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_checkout_queues_confirmation_without_sending(self):
+        """Test that checkout writes to the outbox instead of sending mail"""
+        user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123'
+        )
+        create_catalog(1)
+        product = Product.objects.first()
+        place_order(user, {
+            'fullName': 'Test Customer',
+            'email': 'customer@example.com',
+            'phone': '9876543210',
+            'deliveryAddress': '1 Test Street',
+        }, {str(product.id): {'name': product.name, 'price': '10', 'quantity': 1}})
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+        call_command('send_outbox', stdout=StringIO())
+        self.assertEqual(mail.outbox[0].to, ['customer@example.com'])
+
+
+class LowStockDigestTest(TestCase):
+    """Test coalesced low stock alert digests"""
+
+    def setUp(self):
+        create_catalog(1, products_per_category=3)
+        self.products = list(Product.objects.all())
+        Product.objects.update(stock_quantity=5)
+
+    def test_digest_lists_every_low_stock_product(self):
+        """Test that one digest lists all products below threshold"""
+        email = notify_low_stock([self.products[0].id])
+
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+        for product in self.products:
+            self.assertIn(product.name, email.body)
+        self.assertFalse(Product.objects.filter(low_stock_alerted_at__isnull=True).exists())
+
+    def test_products_are_alerted_once_per_window(self):
+        """Test that repeat alerts within the window are suppressed"""
+        notify_low_stock([self.products[0].id])
+        self.assertIsNone(notify_low_stock([p.id for p in self.products]))
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    @override_settings(STOCK_ALERT_WINDOW=60)
+    def test_product_is_alerted_again_after_window(self):
+        """Test that a product is included again once the window has passed"""
+        notify_low_stock([self.products[0].id])
+        Product.objects.update(low_stock_alerted_at=timezone.now() - timedelta(seconds=120))
+
+        self.assertIsNotNone(notify_low_stock([self.products[0].id]))
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_products_above_threshold_are_ignored(self):
+        """Test that no digest is queued for products with enough stock"""
+        Product.objects.update(stock_quantity=50)
+        self.assertIsNone(notify_low_stock([p.id for p in self.products]))
+        self.assertFalse(OutboxEmail.objects.exists())
+
+
+class DashboardStatsTest(OrderFixtureMixin, TestCase):
+    """Test incrementally maintained dashboard counters"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_login(self.admin)
+        create_catalog(1, products_per_category=2)
+
+    def assertStatsMatchTables(self):
+        stats = get_stats()
+        rebuilt = recompute_stats()
+        for field in ('total_users', 'total_products', 'total_orders', 'total_revenue'):
+            self.assertEqual(getattr(stats, field), getattr(rebuilt, field), field)
+
+    def test_counters_follow_changes(self):
+        """Test that counters track creates, status changes and deletes"""
+        order = self.create_order()
+        self.create_order('delivered', total='50.00')
+        order.status = 'delivered'
+        order.save()
+        Product.objects.first().delete()
+        CustomUser.objects.create_user(email='new@example.com', username='new', password='testpass123')
+
+        stats = get_stats()
+        self.assertEqual(stats.total_orders, 2)
+        self.assertEqual(stats.total_revenue, Decimal('150.00'))
+        self.assertEqual(stats.total_products, 1)
+        self.assertEqual(stats.total_users, 2)
+        self.assertStatsMatchTables()
+
+        order.status = 'cancelled'
+        order.save()
+        order.delete()
+        self.assertEqual(get_stats().total_revenue, Decimal('50.00'))
+        self.assertStatsMatchTables()
+
+    def test_dashboard_data_reads_counters_without_scans(self):
+        """Test that dashboard_data does not count or sum tables"""
+        get_stats()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('inventory:dashboard_data'))
+        sql = ' '.join(q['sql'] for q in queries)
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('SUM(', sql)
+
+    def test_dashboard_data_returns_304_when_unchanged(self):
+        """Test that conditional polls return 304 until something changes"""
+        response = self.client.get(reverse('inventory:dashboard_data'))
+        etag = response['ETag']
+        self.assertEqual(response.json()['total_products'], 2)
+
+        response = self.client.get(reverse('inventory:dashboard_data'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.create_order()
+        response = self.client.get(reverse('inventory:dashboard_data'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_orders'], 1)
+
+
+class DashboardEventsTest(TestCase):
+    """Test live dashboard events"""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin'
+        )
+        self.async_client.force_login(self.admin)
+        self.client.force_login(self.admin)
+
+    def test_publisher_fans_out_to_all_subscribers(self):
+        """Test that one publish reaches every subscriber"""
+        async def run():
+            broker = EventBroker()
+            first, second = broker.subscribe(), broker.subscribe()
+            broker.publish(ORDER_CREATED, {'id': 1})
+            await asyncio.sleep(0)
+            events = [first.queue.get_nowait(), second.queue.get_nowait()]
+            broker.unsubscribe(first)
+            broker.publish(ORDER_CREATED, {'id': 2})
+            await asyncio.sleep(0)
+            return events, first.queue.qsize(), second.queue.qsize()
+
+        events, first_pending, second_pending = asyncio.run(run())
+        self.assertEqual(events, [{'type': ORDER_CREATED, 'data': {'id': 1}}] * 2)
+        self.assertEqual((first_pending, second_pending), (0, 1))
+
+    def test_wsgi_request_falls_back_to_polling(self):
+        """Test that non-ASGI requests get 204 so the browser stops reconnecting"""
+        response = self.client.get(reverse('inventory:dashboard_events'))
+        self.assertEqual(response.status_code, 204)
+
+    def test_non_admin_is_forbidden(self):
+        """Test that anonymous users cannot open the event stream"""
+        self.client.logout()
+        response = self.client.get(reverse('inventory:dashboard_events'))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_pushes_published_events(self):
+        """Test that an event published after connecting is streamed"""
+        response = await self.async_client.get(reverse('inventory:dashboard_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        self.assertEqual(broker.subscriber_count, 1)
+
+        broker.publish(ORDER_STATUS_CHANGED, {'id': 7, 'status': 'shipped'})
+        chunk = await asyncio.wait_for(anext(stream), 1)
+        await stream.aclose()
+
+        self.assertIn(b'event: order_status_changed', chunk)
+        self.assertIn(b'"status": "shipped"', chunk)
+
+    def test_order_changes_publish_events(self):
+        """Test that order creation and status changes are published"""
+        published = []
+        with mock.patch.object(broker, 'publish', side_effect=lambda t, d: published.append(t)):
+            with self.captureOnCommitCallbacks(execute=True):
+                order = Order.objects.create(
+                    full_name='Test Customer',
+                    email='customer@example.com',
+                    phone='9876543210',
+                    address='1 Test Street',
+                    total_amount=10
+                )
+            with self.captureOnCommitCallbacks(execute=True):
+                order.status = 'shipped'
+                order.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                order.save()
+
+        self.assertEqual(published, [ORDER_CREATED, ORDER_STATUS_CHANGED])
+
+
+class OrderStatusTransitionTest(OrderFixtureMixin, TestCase):
+    """Test validated single and bulk order status changes"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_login(self.admin)
+
+    def bulk_update(self, **data):
+        return self.client.post(
+            reverse('inventory:bulk_update_order_status'), json.dumps(data), content_type='application/json'
+        )
+
+    def test_bulk_update_reports_each_order(self):
+        """Test allowed orders move in one UPDATE and the rest are reported"""
+        processing = [self.create_order('processing') for _ in range(3)]
+        pending = self.create_order('pending')
+        ids = [order.id for order in processing] + [pending.id, 9999]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk_update(status='shipped', order_ids=ids)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "inventory_order"')]
+        self.assertEqual(len(updates), 1)
+
+        data = response.json()
+        self.assertEqual(data['updated'], 3)
+        self.assertEqual(data['results'], [
+            *({'id': order.id, 'outcome': 'updated', 'status': 'shipped'} for order in processing),
+            {'id': pending.id, 'outcome': 'not_allowed', 'status': 'pending'},
+            {'id': 9999, 'outcome': 'not_found', 'status': None},
+        ])
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 3)
+        self.assertGreater(Order.objects.get(id=processing[0].id).updated_at, processing[0].updated_at)
+
+    def test_bulk_update_by_current_status(self):
+        """Test a status filter moves the oldest orders first, up to the limit"""
+        orders = [self.create_order('processing') for _ in range(3)]
+        self.create_order('pending')
+
+        with override_settings(ORDER_BULK_STATUS_LIMIT=2):
+            data = self.bulk_update(status='shipped', current_status='processing').json()
+        self.assertEqual([result['id'] for result in data['results']], [orders[0].id, orders[1].id])
+        self.assertTrue(data['has_more'])
+
+        data = self.bulk_update(status='shipped', current_status='processing').json()
+        self.assertEqual(data['updated'], 1)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(Order.objects.filter(status='shipped').count(), 3)
+
+    def test_bulk_update_follow_ups_batched(self):
+        """Test stats, one event, invoices and customer emails follow a bulk update"""
+        orders = [self.create_order('shipped', total='50.00') for _ in range(3)]
+        self.create_order('delivered', total='20.00')
+        emails = OutboxEmail.objects.count()
+        published = []
+        with mock.patch.object(broker, 'publish', side_effect=lambda t, d: published.append((t, d))), \
+                mock.patch('inventory.orders.invalidate_invoices') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.bulk_update(status='delivered', order_ids=[order.id for order in orders])
+
+        ids = [order.id for order in orders]
+        self.assertEqual(published, [(ORDERS_STATUS_CHANGED, {'ids': ids, 'status': 'delivered'})])
+        invalidate.assert_called_once_with(ids)
+        self.assertEqual(get_stats().total_revenue, Decimal('170.00'))
+        self.assertEqual(recompute_stats().total_revenue, Decimal('170.00'))
+        self.assertEqual(OutboxEmail.objects.count(), emails + 3)
+        self.assertIn('Delivered', OutboxEmail.objects.last().subject)
+
+    def test_bulk_update_rejects_bad_requests(self):
+        """Test unknown statuses, missing targets and non-admins are refused"""
+        self.assertEqual(self.bulk_update(status='confirmed', order_ids=[1]).status_code, 400)
+        self.assertEqual(self.bulk_update(status='shipped').status_code, 400)
+        self.assertEqual(self.bulk_update(status='shipped', order_ids=['x']).status_code, 400)
+        with override_settings(ORDER_BULK_STATUS_LIMIT=1):
+            self.assertEqual(self.bulk_update(status='shipped', order_ids=[1, 2]).status_code, 400)
+
+        staff = CustomUser.objects.create_user(
+            email='staff@example.com', username='staff', password='testpass123', role='staff', is_approved=True
+        )
+        self.client.force_login(staff)
+        self.assertNotEqual(self.bulk_update(status='shipped', order_ids=[1]).status_code, 200)
+
+    def test_dashboard_has_bulk_control(self):
+        """Test the dashboard renders the bulk bar and every status option"""
+        self.create_order('shipped')
+        response = self.client.get(reverse('inventory:admin_dashboard'))
+        self.assertContains(response, 'id="bulk-status-bar"')
+        self.assertContains(response, reverse('inventory:bulk_update_order_status'))
+        self.assertContains(response, '<option value="shipped" selected>Shipped</option>', html=True)
+
+    def test_single_update_validates_transition(self):
+        """Test the single order endpoint refuses disallowed transitions"""
+        order = self.create_order('pending')
+        url = reverse('inventory:update_order_status', args=[order.id])
+
+        response = self.client.post(url, json.dumps({'status': 'delivered'}), content_type='application/json')
+        self.assertEqual(response.json(), {'success': False, 'status': 'pending'})
+
+        response = self.client.post(url, json.dumps({'status': 'processing'}), content_type='application/json')
+        self.assertEqual(response.json(), {'success': True, 'status': 'processing'})
+        self.assertEqual(Order.objects.get(id=order.id).status, 'processing')
+
+    def test_single_update_rejects_malformed_body(self):
+        """Test bodies that aren't a JSON object with a status get a 400"""
+        order = self.create_order('pending')
+        url = reverse('inventory:update_order_status', args=[order.id])
+        for body in ('[]', '"x"', '3', '{}', 'not json'):
+            response = self.client.post(url, body, content_type='application/json')
+            self.assertEqual(response.status_code, 400, body)
+        self.assertEqual(Order.objects.get(id=order.id).status, 'pending')
+
+
+class OrderCsvExportTest(OrderFixtureMixin, TestCase):
+    """Test the streamed, chunked order CSV export"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_login(self.admin)
+        create_catalog(1, products_per_category=2)
+        self.products = list(Product.objects.order_by('id'))
+
+    def october(self, day):
+        return timezone.make_aware(datetime(2025, 10, day, 12))
+
+    def export(self, **params):
+        response = self.client.get(reverse('inventory:export_order_csv'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+
+    def test_export_has_one_row_per_line(self):
+        """Test each order line is a row, newest order first"""
+        older = self.create_order(lines=[(0, 1), (1, 1)])
+        newer = self.create_order()
+        rows = self.export()
+        self.assertEqual(rows[0][:3], ['order_id', 'created_at', 'status'])
+        self.assertEqual([row[0] for row in rows[1:]], [str(newer.id), str(older.id), str(older.id)])
+        self.assertEqual(rows[1][8:], ['', '', '', ''])
+        self.assertEqual(rows[2][8:], ['Product 0-0', '1', '10.00', '10.00'])
+
+    def test_export_filters_by_date_and_status(self):
+        """Test start and end dates are inclusive and status narrows further"""
+        self.create_order(created_at=self.october(1))
+        inside = self.create_order(created_at=self.october(2))
+        shipped = self.create_order('shipped', created_at=self.october(3))
+        self.create_order(created_at=self.october(4))
+
+        rows = self.export(start='2025-10-02', end='2025-10-03')
+        self.assertEqual([row[0] for row in rows[1:]], [str(shipped.id), str(inside.id)])
+        rows = self.export(start='2025-10-02', end='2025-10-03', status='pending')
+        self.assertEqual([row[0] for row in rows[1:]], [str(inside.id)])
+
+    def test_export_reads_in_chunks(self):
+        """Test orders are fetched a chunk at a time, two queries per chunk"""
+        orders = [self.create_order(lines=[(0, 1)]) for _ in range(5)]
+        with mock.patch('inventory.csv_io.ORDER_EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get(reverse('inventory:export_order_csv'))
+            with CaptureQueriesContext(connection) as queries:
+                rows = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(len(queries), 6)
+        self.assertEqual(sorted(int(row.split(',')[0]) for row in rows[1:]), [order.id for order in orders])
+
+    def test_export_rejects_bad_filters(self):
+        """Test invalid dates and statuses are refused and non-admins denied"""
+        url = reverse('inventory:export_order_csv')
+        self.assertEqual(self.client.get(url, {'start': '2025-13-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'end': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'status': 'lost'}).status_code, 400)
+
+        customer = CustomUser.objects.create_user(
+            email='customer@example.com', username='customer', password='testpass123', is_approved=True
+        )
+        self.client.force_login(customer)
+        self.assertNotEqual(self.client.get(url).status_code, 200)
+
+
+@override_settings(INVOICE_CACHE_DIR=Path(tempfile.gettempdir()) / 'crackers-test-invoices')
+class InvoiceCacheTest(TestCase):
+    """Test cached, streamed invoice PDFs"""
+
+    def setUp(self):
+        shutil.rmtree(settings.INVOICE_CACHE_DIR, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, settings.INVOICE_CACHE_DIR, ignore_errors=True)
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123',
+            is_approved=True
+        )
+        self.client.force_login(self.user)
+        create_catalog(1, products_per_category=2)
+        self.order = Order.objects.create(
+            user=self.user,
+            full_name='Test Customer',
+            email='customer@example.com',
+            phone='9876543210',
+            address='1 Test Street',
+            total_amount=20
+        )
+        for product in Product.objects.all():
+            self.order.items.create(product=product, quantity=1, price=10)
+
+    def download(self):
+        return self.client.get(reverse('inventory:generate_invoice', args=[self.order.id]))
+
+    def download_content(self):
+        # Consuming the stream closes the file through the test client;
+        # response.close() outside it would close the DB connection too
+        return b''.join(self.download().streaming_content)
+
+    def test_invoice_is_streamed_from_disk(self):
+        """Test that the invoice is a streamed PDF attachment cached on disk"""
+        response = self.download()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn(f'invoice-{self.order.id}.pdf', response['Content-Disposition'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(len(list(settings.INVOICE_CACHE_DIR.glob('*.pdf'))), 1)
+
+    def test_repeat_download_does_not_rebuild(self):
+        """Test that a cached invoice is served without rendering again"""
+        self.download_content()
+        with mock.patch('inventory.invoices.render_invoice_pdf') as render:
+            self.download_content()
+        render.assert_not_called()
+
+    def test_order_change_invalidates_invoice(self):
+        """Test that modifying the order drops the cached PDF"""
+        self.download_content()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.order.address = '2 New Street'
+            self.order.save()
+        self.assertEqual(list(settings.INVOICE_CACHE_DIR.glob('*.pdf')), [])
+
+        with mock.patch('inventory.invoices.render_invoice_pdf', return_value=b'%PDF-new') as render:
+            response = self.download()
+            self.assertEqual(b''.join(response.streaming_content), b'%PDF-new')
+        render.assert_called_once()
+
+
+class ExportInvoicesCommandTest(TestCase):
+    """Test the export_invoices management command"""
+
+    def setUp(self):
+        self.output_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output_dir, ignore_errors=True)
+        create_catalog(1, products_per_category=1)
+        product = Product.objects.get()
+        for status in ('pending', 'delivered', 'delivered'):
+            order = Order.objects.create(
+                full_name='Test Customer',
+                email='customer@example.com',
+                phone='9876543210',
+                address='1 Test Street',
+                total_amount=10,
+                status=status
+            )
+            order.items.create(product=product, quantity=1, price=10)
+
+    def test_export_to_zip_filtered_by_status(self):
+        """Test that matching invoices are written into a zip archive"""
+        output = self.output_dir / 'invoices.zip'
+        stdout = StringIO()
+        call_command('export_invoices', str(output), status=['delivered'], workers=1, stdout=stdout)
+
+        delivered = Order.objects.filter(status='delivered').values_list('id', flat=True)
+        with zipfile.ZipFile(output) as archive:
+            self.assertEqual(
+                sorted(archive.namelist()),
+                sorted(f'invoice-{order_id}.pdf' for order_id in delivered)
+            )
+            self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF'))
+        self.assertIn('invoices/s', stdout.getvalue())
+
+    def test_export_to_directory_filtered_by_date(self):
+        """Test that the date range excludes orders outside it"""
+        Order.objects.filter(status='pending').update(created_at=timezone.now() - timedelta(days=30))
+        since = (timezone.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        call_command('export_invoices', str(self.output_dir), date_from=since, workers=1, stdout=StringIO())
+
+        self.assertEqual(len(list(self.output_dir.glob('invoice-*.pdf'))), 2)
+
+    def test_invalid_worker_and_chunk_counts(self):
+        """Test zero workers or chunk size is refused before any work"""
+        for options in ({'workers': 0}, {'chunk_size': 0}):
+            with self.assertRaises(CommandError):
+                call_command('export_invoices', str(self.output_dir), stdout=StringIO(), **options)
+
+    def test_spawned_workers_set_up_django(self):
+        """Test workers started with spawn import the command before Django is set up"""
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=init_worker) as pool:
+            self.assertEqual(pool.submit(render_chunk, []).result(), [])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plan assertions use SQLite EXPLAIN QUERY PLAN output')
+def make_image(width=800, height=600, name='rocket.jpg'):
+    """Return an uploaded JPEG of the given size"""
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'orange').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(PRODUCT_IMAGE_WIDTHS=(160, 320, 640))
+class ProductImageTest(TestCase):
+    """Test generated product image derivatives and responsive markup"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.category = Category.objects.create(name='Rockets')
+
+    def create_product(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(
+                category=self.category, name='Sky Shot', description='Rocket',
+                price=10, stock_quantity=20, image=image
+            )
+
+    def test_derivatives_generated(self):
+        """Test JPEG and WebP copies are written at each width up to the original"""
+        product = self.create_product(make_image(500, 250))
+        self.assertEqual(product.image_widths, [160, 320])
+        self.assertEqual(Product.objects.get().image_widths, [160, 320])
+        for width in (160, 320):
+            for fmt in ('jpeg', 'webp'):
+                with default_storage.open(derivative_name(product.image.name, width, fmt)) as f:
+                    self.assertEqual(Image.open(f).size, (width, width // 2))
+        self.assertTrue(default_storage.exists(product.image.name))
+
+    def test_small_image_keeps_smallest_width(self):
+        """Test images narrower than every width still get one derivative"""
+        self.assertEqual(self.create_product(make_image(100, 100)).image_widths, [160])
+
+    def test_replaced_image_cleans_up(self):
+        """Test replacing and deleting images removes old derivatives"""
+        product = self.create_product(make_image())
+        old = derivative_name(product.image.name, 160, 'webp')
+        product = Product.objects.get()
+        product.image = make_image(name='fountain.jpg')
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save()
+        self.assertFalse(default_storage.exists(old))
+        new = derivative_name(product.image.name, 160, 'webp')
+        self.assertTrue(default_storage.exists(new))
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertFalse(default_storage.exists(new))
+
+    def test_unchanged_image_not_regenerated(self):
+        """Test saves that don't touch the image skip generation"""
+        self.create_product(make_image())
+        product = Product.objects.get()
+        product.stock_quantity = 5
+        with mock.patch('inventory.images.generate_derivatives') as generate:
+            product.save()
+        generate.assert_not_called()
+
+    def test_invalid_image_does_not_break_save(self):
+        """Test an unreadable upload saves without derivatives"""
+        image = SimpleUploadedFile('broken.jpg', b'not an image', content_type='image/jpeg')
+        self.assertEqual(self.create_product(image).image_widths, [])
+
+    def test_storefront_srcset(self):
+        """Test the home page serves derivatives and keeps the original for zoom"""
+        product = self.create_product(make_image())
+        user = CustomUser.objects.create_user(
+            email='customer@example.com', username='customer', password='testpass123', is_approved=True
+        )
+        self.client.force_login(user)
+        content = self.client.get(reverse('inventory:home')).content.decode()
+        self.assertIn(f'{product.image_webp_srcset}', content)
+        self.assertIn('type="image/webp"', content)
+        self.assertIn(f'data-zoom-src="{product.image.url}"', content)
+        self.assertNotIn(f' src="{product.image.url}"', content)
+
+    def test_backfill_command(self):
+        """Test generate_image_derivatives fills in missing derivatives"""
+        self.create_product(make_image())
+        Product.objects.update(image_widths=[])
+        call_command('generate_image_derivatives', stdout=StringIO())
+        self.assertEqual(Product.objects.get().image_widths, [160, 320, 640])
+
+
+@override_settings(CUSTOMER_ORDERS_PAGE_SIZE=3)
+class CustomerOrdersTest(TestCase):
+    """Test keyset-paginated customer orders with database aggregates"""
+
+    def setUp(self):
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123',
+            is_approved=True
+        )
+        self.client.force_login(self.user)
+        create_catalog(1, products_per_category=1)
+        product = Product.objects.get()
+        # Pairs of orders share a timestamp so paging must tie-break on id
+        created_at = timezone.now()
+        statuses = ['delivered', 'pending', 'delivered', 'cancelled', 'pending', 'processing', 'delivered']
+        for i, status in enumerate(statuses):
+            order = Order.objects.create(
+                user=self.user, full_name='Test Customer', email='customer@example.com',
+                phone='9876543210', address='1 Test Street', total_amount=10 * (i + 1), status=status
+            )
+            Order.objects.filter(id=order.id).update(created_at=created_at - timedelta(minutes=i // 2))
+            order.items.create(product=product, quantity=i + 1, price=10)
+        self.url = reverse('inventory:customer_orders')
+
+    def get_all_pages(self):
+        pages, cursor = [], None
+        while True:
+            response = self.client.get(self.url, {'cursor': cursor} if cursor else {})
+            pages.append(response.context['orders'])
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                return response, pages
+
+    def test_summary_aggregates(self):
+        """Test summary figures cover every order, not just the page"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['total_orders'], 7)
+        self.assertEqual(response.context['total_spent'], 10 + 30 + 70)
+        self.assertEqual(response.context['pending_orders'], 2)
+        self.assertEqual(response.context['recent_order'], Order.objects.order_by('-created_at', '-id').first())
+
+    def test_pages_cover_every_order_once(self):
+        """Test walking the cursors returns every order once, newest first"""
+        response, pages = self.get_all_pages()
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        ids = [order.id for page in pages for order in page]
+        self.assertEqual(ids, list(Order.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+        self.assertEqual(response.context['total_orders'], 7)
+
+    def test_item_counts_annotated(self):
+        """Test per-order item totals come from the query"""
+        for order in self.client.get(self.url).context['orders']:
+            self.assertEqual(order.total_items, sum(item.quantity for item in order.items.all()))
+
+    def test_queries_bounded(self):
+        """Test later pages cost no more queries than the first"""
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as later:
+            self.client.get(self.url, {'cursor': response.context['next_cursor']})
+        # A later page only adds the query for the latest order's status
+        self.assertEqual(len(later), len(first) + 1)
+
+    def test_cursor_round_trip(self):
+        """Test cursors encode (created_at, id) and reject garbage"""
+        order = Order.objects.first()
+        self.assertEqual(decode_cursor(encode_cursor(order)), (order.created_at, order.id))
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+    def test_invalid_cursor_redirects(self):
+        """Test a malformed cursor sends the user back to the first page"""
+        response = self.client.get(self.url, {'cursor': '!!!'})
+        self.assertRedirects(response, self.url)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Full-text index is SQLite FTS5')
+class ProductSearchTest(TestCase):
+    """Test ranked prefix search over the product full-text index"""
+
+    def setUp(self):
+        self.client = Client()
+        self.staff = CustomUser.objects.create_user(
+            email='staff@example.com',
+            username='staff',
+            password='testpass123',
+            role='staff',
+            is_approved=True
+        )
+        self.client.force_login(self.staff)
+        self.rockets = Category.objects.create(name='Rockets')
+        self.sparklers = Category.objects.create(name='Sparklers')
+        self.sky_shot = Product.objects.create(
+            category=self.rockets, name='Sky Shot', description='Whistling rocket',
+            price=10, stock_quantity=20
+        )
+        self.gold = Product.objects.create(
+            category=self.sparklers, name='Gold Sparkler', description='Bright like a sky shot',
+            price=5, stock_quantity=20
+        )
+
+    def names(self, query):
+        return [product.name for product in search_products(query, 10)]
+
+    def test_match_query(self):
+        """Test user input becomes quoted prefix terms"""
+        self.assertEqual(build_match_query('sky "sh'), '"sky"* AND "sh"*')
+        self.assertEqual(build_match_query('  *()'), '')
+
+    def test_prefix_and_ranking(self):
+        """Test prefixes match and name matches rank above description matches"""
+        self.assertEqual(self.names('sky sh'), ['Sky Shot', 'Gold Sparkler'])
+        self.assertEqual(self.names('spark'), ['Gold Sparkler'])
+        self.assertEqual(self.names('rock'), ['Sky Shot'])
+        self.assertEqual(self.names('nothing'), [])
+
+    def test_index_follows_writes(self):
+        """Test updates, F() updates, category renames and deletes reach the index"""
+        Product.objects.filter(id=self.sky_shot.id).update(name='Thunder King')
+        self.assertEqual(self.names('thunder'), ['Thunder King'])
+        self.rockets.name = 'Aerials'
+        self.rockets.save()
+        self.assertEqual(self.names('aerial'), ['Thunder King'])
+        self.assertEqual(self.names('rockets'), [])
+        self.gold.delete()
+        self.assertEqual(self.names('gold'), [])
+
+    def test_staff_inventory_search(self):
+        """Test the staff inventory page lists ranked matches"""
+        response = self.client.get(reverse('inventory:staff_inventory'), {'search': 'sky'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p.name for p in response.context['products']], ['Sky Shot', 'Gold Sparkler'])
+
+    def test_typeahead(self):
+        """Test the typeahead endpoint returns capped JSON results"""
+        response = self.client.get(reverse('inventory:product_search'), {'q': 'sky', 'limit': 1})
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['name'], 'Sky Shot')
+        self.assertEqual(results[0]['category'], 'Rockets')
+
+    def test_typeahead_min_length(self):
+        """Test one-character queries and words never reach the index"""
+        url = reverse('inventory:product_search')
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url, {'q': 's'}).json()['results'], [])
+        self.assertFalse([q['sql'] for q in queries if 'inventory_product_fts' in q['sql']])
+        self.assertEqual(self.client.get(url, {'q': 'g'}).json()['results'], [])
+        results = self.client.get(url, {'q': 'sky s'}).json()['results']
+        self.assertEqual([r['name'] for r in results], ['Sky Shot', 'Gold Sparkler'])
+
+    def test_typeahead_ranks_capped_candidates(self):
+        """Test short prefixes on a large catalog rank a bounded candidate set"""
+        Product.objects.bulk_create([
+            Product(category=self.rockets, name=f'Skyline {i}', description='Aerial', price=10, stock_quantity=20)
+            for i in range(TYPEAHEAD_CANDIDATES * 5)
+        ])
+        results = self.client.get(reverse('inventory:product_search'), {'q': 'sk'}).json()['results']
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(r['name'].startswith('Sky') for r in results))
+
+        sql, params = ranked_query(build_match_query('sk'), 10, TYPEAHEAD_CANDIDATES)
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        # The index is read in a limited subquery and only that is sorted
+        self.assertTrue(plan[0].startswith(('CO-ROUTINE', 'MATERIALIZE')), plan)
+        self.assertIn('VIRTUAL TABLE', plan[1])
+        self.assertEqual(plan[2:], ['SCAN (subquery-1)', 'USE TEMP B-TREE FOR ORDER BY'])
+
+    def test_typeahead_prefers_name_matches(self):
+        """Test a new name match beats more than the candidate cap of older description matches"""
+        Product.objects.bulk_create([
+            Product(category=self.sparklers, name=f'Sparkler {i}', description='Skyward glow', price=5, stock_quantity=20)
+            for i in range(TYPEAHEAD_CANDIDATES + 50)
+        ])
+        skyward = Product.objects.create(
+            category=self.rockets, name='Skyward Rocket', description='Aerial', price=10, stock_quantity=20
+        )
+        results = self.client.get(reverse('inventory:product_search'), {'q': 'skyw'}).json()['results']
+        self.assertEqual(results[0]['id'], skyward.id)
+        self.assertEqual(len(results), 10)
+
+        # Too few name matches: other columns fill the remaining places
+        results = self.client.get(reverse('inventory:product_search'), {'q': 'whist'}).json()['results']
+        self.assertEqual([r['name'] for r in results], ['Sky Shot'])
+
+    def test_typeahead_staff_only(self):
+        """Test customers cannot use the typeahead endpoint"""
+        customer = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123',
+            is_approved=True
+        )
+        self.client.force_login(customer)
+        response = self.client.get(reverse('inventory:product_search'), {'q': 'sky'})
+        self.assertNotEqual(response.status_code, 200)
+
+
+class ProductCsvTest(TestCase):
+    """Test streaming product CSV export and chunked bulk import"""
+
+    def setUp(self):
+        self.client = Client()
+        self.staff = CustomUser.objects.create_user(
+            email='staff@example.com',
+            username='staff',
+            password='testpass123',
+            role='staff',
+            is_approved=True
+        )
+        self.client.force_login(self.staff)
+        create_catalog(2, products_per_category=2)
+
+    def upload(self, text):
+        return self.client.post(reverse('inventory:import_product_csv'), {
+            'file': SimpleUploadedFile('products.csv', text.encode(), content_type='text/csv'),
+        })
+
+    def export(self):
+        response = self.client.get(reverse('inventory:export_product_csv'))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_lists_every_product(self):
+        """Test the export has a header and one row per product in id order"""
+        lines = self.export().splitlines()
+        self.assertEqual(lines[0], 'id,name,category,price,stock_quantity,description,is_active')
+        first = Product.objects.order_by('id').first()
+        self.assertEqual(lines[1], f'{first.id},Product 0-0,Category 000,10.00,20,Test product,True')
+        self.assertEqual(len(lines), 5)
+
+    def test_export_round_trips(self):
+        """Test an unedited export imports back as updates without errors"""
+        data = self.upload(self.export()).json()
+        self.assertEqual((data['created'], data['updated'], data['errors']), (0, 4, []))
+
+    def test_import_applies_each_action(self):
+        """Test create, update and add_stock rows are applied"""
+        product = Product.objects.get(name='Product 0-0')
+        other = Product.objects.get(name='Product 1-1')
+        total_products = get_stats().total_products
+        data = self.upload(
+            'action,id,name,category,price,stock_quantity,quantity,description\n'
+            'create,,Sky Shot,Category 001,25.50,40,,Whistling rocket\n'
+            f',{product.id},Renamed,,12,,,\n'
+            f'add_stock,{other.id},,,,,15,\n'
+            f'add_stock,{other.id},,,,,5,\n'
+        ).json()
+        self.assertEqual((data['created'], data['updated'], data['stock_added']), (1, 1, 1))
+
+        created = Product.objects.get(name='Sky Shot')
+        self.assertEqual((created.category.name, created.price, created.stock_quantity),
+                         ('Category 001', Decimal('25.50'), 40))
+        product.refresh_from_db()
+        self.assertEqual((product.name, product.price, product.stock_quantity), ('Renamed', Decimal('12'), 20))
+        self.assertEqual(Product.objects.get(id=other.id).stock_quantity, 40)
+        self.assertEqual(get_stats().total_products, total_products + 1)
+        # The full-text index is maintained by triggers, bulk writes included
+        self.assertEqual([p.name for p in search_products('whistling', 10)], ['Sky Shot'])
+
+    def test_import_refreshes_catalog_after_commit(self):
+        """Test an import bumps the catalog version once, after it commits"""
+        version = get_catalog()['catalog_version']
+        product = Product.objects.get(name='Product 0-0')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.upload(f'id,name\n{product.id},Renamed\n')
+            self.assertEqual(get_catalog()['catalog_version'], version)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_catalog()['catalog_version'], version + 1)
+
+    def test_import_reports_row_errors(self):
+        """Test invalid rows are reported by line and skipped"""
+        product = Product.objects.get(name='Product 0-0')
+        data = self.upload(
+            'action,id,name,category,price,stock_quantity,quantity\n'
+            'create,,Good,Category 000,5,10,\n'
+            'create,,No Price,Category 000,,10,\n'
+            'create,,Bad Category,Nowhere,5,10,\n'
+            f'update,{product.id},,,-3,,\n'
+            'add_stock,9999,,,,,5\n'
+            f'add_stock,{product.id},,,,,0\n'
+            'explode,,,,,,\n'
+        ).json()
+        self.assertEqual(data['created'], 1)
+        self.assertEqual([error['line'] for error in data['errors']], [3, 4, 5, 6, 7, 8])
+        self.assertEqual(data['errors'][0]['errors'], ['price: This field is required.'])
+        self.assertIn('Unknown category', data['errors'][1]['errors'][0])
+        self.assertTrue(data['errors'][2]['errors'][0].startswith('price:'))
+        self.assertEqual(Product.objects.get(id=product.id).price, Decimal('10'))
+
+    def test_import_queries_do_not_grow_with_rows(self):
+        """Test a chunk costs the same number of queries for 3 or 60 rows"""
+        def import_rows(count, prefix):
+            text = 'name,category,price,stock_quantity\n' + ''.join(
+                f'{prefix} {i},Category 000,5,10\n' for i in range(count)
+            )
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.upload(text).json()['created'], count)
+            return len(queries)
+
+        self.assertEqual(import_rows(3, 'Small'), import_rows(60, 'Large'))
+
+    def test_import_rejects_unreadable_files(self):
+        """Test unknown columns, non-UTF-8 files and missing uploads are refused"""
+        response = self.upload('name,colour\nSky Shot,red\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Unknown columns: colour')
+        response = self.client.post(reverse('inventory:import_product_csv'), {
+            'file': SimpleUploadedFile('products.csv', 'name\nCaf\xe9\n'.encode('latin-1')),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post(reverse('inventory:import_product_csv')).status_code, 400)
+
+    def test_customers_cannot_import_or_export(self):
+        """Test the CSV endpoints are staff only"""
+        customer = CustomUser.objects.create_user(
+            email='customer@example.com', username='customer', password='testpass123', is_approved=True
+        )
+        self.client.force_login(customer)
+        self.assertEqual(self.client.get(reverse('inventory:export_product_csv')).status_code, 403)
+        self.assertEqual(self.upload('name\nSky Shot\n').status_code, 403)
+
+
+class SalesRollupTest(OrderFixtureMixin, TestCase):
+    """Test daily sales rollups and the analytics endpoints that read them"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin'
+        )
+        self.client.force_login(self.admin)
+        create_catalog(2, products_per_category=2)
+        self.products = list(Product.objects.select_related('category').order_by('id'))
+        self.today = timezone.localdate()
+
+    def days_ago(self, days):
+        return timezone.now() - timedelta(days=days)
+
+    def rollup_rows(self):
+        """Non-empty rows of each rollup; deltas leave emptied rows behind"""
+        return (
+            sorted(DailySales.objects.filter(orders__gt=0).values_list('day', 'status', 'orders', 'revenue')),
+            sorted(DailyProductSales.objects.filter(units__gt=0).values_list(
+                'day', 'product_id', 'status', 'units', 'revenue'
+            )),
+            sorted(DailyCategorySales.objects.filter(units__gt=0).values_list(
+                'day', 'category_id', 'status', 'units', 'revenue'
+            )),
+        )
+
+    def assertMatchesRebuild(self):
+        rows = self.rollup_rows()
+        rebuild_all()
+        self.assertEqual(rows, self.rollup_rows())
+
+    def analytics(self, name, **params):
+        response = self.client.get(reverse(f'inventory:{name}'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_new_orders_are_rolled_up(self):
+        """Test an order and its lines land in all three rollups"""
+        self.create_order(lines=[(0, 2), (2, 1)])
+        self.create_order(lines=[(0, 1)])
+        category = self.products[0].category_id
+        self.assertEqual(self.rollup_rows(), (
+            [(self.today, 'pending', 2, Decimal('40.00'))],
+            [(self.today, self.products[0].id, 'pending', 3, Decimal('30.00')),
+             (self.today, self.products[2].id, 'pending', 1, Decimal('10.00'))],
+            sorted([(self.today, category, 'pending', 3, Decimal('30.00')),
+                    (self.today, self.products[2].category_id, 'pending', 1, Decimal('10.00'))]),
+        ))
+        self.assertMatchesRebuild()
+
+    def test_checkout_adds_deltas(self):
+        """Test checkout counts its bulk-created lines without recomputing the day"""
+        self.create_order(lines=[(0, 1)])
+        cart = {
+            str(product.id): {'name': product.name, 'price': '10', 'quantity': 2}
+            for product in self.products[:3]
+        }
+        with CaptureQueriesContext(connection) as queries:
+            place_order(AnonymousUser(), {
+                'fullName': 'Test Customer',
+                'email': 'customer@example.com',
+                'phone': '9876543210',
+                'deliveryAddress': '1 Test Street',
+            }, cart)
+        self.assertFalse([q['sql'] for q in queries if 'GROUP BY' in q['sql']])
+        self.assertEqual(DailySales.objects.get().revenue, Decimal('70.00'))
+        self.assertEqual(DailyProductSales.objects.get(product=self.products[0]).units, 3)
+        self.assertMatchesRebuild()
+
+    def test_status_changes_and_deletes_move_rollups(self):
+        """Test single saves, bulk transitions and deletes move the orders' deltas"""
+        first = self.create_order(lines=[(0, 1)])
+        second = self.create_order('processing', [(1, 1), (2, 3)])
+        first.status = 'processing'
+        with CaptureQueriesContext(connection) as queries:
+            first.save()
+        self.assertFalse([q['sql'] for q in queries if 'GROUP BY' in q['sql']])
+        self.assertEqual(self.rollup_rows()[0], [(self.today, 'processing', 2, Decimal('50.00'))])
+        self.assertMatchesRebuild()
+
+        transition_orders('shipped', order_ids=[first.id, second.id])
+        self.assertEqual(self.rollup_rows()[0], [(self.today, 'shipped', 2, Decimal('50.00'))])
+        self.assertMatchesRebuild()
+
+        second.delete()
+        self.assertEqual([row[1:4] for row in self.rollup_rows()[1]], [(self.products[0].id, 'shipped', 1)])
+        self.assertMatchesRebuild()
+
+    def test_edits_and_cascades_update_rollups(self):
+        """Test edited totals and lines, line deletes and product delete cascades reach the rollups"""
+        order = self.create_order(lines=[(0, 2), (1, 1)])
+        other = self.create_order('processing', [(0, 1), (2, 1)])
+        order.total_amount = Decimal('35.00')
+        order.save()
+        self.assertEqual(DailySales.objects.get(status='pending').revenue, Decimal('35.00'))
+        self.assertMatchesRebuild()
+
+        item = order.items.get(product=self.products[0])
+        item.quantity, item.price = 1, Decimal('15.00')
+        item.save()
+        item = OrderItem.objects.get(id=item.id)
+        item.product = self.products[3]
+        item.save()
+        self.assertMatchesRebuild()
+
+        order.items.get(product=self.products[1]).delete()
+        self.assertMatchesRebuild()
+        self.products[0].delete()
+        self.assertFalse(DailyProductSales.objects.filter(product=self.products[0].id).exists())
+        self.assertMatchesRebuild()
+
+        order.status = 'cancelled'
+        order.save()
+        other.delete()
+        self.assertMatchesRebuild()
+
+    def test_uncounted_orders_never_go_negative(self):
+        """Test moving orders missing from the rollups leaves counts at zero instead of failing"""
+        order = self.create_order(lines=[(0, 1)])
+        for model in (DailySales, DailyProductSales, DailyCategorySales):
+            model.objects.all().delete()
+
+        transition_orders('processing', order_ids=[order.id])
+        self.assertFalse(DailySales.objects.filter(status='pending').exists())
+        DailySales.objects.update(orders=0, revenue=0)
+        DailyProductSales.objects.update(units=0, revenue=0)
+        transition_orders('cancelled', order_ids=[order.id])
+        self.assertEqual(
+            sorted(DailySales.objects.values_list('status', 'orders', 'revenue')),
+            [('cancelled', 1, Decimal('10.00')), ('processing', 0, Decimal('0.00'))],
+        )
+        self.assertEqual(DailyProductSales.objects.get(status='processing').units, 0)
+
+    def test_migration_backfills_existing_orders(self):
+        """Test the rollups migration counts orders placed before it"""
+        self.create_order(lines=[(0, 2), (2, 1)])
+        self.create_order('delivered', [(1, 1)], created_at=self.days_ago(5))
+        expected = self.rollup_rows()
+        for model in (DailySales, DailyProductSales, DailyCategorySales):
+            model.objects.all().delete()
+
+        migration = import_module('inventory.migrations.0014_sales_rollups')
+        migration.backfill_rollups(django_apps, connection.schema_editor())
+        self.assertEqual(self.rollup_rows(), expected)
+
+    def test_refresh_command_rebuilds_from_orders(self):
+        """Test the command repairs rollups after writes that skip signals"""
+        self.create_order(lines=[(0, 1)], created_at=self.days_ago(3))
+        self.create_order('delivered', [(1, 2)], created_at=self.days_ago(40))
+        expected = self.rollup_rows()
+        Order.objects.update(status='cancelled')
+        DailySales.objects.all().delete()
+
+        call_command('refresh_sales_rollups', days=7, stdout=StringIO())
+        self.assertEqual(DailySales.objects.get().status, 'cancelled')
+        call_command('refresh_sales_rollups', stdout=StringIO())
+        rows = self.rollup_rows()
+        self.assertEqual(len(rows[0]), 2)
+        self.assertTrue(all(row[1] == 'cancelled' for row in rows[0]))
+        self.assertEqual([row[0] for row in rows[0]], [row[0] for row in expected[0]])
+        with self.assertRaises(CommandError):
+            call_command('refresh_sales_rollups', since='2025-02-30', stdout=StringIO())
+
+    def test_sales_series_zero_filled(self):
+        """Test daily sales cover every day in the range, cancelled excluded"""
+        self.create_order(lines=[(0, 1)], created_at=self.days_ago(2))
+        self.create_order(lines=[(0, 3)])
+        self.create_order('cancelled', [(0, 5)])
+        start = self.today - timedelta(days=2)
+        data = self.analytics('sales_analytics', start=start.isoformat(), end=self.today.isoformat())
+        self.assertEqual(data['labels'], [(start + timedelta(days=i)).isoformat() for i in range(3)])
+        self.assertEqual(data['orders'], [1, 0, 1])
+        self.assertEqual(data['revenue'], [10.0, 0.0, 30.0])
+
+        data = self.analytics('sales_analytics', status='cancelled')
+        self.assertEqual(len(data['labels']), 30)
+        self.assertEqual(data['orders'][-1], 1)
+
+    def test_product_and_category_analytics(self):
+        """Test top products and category shares come from the rollups only"""
+        self.create_order(lines=[(0, 1), (1, 4)])
+        self.create_order(lines=[(2, 2)], created_at=self.days_ago(1))
+        with CaptureQueriesContext(connection) as queries:
+            products = self.analytics('product_analytics', limit=2)
+            categories = self.analytics('category_analytics')
+        sql = ' '.join(q['sql'] for q in queries)
+        self.assertNotIn('"inventory_order"', sql)
+        self.assertNotIn('"inventory_orderitem"', sql)
+
+        self.assertEqual(products['labels'], [self.products[1].name, self.products[2].name])
+        self.assertEqual(products['units'], [4, 2])
+        self.assertEqual(categories['labels'], ['Category 000', 'Category 001'])
+        self.assertEqual(categories['revenue'], [50.0, 20.0])
+        self.assertEqual(categories['share'], [71.4, 28.6])
+
+    def test_analytics_rejects_bad_filters(self):
+        """Test invalid ranges, statuses and options are refused"""
+        url = reverse('inventory:sales_analytics')
+        self.assertEqual(self.client.get(url, {'start': 'last week'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2025-10-05', 'end': '2025-10-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start': '2020-01-01', 'end': '2025-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'status': 'pending,lost'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('inventory:product_analytics'), {'order_by': 'name'}).status_code, 400)
+
+
+class PopulateMockDataCommandTest(TestCase):
+    """Test offline bulk mock data generation"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media_override = override_settings(MEDIA_ROOT=media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def populate(self, **options):
+        call_command('populate_mock_data', workers=1, seed=7, stdout=StringIO(), **options)
+
+    def test_populates_everything(self):
+        """Test products, customers and orders are created and counted"""
+        self.populate(products=60, users=3, orders=25, images=2)
+        self.assertEqual(Category.objects.count(), 10)
+        self.assertEqual(Product.objects.count(), 60)
+        self.assertEqual(CustomUser.objects.filter(role='customer', is_approved=True).count(), 3)
+        self.assertEqual(Order.objects.count(), 25)
+        for order in Order.objects.prefetch_related('items'):
+            self.assertEqual(order.total_amount, sum(item.total for item in order.items.all()))
+        # Orders keep their backdated timestamps
+        self.assertLess(Order.objects.order_by('created_at').first().created_at, timezone.now() - timedelta(minutes=1))
+        self.assertFalse(Order.objects.exclude(updated_at=F('created_at')).exists())
+        # Model fields are left as they were, so later saves are still stamped
+        self.assertTrue(Order._meta.get_field('updated_at').auto_now)
+        stats = get_stats()
+        self.assertEqual((stats.total_products, stats.total_orders, stats.total_users), (60, 25, 3))
+        self.assertEqual(DailySales.objects.aggregate(total=Sum('orders'))['total'], 25)
+
+    def test_images_generated_locally(self):
+        """Test products share generated images with derivatives"""
+        self.populate(products=4, images=2)
+        names = set(Product.objects.values_list('image', flat=True))
+        self.assertEqual(len(names), 2)
+        for product in Product.objects.all():
+            self.assertTrue(default_storage.exists(product.image.name))
+            self.assertEqual(product.image_widths, list(settings.PRODUCT_IMAGE_WIDTHS))
+
+    def test_rerun_reuses_categories(self):
+        """Test running twice adds products but not categories"""
+        self.populate(products=10, images=0)
+        self.populate(products=10, images=0)
+        self.assertEqual(Category.objects.count(), 10)
+        self.assertEqual(Product.objects.count(), 20)
+
+    def test_orders_need_customers(self):
+        """Test orders without any customers is an error"""
+        with self.assertRaises(CommandError):
+            self.populate(products=5, images=0, orders=5)
+
+    def test_invalid_worker_and_batch_counts(self):
+        """Test zero workers or batch size is refused before anything is created"""
+        for options in ({'workers': 0}, {'batch_size': 0}):
+            with self.assertRaises(CommandError):
+                call_command('populate_mock_data', products=5, images=1, seed=7, stdout=StringIO(),
+                             **{'workers': 1, **options})
+        self.assertFalse(Product.objects.exists())
+
+
+class StaticAssetsTest(TestCase):
+    """Test page CSS and JavaScript ship as hashed, precompressed static files"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.static_override = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STORAGES={
+                **settings.STORAGES,
+                'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+            },
+        )
+        cls.static_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.manifest = json.loads((Path(cls.static_root) / 'staticfiles.json').read_text())['paths']
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.static_override.disable()
+        shutil.rmtree(cls.static_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+        self.user = CustomUser.objects.create_user(
+            email='customer@example.com', username='customer', password='testpass123', is_approved=True
+        )
+        create_catalog(2)
+
+    def serve(self, path, **headers):
+        # WhiteNoise scans STATIC_ROOT when the client first loads middleware
+        response = self.client.get(settings.STATIC_URL + path, **headers)
+        b''.join(response.streaming_content)
+        return response
+
+    def test_pages_link_bundles(self):
+        """Test the storefront links its bundles instead of inlining them"""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('inventory:home'))
+        self.assertNotContains(response, '<style>')
+        for name in ('base.css', 'base.js', 'home.css', 'home.js'):
+            self.assertContains(response, f'/static/{self.manifest[f"inventory/{name}"]}')
+
+    def test_bundles_hashed_and_compressed(self):
+        """Test collectstatic writes hashed gzip and brotli copies of each bundle"""
+        for name in ('base', 'home', 'admin_dashboard'):
+            for ext in ('css', 'js'):
+                hashed = self.manifest[f'inventory/{name}.{ext}']
+                self.assertRegex(hashed, rf'^inventory/{name}\.[0-9a-f]{{12}}\.{ext}$')
+                for suffix in ('', '.gz', '.br'):
+                    self.assertTrue((Path(self.static_root) / f'{hashed}{suffix}').exists())
+
+    def test_hashed_bundle_cached_forever(self):
+        """Test hashed bundles are served immutable, brotli-encoded when accepted"""
+        hashed = self.manifest['inventory/home.css']
+        response = self.serve(hashed, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=315360000', response['Cache-Control'])
+
+    def test_unhashed_bundle_revalidated(self):
+        """Test the unhashed name is only cached briefly"""
+        response = self.serve('inventory/home.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+class RequestMetricsTest(TestCase):
+    """Test Server-Timing headers and the per-view metrics endpoint"""
+
+    def setUp(self):
+        metrics_registry.reset()
+        self.client = Client()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com',
+            username='admin',
+            password='testpass123',
+            role='admin',
+            is_approved=True
+        )
+        create_catalog(2)
+
+    def server_timing(self, response):
+        return dict(
+            re.match(r'(\w+);dur=([\d.]+)', part.strip()).groups()
+            for part in response['Server-Timing'].split(',')
+        )
+
+    def test_server_timing_header(self):
+        """Test responses report db, template, view and total time"""
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('inventory:home'))
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'tpl', 'view', 'total'})
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        self.assertGreater(float(timing['tpl']), 0)
+        self.assertLessEqual(float(timing['view']), float(timing['total']))
+
+    def test_histograms_by_url_name(self):
+        """Test requests are aggregated per URL name"""
+        self.client.force_login(self.admin)
+        for _ in range(3):
+            self.client.get(reverse('inventory:dashboard_data'))
+        self.client.get('/no-such-page/')
+        text = self.client.get(reverse('inventory:metrics')).content.decode()
+        self.assertIn('crackers_request_duration_seconds_count{view="inventory:dashboard_data"} 3', text)
+        self.assertIn('crackers_request_duration_seconds_bucket{view="inventory:dashboard_data",le="+Inf"} 3', text)
+        self.assertIn('crackers_requests_total{view="inventory:dashboard_data",method="GET",status="200"} 3', text)
+        self.assertIn('crackers_requests_total{view="<unmatched>",method="GET",status="404"} 1', text)
+        self.assertIn('# TYPE crackers_request_db_seconds histogram', text)
+
+    def test_buckets_cumulative(self):
+        """Test histogram buckets count every observation at or below them"""
+        timings = RequestTimings()
+        timings.total = 0.03
+        metrics_registry.observe('view', 'GET', 200, timings)
+        text = metrics_registry.render()
+        self.assertIn('crackers_request_duration_seconds_bucket{view="view",le="0.025"} 0', text)
+        self.assertIn('crackers_request_duration_seconds_bucket{view="view",le="0.05"} 1', text)
+        self.assertIn('crackers_request_duration_seconds_bucket{view="view",le="10.0"} 1', text)
+
+    def test_metrics_admin_only(self):
+        """Test non-admins cannot read metrics"""
+        customer = CustomUser.objects.create_user(
+            email='customer@example.com',
+            username='customer',
+            password='testpass123',
+            is_approved=True
+        )
+        self.client.force_login(customer)
+        response = self.client.get(reverse('inventory:metrics'))
+        self.assertNotEqual(response.status_code, 200)
+
+
+class BenchmarkCheckTest(TestCase):
+    """Test the benchmark budget and regression gates"""
+
+    def test_query_budget(self):
+        """Test exceeding a view's query budget fails"""
+        budget = benchmarks.QUERY_BUDGETS['home']
+        self.assertEqual(benchmarks.check(benchmarks.Result('home', budget, 1, 1), {}, 1.0), [])
+        self.assertEqual(len(benchmarks.check(benchmarks.Result('home', budget + 1, 1, 1), {}, 1.0)), 1)
+
+    def test_latency_regression(self):
+        """Test a median past baseline * (1 + tolerance) fails"""
+        baselines = {'home': {'median_ms': 10.0}}
+        self.assertEqual(benchmarks.check(benchmarks.Result('home', 1, 19.0, 30.0), baselines, 1.0), [])
+        failures = benchmarks.check(benchmarks.Result('home', 1, 21.0, 30.0), baselines, 1.0)
+        self.assertIn('baseline 10.00 ms', failures[0])
+
+
+class ViewBenchmarkTest(TestCase):
+    """Test hot views stay within their query budgets and latency baselines"""
+
+    @classmethod
+    def setUpTestData(cls):
+        scale = benchmarks.get_scale()
+        call_command(
+            'populate_mock_data', products=2000 * scale, users=20, orders=5000 * scale,
+            images=0, workers=1, seed=17, stdout=StringIO()
+        )
+        cls.admin = CustomUser.objects.create_user(
+            email='admin@example.com', username='admin', password='testpass123',
+            role='admin', is_approved=True
+        )
+        cls.staff = CustomUser.objects.create_user(
+            email='staff@example.com', username='staff', password='testpass123',
+            role='staff', is_approved=True
+        )
+        cls.customer = CustomUser.objects.filter(role='customer').annotate(
+            order_count=Count('orders')
+        ).order_by('-order_count').first()
+        cls.order = cls.customer.orders.order_by('-created_at').first()
+        cls.cart_products = list(Product.objects.filter(stock_quantity__gte=20)[:3])
+
+    def setUp(self):
+        cache.clear()
+        invoice_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, invoice_dir, ignore_errors=True)
+        invoice_override = override_settings(INVOICE_CACHE_DIR=invoice_dir)
+        invoice_override.enable()
+        self.addCleanup(invoice_override.disable)
+        self.client = Client()
+
+    def run_benchmark(self, name, user, request):
+        self.client.force_login(user)
+
+        def request_and_commit():
+            # TestCase never commits, so run the on_commit work a real
+            # request would and count its queries too
+            with self.captureOnCommitCallbacks(execute=True):
+                return request()
+
+        result = benchmarks.measure(name, request_and_commit)
+        scale = benchmarks.get_scale()
+        if benchmarks.recording():
+            benchmarks.save_baseline(scale, result)
+        baselines = benchmarks.load_baselines(scale) if benchmarks.checking_latency() else {}
+        failures = benchmarks.check(result, baselines, benchmarks.get_tolerance())
+        self.assertFalse(failures, '\n'.join(failures))
+
+    def test_home(self):
+        """Test the storefront catalog page"""
+        self.run_benchmark('home', self.customer, lambda: self.client.get(reverse('inventory:home')))
+
+    def test_checkout(self):
+        """Test placing a three line order"""
+        payload = json.dumps({
+            'customerData': {
+                'fullName': 'Bench Customer',
+                'email': 'bench@example.com',
+                'phone': '9876543210',
+                'deliveryAddress': '1 Test Street',
+            },
+            'cartItems': {
+                str(p.id): {'name': p.name, 'price': str(p.price), 'quantity': 1}
+                for p in self.cart_products
+            },
+        })
+        self.run_benchmark('checkout', self.customer, lambda: self.client.post(
+            reverse('inventory:checkout'), data=payload, content_type='application/json'
+        ))
+
+    def test_dashboard_data(self):
+        """Test the dashboard polling endpoint"""
+        self.run_benchmark('dashboard_data', self.admin, lambda: self.client.get(reverse('inventory:dashboard_data')))
+
+    def test_filter_orders(self):
+        """Test filtering orders by status"""
+        self.run_benchmark('filter_orders', self.admin, lambda: self.client.get(
+            reverse('inventory:filter_orders', args=['delivered'])
+        ))
+
+    def test_customer_orders(self):
+        """Test the first page of a busy customer's orders"""
+        self.run_benchmark('customer_orders', self.customer, lambda: self.client.get(reverse('inventory:customer_orders')))
+
+    def test_staff_inventory(self):
+        """Test the full staff inventory listing"""
+        self.run_benchmark('staff_inventory', self.staff, lambda: self.client.get(reverse('inventory:staff_inventory')))
+
+    def test_staff_inventory_search(self):
+        """Test a staff inventory search"""
+        self.run_benchmark('staff_inventory_search', self.staff, lambda: self.client.get(
+            reverse('inventory:staff_inventory'), {'search': 'sky'}
+        ))
+
+    def test_generate_invoice(self):
+        """Test downloading an invoice, rendered once then cached"""
+        self.run_benchmark('generate_invoice', self.customer, lambda: self.client.get(
+            reverse('inventory:generate_invoice', args=[self.order.id])
+        ))
+
+
+class QueryPlanTest(TestCase):
+    """Test that hot queries are answered from indexes, not full scans"""
+
+    def assertIndexed(self, queryset):
+        plan = queryset.explain()
+        for line in plan.splitlines():
+            # "SCAN table" without "USING ... INDEX" reads every row
+            self.assertFalse(re.search(r'SCAN \w+$', line), f'Full table scan:\n{plan}')
+            self.assertNotIn('USE TEMP B-TREE', line, f'Unindexed sort:\n{plan}')
+
+    def test_storefront_catalog(self):
+        """Test the home page catalog query"""
+        self.assertIndexed(get_active_products())
+
+    def test_staff_inventory_listing(self):
+        """Test the staff_inventory product listing"""
+        self.assertIndexed(Product.objects.order_by('category', 'name'))
+
+    def test_low_stock_products(self):
+        """Test the dashboard low stock list"""
+        self.assertIndexed(Product.objects.filter(stock_quantity__lt=LOW_STOCK_THRESHOLD))
+
+    def test_recent_orders(self):
+        """Test the dashboard recent orders and filter_orders('all')"""
+        self.assertIndexed(Order.objects.order_by('-created_at')[:10])
+
+    def test_orders_by_status(self):
+        """Test filter_orders for a single status"""
+        self.assertIndexed(Order.objects.filter(status='pending').order_by('-created_at')[:10])
+
+    def test_customer_orders(self):
+        """Test a customer_orders keyset page"""
+        orders = Order.objects.filter(user_id=1).order_by('-created_at', '-id')
+        self.assertIndexed(orders[:21])
+        self.assertIndexed(orders.filter(
+            Q(created_at__lt=timezone.now()) | Q(created_at=timezone.now(), id__lt=5)
+        )[:21])
@@ -7,10 +7,18 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('update-stock/', views.update_stock, name='update_stock'),
     path('checkout/', views.checkout, name='checkout'),
+    path('api/catalog/', views.catalog_api, name='catalog_api'),
 
     # ✅ Admin dashboard and related routes
     path('admin/dashboard/', views.admin_dashboard, name='admin_dashboard'),
     path('admin/dashboard-data/', views.dashboard_data, name='dashboard_data'),
+    path('admin/dashboard-events/', views.dashboard_events, name='dashboard_events'),
+    path('admin/metrics/', views.metrics, name='metrics'),
+    path('admin/analytics/sales/', views.sales_analytics, name='sales_analytics'),
+    path('admin/analytics/products/', views.product_analytics, name='product_analytics'),
+    path('admin/analytics/categories/', views.category_analytics, name='category_analytics'),
+    path('admin/orders/bulk-status/', views.bulk_update_order_status, name='bulk_update_order_status'),
+    path('admin/orders/export/', views.export_order_csv, name='export_order_csv'),
     path('update-order-status/<int:order_id>/', views.update_order_status, name='update_order_status'),
     path('order-details/<int:order_id>/', views.order_details, name='order_details'),
     path('filter-orders/<str:status>/', views.filter_orders, name='filter_orders'),
@@ -18,6 +26,9 @@ urlpatterns = [
 
     # ✅ Staff and Product routes
     path('staff/inventory/', views.staff_inventory, name='staff_inventory'),
+    path('staff/inventory/export/', views.export_product_csv, name='export_product_csv'),
+    path('staff/inventory/import/', views.import_product_csv, name='import_product_csv'),
+    path('products/search/', views.product_search, name='product_search'),
     path('products/<int:product_id>/delete/', views.delete_product, name='delete_product'),
     path('products/<int:product_id>/', views.get_product, name='get_product'),
 
@@ -1,6 +1,8 @@
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from datetime import timedelta
 from decimal import Decimal
 
 def format_currency(amount):
@@ -10,10 +12,14 @@ def format_currency(amount):
 import logging
 from django.core.exceptions import ValidationError
 
+from . import events
+from .models import LOW_STOCK_THRESHOLD, Order, Product
+from .outbox import enqueue_email, enqueue_emails
+
 logger = logging.getLogger(__name__)
 
 def send_order_confirmation(order_data):
-    """Send order confirmation email to customer"""
+    """Queue order confirmation email to customer in the outbox"""
     try:
         subject = f'Order Confirmation - Kannan Crackers (Order #{order_data.get("orderId", "N/A")})'            
         customer_data = order_data.get('customerData', {})
@@ -66,21 +72,19 @@ def send_order_confirmation(order_data):
         html_message = render_to_string('inventory/email/order_confirmation.html', context)
         plain_message = render_to_string('inventory/email/order_confirmation.txt', context)
 
-        # Send email
+        # Queue email; the send_outbox worker delivers it
         try:
-            send_mail(
+            enqueue_email(
                 subject=subject,
                 message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
                 recipient_list=[order_data['customerData']['email']],
-                html_message=html_message,
-                fail_silently=False
+                html_message=html_message
             )
-            logger.info(f"Order confirmation email sent successfully to {order_data['customerData']['email']} for order #{order_data.get('orderId', 'N/A')}")
+            logger.info(f"Order confirmation email queued for {order_data['customerData']['email']} for order #{order_data.get('orderId', 'N/A')}")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to send order confirmation email to {order_data['customerData']['email']}: {str(e)}")
+            logger.error(f"Failed to queue order confirmation email to {order_data['customerData']['email']}: {str(e)}")
             # Re-raise the exception to be handled by the view
             raise
             
@@ -94,23 +98,68 @@ def send_order_confirmation(order_data):
 
 
 
-def send_stock_alert(product):
-    """Send low stock alert to admin"""
-    subject = f'Low Stock Alert - {product.name}'
+def send_stock_alert_digest(products):
+    """Queue a single low stock digest listing products to admin in the outbox"""
+    subject = f'Low Stock Alert - {len(products)} product{"s" if len(products) != 1 else ""} below threshold'
     
     context = {
-        'product': product
+        'products': products
     }
 
     # Render email templates
     html_message = render_to_string('inventory/email/stock_alert.html', context)
     plain_message = render_to_string('inventory/email/stock_alert.txt', context)
 
-    # Send email
-    send_mail(
+    # Queue email; the send_outbox worker delivers it
+    return enqueue_email(
         subject=subject,
         message=plain_message,
-        from_email=settings.DEFAULT_FROM_EMAIL,
         recipient_list=[settings.EMAIL_HOST_USER],  # Send to admin email
         html_message=html_message
-    )
\ No newline at end of file
+    )
+
+
+def notify_low_stock(product_ids):
+    """
+    Queue a low stock digest when any of product_ids is below threshold and
+    has not been alerted within STOCK_ALERT_WINDOW. The digest lists every
+    product currently below threshold, and all of them count as alerted.
+    Returns the queued OutboxEmail, or None when nothing new is low.
+    """
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=settings.STOCK_ALERT_WINDOW)
+    not_recently_alerted = Q(low_stock_alerted_at__isnull=True) | Q(low_stock_alerted_at__lt=cutoff)
+    low_stock = Product.objects.filter(stock_quantity__lt=LOW_STOCK_THRESHOLD)
+
+    # Claim the triggering products with a conditional UPDATE so concurrent
+    # checkouts cannot both queue a digest for the same product
+    if not low_stock.filter(not_recently_alerted, id__in=product_ids).update(low_stock_alerted_at=now):
+        return None
+
+    products = list(low_stock.select_related('category').order_by('stock_quantity', 'name'))
+    low_stock.filter(not_recently_alerted).update(low_stock_alerted_at=now)
+    events.publish_on_commit(events.LOW_STOCK, [
+        {'id': p.id, 'name': p.name, 'stock_quantity': p.stock_quantity} for p in products
+    ])
+    return send_stock_alert_digest(products)
+
+
+def send_status_updates(orders, status):
+    """
+    Queue a status update email to each customer in one outbox INSERT.
+    orders are dicts with id, full_name and email.
+    """
+    messages = []
+    for order in orders:
+        context = {
+            'customer_name': order['full_name'],
+            'order_id': order['id'],
+            'status': dict(Order.STATUS_CHOICES)[status],
+        }
+        messages.append({
+            'subject': f'Order #{order["id"]} {context["status"]} - Kannan Crackers',
+            'message': render_to_string('inventory/email/order_status.txt', context),
+            'html_message': render_to_string('inventory/email/order_status.html', context),
+            'recipient_list': [order['email']],
+        })
+    return enqueue_emails(messages)
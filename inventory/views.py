@@ -1,32 +1,76 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Sum
-from .models import Product, Category, Order, OrderItem
+from django.db.models import Count, Q, Sum
+from .models import LOW_STOCK_THRESHOLD, Product, Category, Order, OrderItem
 from accounts.models import CustomUser
 from accounts.decorators import admin_required, staff_required, approved_user_required
-from . import utils
+from . import events, invoices, utils
+from .catalog import get_catalog, get_catalog_feed, get_catalog_version
+from .csv_io import ProductImportError, export_orders, export_products, import_products
+from .orders import UPDATED, CheckoutError, TransitionError, place_order, transition_orders
+from .metrics import registry as metrics_registry
+from .pagination import keyset_page
+from .rollups import SALES_STATUSES, category_share, sales_by_day, top_products
+from .search import search_products
+from .stats import get_dashboard_etag, get_stats
+import asyncio
 import json
+from datetime import datetime, timedelta
+
+# Analytics date ranges: default length and the longest allowed, in days
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_DAYS = 366
+TOP_PRODUCTS_LIMIT = 10
+TOP_PRODUCTS_MAX_LIMIT = 100
+
+# Result caps for the staff inventory search and the typeahead endpoint
+STAFF_SEARCH_LIMIT = 500
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 50
+
+# Typeahead ignores words shorter than this (the staff page sends queries
+# from 2 characters) and ranks at most TYPEAHEAD_CANDIDATES name matches,
+# then as many other matches
+TYPEAHEAD_MIN_LENGTH = 2
+TYPEAHEAD_CANDIDATES = 200
 
 @login_required(login_url='account_login')
 def home(request):
-    # Get all active products with their categories
-    products = Product.objects.filter(is_active=True).select_related('category')
+    # Active products grouped by category, cached per catalog version
+    return render(request, 'inventory/home.html', get_catalog())
 
-    # Get categories sorted alphabetically and group products by category
-    categories = Category.objects.filter(products__is_active=True).distinct().order_by('name')
-    products_by_category = {}
-    for category in categories:
-        products_by_category[category] = products.filter(category=category)
+@require_http_methods(["GET"])
+@condition(etag_func=lambda request: f"catalog-{get_catalog_version()}")
+def catalog_api(request):
+    """
+    Compact JSON catalog for mobile and kiosk clients. Pass ?since=<the
+    previous response's next_since> to get only products changed since.
+    """
+    since = request.GET.get('since')
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            return JsonResponse({'success': False, 'error': 'since must be an ISO 8601 datetime'}, status=400)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
 
-    return render(request, 'inventory/home.html', {
-        'products': products,
-        'categories': categories,
-        'products_by_category': products_by_category
-    })
+    response = JsonResponse(get_catalog_feed(since or None), json_dumps_params={'separators': (',', ':')})
+    # Always revalidate; unchanged catalogs cost a 304
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
 
 from django.views.decorators.http import require_http_methods
 
@@ -59,8 +103,6 @@ def update_stock(request):
             })
     return JsonResponse({'success': False, 'error': 'Invalid method'})
 
-from django.db import transaction
-
 @require_http_methods(["GET", "POST"])
 @login_required(login_url='account_login')
 def checkout(request):
@@ -106,83 +148,21 @@ def checkout(request):
                     'error': 'Cart is empty'
                 })
 
-            # Start database transaction
-            with transaction.atomic():
-                # Check stock availability first
-                for product_id, item in cart_items.items():
-                    try:
-                        product = Product.objects.get(id=product_id)
-                        if product.stock_quantity < item['quantity']:
-                            return JsonResponse({
-                                'success': False,
-                                'error': f'Insufficient stock for {product.name}'
-                            })
-                    except Product.DoesNotExist:
-                        return JsonResponse({
-                            'success': False,
-                            'error': f'Product with ID {product_id} not found'
-                        })
-
-                # Calculate total amount
-                total_amount = sum(float(item['price']) * item['quantity'] for item in cart_items.values())
-                
-                # Create the order
-                order = Order.objects.create(
-                    user=request.user if request.user.is_authenticated else None,
-                    full_name=customer_data['fullName'],
-                    address=customer_data['deliveryAddress'],
-                    phone=customer_data['phone'],
-                    email=customer_data['email'],
-                    total_amount=total_amount,
-                    status='pending'
-                )
-
-                # Create order items
-                for product_id, item in cart_items.items():
-                    product = Product.objects.get(id=product_id)
-                    OrderItem.objects.create(
-                        order=order,
-                        product=product,
-                        quantity=item['quantity'],
-                        price=item['price']
-                    )
+            # Batched pipeline: fixed query count regardless of cart size
+            try:
+                order, total_amount = place_order(request.user, customer_data, cart_items)
+            except CheckoutError as e:
+                return JsonResponse({
+                    'success': False,
+                    'error': str(e)
+                })
 
-                # Update stock quantities
-                for product_id, item in cart_items.items():
-                    product = Product.objects.get(id=product_id)
-                    item_quantity = item.get('quantity', 0)
-                    if item_quantity > 0:
-                        product.stock_quantity -= item_quantity
-                        product.save()
-                        
-                        # Send low stock alert if needed
-                        if product.is_low_stock:
-                            transaction.on_commit(lambda p=product: utils.send_stock_alert(p))
-
-                order_summary = {
-                    'customer': customer_data,
-                    'items': cart_items,
-                    'total': total_amount,
-                    'order_id': order.id
-                }
-                for product_id, item in cart_items.items():
-                    product = Product.objects.get(id=product_id)
-                    item_quantity = item.get('quantity', 0)
-                    if item_quantity > 0:
-                        product.stock_quantity -= item_quantity
-                        product.save()
-                        
-                        # Send low stock alert if needed
-                        if product.is_low_stock:
-                            transaction.on_commit(lambda p=product: utils.send_stock_alert(p))
-
-                # Queue confirmation email to be sent after successful transaction
-                # Queue confirmation email to be sent after successful transaction
-                transaction.on_commit(lambda: utils.send_order_confirmation({
-                    'customerData': customer_data,
-                    'cartItems': cart_items,
-                    'orderId': order.id
-                }))
+            order_summary = {
+                'customer': customer_data,
+                'items': cart_items,
+                'total': float(total_amount),
+                'order_id': order.id
+            }
 
             return JsonResponse({
                 'success': True,
@@ -205,27 +185,33 @@ def checkout(request):
 @login_required(login_url='account_login')
 @admin_required
 def admin_dashboard(request):
+    stats = get_stats()
     context = {
-        'total_users': CustomUser.objects.count(),
-        'total_products': Product.objects.count(),
-        'total_orders': Order.objects.count(),
-        'total_revenue': Order.objects.filter(status='delivered').aggregate(Sum('total_amount'))['total_amount__sum'] or 0,
+        'total_users': stats.total_users,
+        'total_products': stats.total_products,
+        'total_orders': stats.total_orders,
+        'total_revenue': stats.total_revenue,
         'recent_orders': Order.objects.order_by('-created_at')[:10],
-        'low_stock_products': Product.objects.filter(stock_quantity__lt=10)
+        'low_stock_products': Product.objects.filter(stock_quantity__lt=LOW_STOCK_THRESHOLD),
+        'status_choices': Order.STATUS_CHOICES,
     }
     return render(request, 'inventory/admin_dashboard.html', context)
 
 @admin_required
+@condition(etag_func=lambda request: get_dashboard_etag())
 def dashboard_data(request):
+    # Counters come from the incrementally maintained stats row; unchanged
+    # polls are answered with 304 by the ETag check above
+    stats = get_stats()
     data = {
-        'total_users': CustomUser.objects.count(),
-        'total_products': Product.objects.count(),
-        'total_orders': Order.objects.count(),
-        'total_revenue': Order.objects.filter(status='delivered').aggregate(Sum('total_amount'))['total_amount__sum'] or 0,
+        'total_users': stats.total_users,
+        'total_products': stats.total_products,
+        'total_orders': stats.total_orders,
+        'total_revenue': stats.total_revenue,
         'recent_orders': list(Order.objects.order_by('-created_at')[:10].values(
             'id', 'full_name', 'total_amount', 'status'
         )),
-        'low_stock_products': list(Product.objects.filter(stock_quantity__lt=10).values(
+        'low_stock_products': list(Product.objects.filter(stock_quantity__lt=LOW_STOCK_THRESHOLD).values(
             'id', 'name', 'stock_quantity'
         ))
     }
@@ -234,21 +220,92 @@ def dashboard_data(request):
     for order in data['recent_orders']:
         order['status_choices'] = Order.STATUS_CHOICES
     
-    return JsonResponse(data)
+    response = JsonResponse(data)
+    # Make browsers revalidate every poll so If-None-Match is sent
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+def get_user_role(request):
+    user = request.user
+    return user.role if user.is_authenticated else None
+
+async def dashboard_events(request):
+    """
+    Stream dashboard events to admins as server-sent events.
+    Only available under ASGI; WSGI workers answer 204 so the browser stops
+    reconnecting and the dashboard keeps polling dashboard_data instead.
+    """
+    if await sync_to_async(get_user_role)(request) != 'admin':
+        return HttpResponseForbidden('Access Denied')
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    async def stream():
+        subscription = events.broker.subscribe()
+        try:
+            yield f"retry: {settings.DASHBOARD_EVENTS_RETRY_MS}\n\n"
+            while not subscription.overflowed:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), settings.DASHBOARD_EVENTS_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": heartbeat\n\n"
+                else:
+                    yield events.format_event(event)
+        finally:
+            events.broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@admin_required
+def metrics(request):
+    """Per-view request metrics for this process, in Prometheus text format."""
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
 
 @admin_required
 def update_order_status(request, order_id):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            order = Order.objects.get(id=order_id)
-            order.status = data['status']
-            order.save()
-            return JsonResponse({'success': True})
-        except (Order.DoesNotExist, KeyError, json.JSONDecodeError):
+            outcomes, _ = transition_orders(data['status'], order_ids=[order_id])
+        except (AttributeError, KeyError, TypeError, json.JSONDecodeError):
+            return JsonResponse({'success': False, 'error': 'Invalid request body'}, status=400)
+        except TransitionError:
             return JsonResponse({'success': False})
+        # status is the order's status afterwards, so the dashboard can
+        # revert a refused change
+        return JsonResponse({'success': outcomes[0]['outcome'] == UPDATED, 'status': outcomes[0]['status']})
     return JsonResponse({'success': False})
 
+@admin_required
+@require_http_methods(["POST"])
+def bulk_update_order_status(request):
+    """
+    Move many orders to a new status in one UPDATE.
+    Body: {"status": ..., "order_ids": [...]} or {"status": ..., "current_status": ...};
+    answers with the outcome of every targeted order.
+    """
+    try:
+        data = json.loads(request.body)
+        outcomes, has_more = transition_orders(
+            data['status'], order_ids=data.get('order_ids'), current_status=data.get('current_status')
+        )
+    except (AttributeError, KeyError, TypeError, json.JSONDecodeError):
+        return JsonResponse({'success': False, 'error': 'Invalid request body'}, status=400)
+    except TransitionError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({
+        'success': True,
+        'updated': sum(outcome['outcome'] == UPDATED for outcome in outcomes),
+        'results': outcomes,
+        'has_more': has_more,
+    })
+
 @admin_required
 def order_details(request, order_id):
     try:
@@ -262,6 +319,117 @@ def order_details(request, order_id):
     except Order.DoesNotExist:
         return JsonResponse({'success': False})
 
+def start_of_day(value, name, days=0):
+    """
+    Start of the day value (YYYY-MM-DD) plus days, in the current time
+    zone. Raises ValueError if value is not a date.
+    """
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValueError(f'{name} must be a YYYY-MM-DD date')
+    return timezone.make_aware(datetime.combine(day + timedelta(days=days), datetime.min.time()))
+
+@admin_required
+@require_http_methods(["GET"])
+def export_order_csv(request):
+    """
+    Orders and their lines as a streamed CSV download, optionally limited
+    to ?start= and ?end= dates (inclusive) and a ?status=.
+    """
+    orders = Order.objects.all()
+    try:
+        if request.GET.get('start'):
+            orders = orders.filter(created_at__gte=start_of_day(request.GET['start'], 'start'))
+        if request.GET.get('end'):
+            orders = orders.filter(created_at__lt=start_of_day(request.GET['end'], 'end', days=1))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    status = request.GET.get('status')
+    if status:
+        if status not in dict(Order.STATUS_CHOICES):
+            return JsonResponse({'success': False, 'error': f'Unknown status: {status}'}, status=400)
+        orders = orders.filter(status=status)
+
+    response = StreamingHttpResponse(export_orders(orders), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="orders-{timezone.localdate():%Y%m%d}.csv"'
+    return response
+
+def get_analytics_filters(request):
+    """
+    (first_day, last_day, statuses) from ?start=, ?end= and a comma
+    separated ?status=; defaults to the last ANALYTICS_DEFAULT_DAYS days and
+    SALES_STATUSES. Raises ValueError with a message for bad values.
+    """
+    days = {}
+    for name in ('start', 'end'):
+        value = request.GET.get(name)
+        if value:
+            try:
+                days[name] = parse_date(value)
+            except ValueError:
+                days[name] = None
+            if days[name] is None:
+                raise ValueError(f'{name} must be a YYYY-MM-DD date')
+    last_day = days.get('end') or timezone.localdate()
+    first_day = days.get('start') or last_day - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if first_day > last_day:
+        raise ValueError('start must not be after end')
+    if (last_day - first_day).days >= ANALYTICS_MAX_DAYS:
+        raise ValueError(f'The range can be at most {ANALYTICS_MAX_DAYS} days')
+
+    statuses = [status for status in request.GET.get('status', '').split(',') if status]
+    unknown = [status for status in statuses if status not in dict(Order.STATUS_CHOICES)]
+    if unknown:
+        raise ValueError(f"Unknown status: {', '.join(unknown)}")
+    return first_day, last_day, statuses or list(SALES_STATUSES)
+
+def analytics_response(request, build):
+    """Answer with build(first_day, last_day, statuses) plus the filters used."""
+    try:
+        first_day, last_day, statuses = get_analytics_filters(request)
+        data = build(first_day, last_day, statuses)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({
+        'success': True,
+        'start': first_day.isoformat(),
+        'end': last_day.isoformat(),
+        'statuses': statuses,
+        **data,
+    })
+
+@admin_required
+@require_http_methods(["GET"])
+def sales_analytics(request):
+    """Orders and revenue per day from the daily rollups."""
+    return analytics_response(request, sales_by_day)
+
+@admin_required
+@require_http_methods(["GET"])
+def product_analytics(request):
+    """Best-selling products (?limit=, ?order_by=units|revenue) from the daily rollups."""
+    order_by = request.GET.get('order_by', 'units')
+    try:
+        limit = min(int(request.GET.get('limit', TOP_PRODUCTS_LIMIT)), TOP_PRODUCTS_MAX_LIMIT)
+    except ValueError:
+        limit = TOP_PRODUCTS_LIMIT
+    if order_by not in ('units', 'revenue'):
+        return JsonResponse({'success': False, 'error': 'order_by must be units or revenue'}, status=400)
+    if limit < 1:
+        return JsonResponse({'success': False, 'error': 'limit must be at least 1'}, status=400)
+    return analytics_response(
+        request, lambda first_day, last_day, statuses: top_products(first_day, last_day, statuses, limit, order_by)
+    )
+
+@admin_required
+@require_http_methods(["GET"])
+def category_analytics(request):
+    """Units, revenue and revenue share per category from the daily rollups."""
+    return analytics_response(request, category_share)
+
 @admin_required
 def filter_orders(request, status):
     if status == 'all':
@@ -325,14 +493,13 @@ def staff_inventory(request):
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)})
     
-    # Handle search
+    # Handle search: ranked full-text matches, best first
     search_query = request.GET.get('search', '')
-    products = Product.objects.all()
     
     if search_query:
-        products = products.filter(name__icontains=search_query)
-    
-    products = products.order_by('category', 'name')
+        products = search_products(search_query, STAFF_SEARCH_LIMIT)
+    else:
+        products = Product.objects.select_related('category').order_by('category', 'name')
     
     context = {
         'products': products,
@@ -341,6 +508,49 @@ def staff_inventory(request):
     }
     return render(request, 'inventory/staff_inventory.html', context)
 
+@staff_required
+@require_http_methods(["GET"])
+def export_product_csv(request):
+    """Every product as a CSV download, streamed in constant memory."""
+    response = StreamingHttpResponse(export_products(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="products-{timezone.localdate():%Y%m%d}.csv"'
+    return response
+
+@staff_required
+@require_http_methods(["POST"])
+def import_product_csv(request):
+    """Apply an uploaded product CSV; answers with per-row errors."""
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'Choose a CSV file to import'}, status=400)
+    try:
+        report = import_products(upload)
+    except ProductImportError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, **report})
+
+@staff_required
+def product_search(request):
+    """Typeahead: top matches for ?q= as JSON, best first."""
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(int(request.GET.get('limit', TYPEAHEAD_LIMIT)), TYPEAHEAD_MAX_LIMIT)
+    except ValueError:
+        limit = TYPEAHEAD_LIMIT
+    products = []
+    if len(query) >= TYPEAHEAD_MIN_LENGTH and limit > 0:
+        products = search_products(query, limit, candidates=TYPEAHEAD_CANDIDATES, min_length=TYPEAHEAD_MIN_LENGTH)
+    return JsonResponse({
+        'success': True,
+        'results': [{
+            'id': product.id,
+            'name': product.name,
+            'category': product.category.name,
+            'price': product.price,
+            'stock_quantity': product.stock_quantity,
+        } for product in products]
+    })
+
 @require_http_methods(["DELETE"])
 @staff_required
 def delete_product(request, product_id):
@@ -376,16 +586,6 @@ def get_product(request, product_id):
             'error': 'Product not found'
         })
 
-from django.http import HttpResponse
-from io import BytesIO
-from django.utils import timezone
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
 @login_required(login_url='account_login')
 @approved_user_required
 def update_order_address(request, order_id):
@@ -403,13 +603,25 @@ def update_order_address(request, order_id):
 @login_required(login_url='account_login')
 @approved_user_required
 def customer_orders(request):
-    # Get orders with related items and products
-    orders = Order.objects.filter(user=request.user).prefetch_related(
-        'items__product'
-    ).order_by('-created_at')
+    orders = Order.objects.filter(user=request.user)
+    
+    # Summary figures over every order, computed in the database
+    summary = orders.aggregate(
+        total_orders=Count('id'),
+        total_spent=Sum('total_amount', filter=Q(status='delivered')),
+        pending_orders=Count('id', filter=Q(status='pending')),
+    )
+    
+    # One keyset page of orders, with item counts summed in SQL
+    cursor = request.GET.get('cursor')
+    page_orders = orders.annotate(total_items=Sum('items__quantity')).prefetch_related('items__product')
+    try:
+        page, next_cursor = keyset_page(page_orders, cursor, settings.CUSTOMER_ORDERS_PAGE_SIZE)
+    except ValueError:
+        return redirect('inventory:customer_orders')
     
     # Add status colors and process order information
-    for order in orders:
+    for order in page:
         # Status colors
         if order.status == 'pending':
             order.status_color = 'warning'
@@ -422,16 +634,22 @@ def customer_orders(request):
         elif order.status == 'cancelled':
             order.status_color = 'danger'
         
-        # Calculate order statistics
-        order.total_items = sum(item.quantity for item in order.items.all())
+        order.total_items = order.total_items or 0
         order.shipping_status = get_shipping_status(order)
     
+    if cursor:
+        recent_order = orders.order_by('-created_at', '-id').only('id', 'status').first()
+    else:
+        recent_order = page[0] if page else None
+    
     context = {
-        'orders': orders,
-        'total_orders': len(orders),
-        'total_spent': sum(order.total_amount for order in orders if order.status == 'delivered'),
-        'pending_orders': sum(1 for order in orders if order.status == 'pending'),
-        'recent_order': orders.first() if orders else None,
+        'orders': page,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+        'total_orders': summary['total_orders'],
+        'total_spent': summary['total_spent'] or 0,
+        'pending_orders': summary['pending_orders'],
+        'recent_order': recent_order,
     }
     
     return render(request, 'inventory/customer_orders.html', context)
@@ -472,99 +690,13 @@ def get_shipping_status(order):
 def generate_invoice(request, order_id):
     try:
         order = Order.objects.get(id=order_id, user=request.user)
-        items = order.items.select_related('product').all()
-        
-        # Create PDF
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        elements.append(Paragraph("INVOICE", title_style))
-        elements.append(Paragraph("Kannan Crackers", styles['Heading2']))
-        elements.append(Spacer(1, 20))
-        
-        # Order Info
-        order_info = [
-            [Paragraph(f"<b>Invoice #:</b> {order.id}", styles['Normal']),
-             Paragraph(f"<b>Date:</b> {order.created_at.strftime('%B %d, %Y')}", styles['Normal'])],
-            [Paragraph(f"<b>Customer:</b> {order.full_name}", styles['Normal']),
-             Paragraph(f"<b>Status:</b> {order.get_status_display()}", styles['Normal'])],
-            [Paragraph(f"<b>Phone:</b> {order.phone}", styles['Normal']),
-             Paragraph(f"<b>Email:</b> {order.email}", styles['Normal'])],
-            [Paragraph(f"<b>Shipping Address:</b> {order.address}", styles['Normal']), '']
-        ]
-        
-        order_table = Table(order_info, colWidths=[4*inch, 4*inch])
-        order_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('GRID', (0, 0), (-1, -2), 1, colors.black),
-            ('BOX', (0, 0), (-1, -1), 2, colors.black),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-        ]))
-        elements.append(order_table)
-        elements.append(Spacer(1, 20))
-        
-        # Items Table
-        items_data = [['Product', 'Quantity', 'Price', 'Total']]
-        for item in items:
-            items_data.append([
-                item.product.name,
-                str(item.quantity),
-                f"₹{item.price}",
-                f"₹{item.total}"
-            ])
-        items_data.append(['', '', 'Total Amount:', f"₹{order.total_amount}"])
-        
-        items_table = Table(items_data, colWidths=[4*inch, 1.5*inch, 1.5*inch, 1*inch])
-        items_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -2), 1, colors.black),
-            ('BOX', (0, 0), (-1, -1), 2, colors.black),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('ALIGN', (-2, -1), (-1, -1), 'RIGHT'),
-        ]))
-        elements.append(items_table)
-        
-        # Footer
-        elements.append(Spacer(1, 30))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=1
-        )
-        elements.append(Paragraph("Thank you for shopping with Kannan Crackers!", footer_style))
-        elements.append(Paragraph(f"Generated on: {timezone.now().strftime('%B %d, %Y %H:%M')}", footer_style))
-        
-        # Build PDF
-        doc.build(elements)
-        
-        # Prepare response
-        pdf = buffer.getvalue()
-        buffer.close()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="invoice-{order.id}.pdf"'
-        
-        return response
-        
     except Order.DoesNotExist:
         return HttpResponse("Order not found", status=404)
+
+    # Rendered once per order version, then streamed from disk
+    return FileResponse(
+        invoices.open_invoice(order),
+        as_attachment=True,
+        filename=f"invoice-{order.id}.pdf",
+        content_type='application/pdf'
+    )